@@ -0,0 +1,265 @@
+"""Benchmark of the host game loop with simulated players.
+
+Usage: python benchmarks/bench_game.py [--players 3 6 12] [--criteria soft hard] [--remote 1]
+                                       [--output results.json] [--compare baseline.json]
+
+Every configuration plays `--games` games of `--rounds` rounds over the text_samples words. Players are
+synthetic local players plus `--remote` stub HTTP players served from this process, which answer after
+`--latency-ms` and fail (HTTP 500) with `--failure-rate`. For every configuration it reports games/sec,
+the host overhead per iteration (cleaning, evaluation, scoring, logging and recording, measured with
+Instrumentation) and the peak traced memory of a game. The hard criteria use a LemmaIndex of the
+synthetic vocabulary, so WordNet is not needed and not measured.
+
+The results are stored as JSON in --output (by default benchmarks/results/bench_game-<date>-<commit>.json),
+--compare checks them against stored ones and exits with 1 if a configuration got slower than --tolerance
+allows.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from the_hat_game.game import Game  # noqa: E402
+from the_hat_game.instrumentation import Instrumentation  # noqa: E402
+from the_hat_game.lemma_index import LemmaIndex  # noqa: E402
+from the_hat_game.players import AbstractPlayer, PlayerDefinition, RemotePlayer  # noqa: E402
+from the_hat_game.utils import get_project_root  # noqa: E402
+
+HOST_PHASES = ("clean", "evaluate", "score", "log", "record")
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def load_vocabulary():
+    words = set()
+    for path in sorted((get_project_root() / "text_samples").glob("*.txt")):
+        with open(path) as f:
+            words.update(line.strip().lower() for line in f if line.strip())
+    return sorted(words)
+
+
+class SyntheticPlayer(AbstractPlayer):
+    """Explains a word with a fixed random list of associations and guesses the words whose lists
+    share the most words with the given ones. `noise` is the share of random associations."""
+
+    def __init__(self, vocabulary, seed, noise=0.3, n_associations=20):
+        rng = np.random.default_rng(seed)
+        shared = np.random.default_rng(0)
+        self.associations = {}
+        for word in vocabulary:
+            # all players share most of their associations, otherwise nobody would guess anything
+            common = list(shared.choice(vocabulary, size=n_associations))
+            own = list(rng.choice(vocabulary, size=n_associations))
+            self.associations[word] = [o if rng.random() < noise else c for c, o in zip(common, own)]
+        self.index = {}
+        for word, associations in self.associations.items():
+            for association in associations:
+                self.index.setdefault(association, []).append(word)
+
+    def explain(self, word, n_words):
+        return self.associations.get(word, [])[:n_words]
+
+    def guess(self, words, n_words):
+        votes = {}
+        for word in words:
+            for candidate in self.index.get(word, ()):
+                votes[candidate] = votes.get(candidate, 0) + 1
+        return sorted(votes, key=lambda w: (-votes[w], w))[:n_words]
+
+
+class StubPlayerServer:
+    """HTTP player service in a background thread, answering like a SyntheticPlayer."""
+
+    def __init__(self, player, latency, failure_rate, seed):
+        rng = np.random.default_rng(seed)
+        lock = threading.Lock()
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                with lock:
+                    failed = rng.random() < failure_rate
+                time.sleep(latency)
+                if url.path == "/":
+                    status, body = 200, "ok"
+                elif failed:
+                    # a valid empty answer, so the failure shows only in the status code
+                    status, body = 500, []
+                elif url.path == "/explain":
+                    status, body = 200, player.explain(query["word"][0], int(query["n_words"][0]))
+                elif url.path == "/guess":
+                    status, body = 200, player.guess(query.get("words", []), int(query["n_words"][0]))
+                else:
+                    status, body = 404, "not found"
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def play(players, vocabulary, criteria, n_rounds, seed, lemma_index):
+    instrumentation = Instrumentation()
+    game = Game(
+        players,
+        vocabulary,
+        criteria,
+        n_rounds=n_rounds,
+        n_explain_words=5,
+        n_guessing_words=5,
+        random_state=seed,
+        logging_callback=lambda data, name: None,
+        lemma_index=lemma_index,
+        instrumentation=instrumentation,
+    )
+    game.run()
+    return game, instrumentation
+
+
+def run_config(vocabulary, criteria, n_players, n_remote, args):
+    local = [PlayerDefinition(f"local {i}", SyntheticPlayer(vocabulary, seed=i)) for i in range(n_players - n_remote)]
+    servers = [
+        StubPlayerServer(SyntheticPlayer(vocabulary, seed=100 + i), args.latency_ms / 1000, args.failure_rate, i)
+        for i in range(n_remote)
+    ]
+    players = local + [PlayerDefinition(f"remote {i}", RemotePlayer(s.url)) for i, s in enumerate(servers)]
+    lemma_index = LemmaIndex(vocabulary, wordnet_version="synthetic")
+    n_rounds = min(args.rounds, len(vocabulary) // n_players)
+    try:
+        # warm the process-wide caches (stems, soft matches) which later games reuse
+        play(players, vocabulary, criteria, n_rounds, 0, lemma_index)
+        iterations = 0
+        host_time = 0.0
+        started = time.perf_counter()
+        for seed in range(1, args.games + 1):
+            game, instrumentation = play(players, vocabulary, criteria, n_rounds, seed, lemma_index)
+            iterations += len(game.game_info["iterations"])
+            phases = instrumentation.snapshot()["phase_seconds"]
+            host_time += sum(row["count"] * row["mean"] for row in phases if row["labels"]["phase"] in HOST_PHASES)
+        elapsed = time.perf_counter() - started
+
+        tracemalloc.start()
+        play(players, vocabulary, criteria, n_rounds, 0, lemma_index)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        for server in servers:
+            server.close()
+    return {
+        "criteria": criteria,
+        "players": n_players,
+        "remote": n_remote,
+        "rounds": n_rounds,
+        "games_per_sec": args.games / elapsed,
+        "iteration_ms": elapsed / iterations * 1e3,
+        "host_overhead_ms": host_time / iterations * 1e3,
+        "peak_memory_mb": peak / 2**20,
+    }
+
+
+def config_key(result):
+    return (result["criteria"], result["players"], result["remote"])
+
+
+def compare(results, baseline, tolerance):
+    """Configurations which are slower than the baseline by more than `tolerance` (0.2 = 20%)."""
+    baseline = {config_key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in results:
+        old = baseline.get(config_key(result))
+        if old is None:
+            continue
+        if result["games_per_sec"] < old["games_per_sec"] * (1 - tolerance):
+            regressions.append((config_key(result), "games_per_sec", old["games_per_sec"], result["games_per_sec"]))
+        if result["host_overhead_ms"] > old["host_overhead_ms"] * (1 + tolerance):
+            regressions.append(
+                (config_key(result), "host_overhead_ms", old["host_overhead_ms"], result["host_overhead_ms"])
+            )
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=get_project_root()
+        ).stdout.strip()
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, nargs="+", default=[3, 6, 12])
+    parser.add_argument("--criteria", nargs="+", default=["soft", "hard"], choices=["soft", "hard"])
+    parser.add_argument("--remote", type=int, default=0, help="how many of the players are stub HTTP players")
+    parser.add_argument("--latency-ms", type=float, default=5)
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--games", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="default: benchmarks/results/bench_game-<date>-<commit>.json")
+    parser.add_argument("--compare", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    vocabulary = load_vocabulary()
+    print(f"{len(vocabulary)} words, {args.games} games per configuration")
+    print(
+        f"{'criteria':>8} {'players':>7} {'remote':>6} {'games/s':>8} {'iter, ms':>9} {'host, ms':>9} {'peak, MB':>9}"
+    )
+    results = []
+    for criteria in args.criteria:
+        for n_players in args.players:
+            result = run_config(vocabulary, criteria, n_players, min(args.remote, n_players), args)
+            results.append(result)
+            print(
+                f"{criteria:>8} {n_players:7} {result['remote']:6} {result['games_per_sec']:8.2f}"
+                f" {result['iteration_ms']:9.2f} {result['host_overhead_ms']:9.3f} {result['peak_memory_mb']:9.2f}"
+            )
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "args": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "results": results,
+    }
+    output = args.output or RESULTS_DIR / f"bench_game-{time.strftime('%Y%m%d-%H%M%S')}-{commit or 'unknown'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, default=str))
+    print(f"results saved to {output}")
+    if args.compare:
+        regressions = compare(results, json.loads(args.compare.read_text()), args.tolerance)
+        for key, metric, old, new in regressions:
+            print(f"REGRESSION {key}: {metric} {old:.3f} -> {new:.3f}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Compare the WordNet existence check of the hard criteria with the precomputed LemmaIndex.
+
+Usage: python benchmarks/bench_lemma_index.py [--index data/wordnet_lemmas.pkl]
+
+Probes are the text_samples vocabularies plus a few inflected forms of every word. The WordNet
+path is timed cold (the first call loads the corpus) and warm; both paths must agree on every probe.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from the_hat_game.lemma_index import DEFAULT_INDEX_PATH, LemmaIndex  # noqa: E402
+from the_hat_game.utils import get_project_root  # noqa: E402
+
+SUFFIXES = ("", "s", "es", "ed", "ing", "er", "est", "ly")
+
+
+def load_probes():
+    words = []
+    for path in sorted((get_project_root() / "text_samples").glob("*.txt")):
+        with open(path) as f:
+            words.extend(line.strip().lower() for line in f if line.strip())
+    return [word + suffix for word in words for suffix in SUFFIXES]
+
+
+def timed(check, probes, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        answers = [check(word) for word in probes]
+    return answers, (time.perf_counter() - started) / (repeat * len(probes))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, type=Path)
+    parser.add_argument("--repeat", default=20, type=int)
+    args = parser.parse_args()
+
+    probes = load_probes()
+
+    started = time.perf_counter()
+    index = LemmaIndex.load(args.index)
+    index_load_time = time.perf_counter() - started
+    index_answers, index_time = timed(index.__contains__, probes, args.repeat)
+
+    started = time.perf_counter()
+    from nltk.corpus import wordnet
+
+    def wordnet_check(word):
+        return len(wordnet.synsets(word)) > 0
+
+    wordnet_check("warmup")
+    wordnet_load_time = time.perf_counter() - started
+    wordnet_answers, wordnet_time = timed(wordnet_check, probes, args.repeat)
+
+    mismatches = [word for word, a, b in zip(probes, index_answers, wordnet_answers) if a != b]
+    print(f"{len(probes)} probes, {sum(index_answers)} existing words, {len(index)} words in the index")
+    print(f"{'':12} {'load, ms':>10} {'per word, us':>14}")
+    print(f"{'wordnet':12} {wordnet_load_time * 1e3:10.1f} {wordnet_time * 1e6:14.2f}")
+    print(f"{'lemma index':12} {index_load_time * 1e3:10.1f} {index_time * 1e6:14.2f}")
+    print(f"speedup per word: {wordnet_time / index_time:.0f}x")
+    if mismatches:
+        print(f"MISMATCHES: {mismatches}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Load test of a running player service: p50/p99 latency and throughput at increasing concurrency.
+
+Usage: python benchmarks/bench_serving.py [--url http://127.0.0.1:5000] [--concurrency 1 4 16 64]
+
+With --spawn the service is started from flask_app for the duration of the test, e.g.
+--spawn "gunicorn -c gunicorn.conf.py wsgi:app", --spawn "python app.py" (the development server)
+or --spawn "gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker asgi:app".
+"""
+
+import argparse
+import shlex
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import requests
+
+FLASK_APP = Path(__file__).resolve().parent.parent / "flask_app"
+WORDS = ["cat", "dog", "house", "tree", "car", "book", "river", "music", "money", "bank", "game", "hat"]
+
+
+def wait_until_up(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(url, timeout=1).status_code == 200:
+                return
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"{url} did not start in {timeout} s")
+
+
+def run_level(url, endpoint, concurrency, n_requests, seed):
+    local = threading.local()
+    rng = np.random.default_rng(seed)
+    queries = [list(rng.choice(WORDS, size=rng.integers(1, 6))) for _ in range(n_requests)]
+
+    def call(words):
+        # one keep-alive session per client thread, as RemotePlayer does
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        params = {"word": words[0]} if endpoint == "explain" else {"words": words}
+        started = time.perf_counter()
+        response = local.session.get(f"{url}/{endpoint}", params={**params, "n_words": 10}, timeout=30)
+        return time.perf_counter() - started, response.status_code == 200
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(call, queries))
+    elapsed = time.perf_counter() - started
+    latencies = np.array([latency for latency, _ in results]) * 1e3
+    errors = sum(not ok for _, ok in results)
+    return np.percentile(latencies, 50), np.percentile(latencies, 99), n_requests / elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--endpoint", default="guess", choices=["guess", "explain"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=500, help="requests per concurrency level")
+    parser.add_argument("--spawn", help="command which starts the service in flask_app")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        server = subprocess.Popen(shlex.split(args.spawn), cwd=FLASK_APP, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_up(args.url)
+        print(f"{'concurrency':>11} {'p50, ms':>9} {'p99, ms':>9} {'req/s':>9} {'errors':>7}")
+        for seed, concurrency in enumerate(args.concurrency):
+            p50, p99, throughput, errors = run_level(args.url, args.endpoint, concurrency, args.requests, seed)
+            print(f"{concurrency:11} {p50:9.1f} {p99:9.1f} {throughput:9.0f} {errors:7}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
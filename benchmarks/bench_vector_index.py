@@ -0,0 +1,100 @@
+"""Compare fastText's get_nearest_neighbors with the batched VectorIndex of flask_app/vectors.py.
+
+Usage: python benchmarks/bench_vector_index.py [--model model.bin] [--vocabulary 40000] [--dim 100]
+
+Without --model a skipgram model is trained on a synthetic Zipf corpus with a vocabulary of the size of
+20 newsgroups (~40k words with count >= 5). Queries are random vocabulary words; recall@k is the share
+of fastText's neighbours also returned by the index. It is not always 1: the index drops case/punctuation
+duplicates, and float32 rounding reorders near-ties, of which a synthetic corpus has many.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "flask_app"))
+
+from vectors import VectorIndex  # noqa: E402
+
+
+def letters(i):
+    # game words have no digits, so the synthetic vocabulary is "a", "b", ..., "ba", ...
+    word = ""
+    while True:
+        word = chr(97 + i % 26) + word
+        i //= 26
+        if not i:
+            return word
+
+
+def train_model(fasttext, vocabulary, dim, n_tokens, threads, seed):
+    rng = np.random.default_rng(seed)
+    words = np.array([letters(i) for i in range(vocabulary)])
+    frequencies = 1 / np.arange(1, vocabulary + 1)
+    tokens = words[rng.choice(vocabulary, size=n_tokens, p=frequencies / frequencies.sum())]
+    with tempfile.NamedTemporaryFile("w", suffix=".txt") as f:
+        for line in np.array_split(tokens, n_tokens // 100):
+            f.write(" ".join(line) + "\n")
+        f.flush()
+        return fasttext.train_unsupervised(
+            f.name, model="skipgram", dim=dim, minCount=1, epoch=1, thread=threads, verbose=0
+        )
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", type=Path)
+    parser.add_argument("--vocabulary", default=40000, type=int)
+    parser.add_argument("--dim", default=100, type=int)
+    parser.add_argument("--tokens", default=2_000_000, type=int)
+    parser.add_argument("--threads", default=4, type=int)
+    parser.add_argument("--queries", default=200, type=int)
+    parser.add_argument("--k", default=10, type=int)
+    parser.add_argument("--seed", default=0, type=int)
+    args = parser.parse_args()
+
+    import fasttext
+
+    if args.model:
+        model = fasttext.load_model(str(args.model))
+    else:
+        model, train_time = timed(
+            train_model, fasttext, args.vocabulary, args.dim, args.tokens, args.threads, args.seed
+        )
+        print(f"trained a {args.dim}-dim model in {train_time:.1f} s")
+
+    index, build_time = timed(VectorIndex.from_fasttext, model)
+    rng = np.random.default_rng(args.seed)
+    queries = [[index.words[i]] for i in rng.choice(len(index), size=args.queries, replace=False)]
+    print(
+        f"{len(index)} words, {index.dim} dims, {len(queries)} queries, k={args.k}, index built in {build_time:.1f} s"
+    )
+
+    def fasttext_nearest(k):
+        return [[w for _, w in model.get_nearest_neighbors(q[0], k=k)] for q in queries]
+
+    model.get_nearest_neighbors(queries[0][0])  # the first call precomputes the vocabulary vectors
+    expected, fasttext_time = timed(fasttext_nearest, args.k)
+    _, single_time = timed(lambda: [index.nearest([q], args.k)[0] for q in queries])
+    batched, batch_time = timed(index.nearest, queries, args.k)
+
+    recall = np.mean([len(set(a) & set(b)) / len(a) for a, b in zip(expected, batched) if a])
+    print(f"{'':24} {'per query, ms':>14}")
+    print(f"{f'fasttext, k={args.k}':24} {fasttext_time / len(queries) * 1e3:14.3f}")
+    print(f"{'index, one by one':24} {single_time / len(queries) * 1e3:14.3f}")
+    print(f"{'index, one batch':24} {batch_time / len(queries) * 1e3:14.3f}")
+    print(f"speedup of the batch: {fasttext_time / batch_time:.1f}x, recall@{args.k}: {recall:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Inverted-file (IVF) approximate nearest neighbours for large vocabularies.
+
+Build it offline next to the fastText model and print recall@k against the exact search:
+
+    python ann.py model.bin --lists 1024 --nprobe 4 8 16 32
+
+then serve it with `LocalVectorPlayer(IVFIndex.load("model.ivf"))` or `MODEL_PATH=model.ivf python app.py`.
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+from vectors import VectorIndex, distinct_top_k, normalize_rows
+
+
+def ivf_path(model_path):
+    return Path(model_path).with_suffix(".ivf")
+
+
+def spherical_kmeans(vectors, n_lists, n_iterations=10, sample_size=256, chunk_size=65536, random_state=0):
+    """Centroids of unit `vectors` and the list of every vector. Centroids are fitted on a sample."""
+    rng = np.random.default_rng(random_state)
+    sample = vectors[rng.choice(len(vectors), size=min(len(vectors), sample_size * n_lists), replace=False)]
+    centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)]
+    for _ in range(n_iterations):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        empty = np.bincount(assignment, minlength=n_lists) == 0
+        # restart empty lists from random points
+        sums[empty] = sample[rng.choice(len(sample), size=empty.sum())]
+        centroids = normalize_rows(sums)
+    chunks = np.array_split(vectors, range(chunk_size, len(vectors), chunk_size))
+    assignment = np.concatenate([np.argmax(chunk @ centroids.T, axis=1) for chunk in chunks])
+    return centroids, assignment
+
+
+class IVFIndex(VectorIndex):
+    """VectorIndex which scores only the words of the `nprobe` lists closest to the query.
+
+    The vocabulary is stored ordered by list, so that list `i` is `words[offsets[i]:offsets[i + 1]]`.
+    `nprobe` is the recall/latency knob: more lists means better recall and slower queries,
+    `nprobe=None` is the exact search over the whole vocabulary.
+    """
+
+    # only the probed lists are scored
+    exhaustive = False
+
+    def __init__(self, words, vectors, centroids, offsets, nprobe=8, **kwargs):
+        super().__init__(words, vectors, **kwargs)
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.nprobe = nprobe
+
+    @classmethod
+    def build(cls, index, n_lists=None, nprobe=8, random_state=0, **kwargs):
+        """IVF over the vocabulary of a VectorIndex, by default with ~sqrt(vocabulary size) lists."""
+        if n_lists is None:
+            n_lists = max(1, int(np.sqrt(len(index))))
+        centroids, assignment = spherical_kmeans(index.vectors, n_lists, random_state=random_state)
+        order = np.argsort(assignment, kind="stable")
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=n_lists))])
+        words = [index.words[i] for i in order]
+        vectors, form_ids = index.vectors[order], index.form_ids[order]
+        kwargs.update(embed=index.embed, normalized=True, form_ids=form_ids, form_names=index.form_names)
+        return cls(words, vectors, centroids, offsets, nprobe, **kwargs)
+
+    @property
+    def n_lists(self):
+        return len(self.centroids)
+
+    def search(self, queries, banned_ids, k, nprobe=None):
+        nprobe = nprobe or self.nprobe
+        if nprobe is None or nprobe >= self.n_lists:
+            return super().search(queries, banned_ids, k)
+        results = []
+        list_scores = queries @ self.centroids.T
+        # k-means may leave lists empty, probing them would only waste the query's probes
+        list_scores[:, self.offsets[1:] == self.offsets[:-1]] = -np.inf
+        probes = np.argpartition(list_scores, self.n_lists - nprobe, axis=1)[:, -nprobe:]
+        for query, lists, query_banned_ids in zip(queries, probes, banned_ids):
+            # lists are contiguous, so scoring them needs no copy of their vectors
+            ranges = [(self.offsets[i], self.offsets[i + 1]) for i in np.sort(lists)]
+            ids = np.concatenate([np.arange(a, b) for a, b in ranges])
+            if ids.size == 0:
+                # the whole index is empty
+                results.append([])
+                continue
+            scores = np.concatenate([self.vectors[a:b] @ query for a, b in ranges])
+            positions = np.minimum(np.searchsorted(ids, query_banned_ids), len(ids) - 1)
+            scores[positions[ids[positions] == query_banned_ids]] = -np.inf
+            positions = distinct_top_k(scores, self.form_ids[ids], k)
+            results.append([self.words[i] for i in ids[positions]])
+        return results
+
+    def save(self, directory):
+        super().save(directory)
+        directory = Path(directory)
+        np.save(directory / "centroids.npy", self.centroids)
+        np.save(directory / "offsets.npy", self.offsets)
+        (directory / "ivf.json").write_text(json.dumps({"nprobe": self.nprobe}))
+
+    @classmethod
+    def load(cls, directory, mmap_mode="r", **kwargs):
+        directory = Path(directory)
+        kwargs.setdefault("nprobe", json.loads((directory / "ivf.json").read_text())["nprobe"])
+        centroids = np.load(directory / "centroids.npy")
+        offsets = np.load(directory / "offsets.npy")
+        return super().load(directory, mmap_mode, centroids=centroids, offsets=offsets, **kwargs)
+
+
+def recall_at_k(exact, approximate):
+    """Mean share of the exact neighbours found by the approximate search."""
+    return float(np.mean([len(set(a) & set(b)) / len(a) for a, b in zip(exact, approximate) if a]))
+
+
+def evaluate(index, sentences, k, nprobes):
+    """recall@k and time per query of the exact search and of every `nprobe`."""
+    started = time.perf_counter()
+    exact = index.nearest(sentences, k, nprobe=index.n_lists)
+    report = [{"nprobe": None, "recall": 1.0, "ms": (time.perf_counter() - started) / len(sentences) * 1e3}]
+    for nprobe in nprobes:
+        started = time.perf_counter()
+        approximate = index.nearest(sentences, k, nprobe=nprobe)
+        elapsed = time.perf_counter() - started
+        report.append(
+            {"nprobe": nprobe, "recall": recall_at_k(exact, approximate), "ms": elapsed / len(sentences) * 1e3}
+        )
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("model", type=Path, help="fastText .bin model, the index is saved next to it")
+    parser.add_argument("--lists", type=int)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    import fasttext
+
+    index = IVFIndex.build(VectorIndex.from_fasttext(fasttext.load_model(str(args.model))), args.lists)
+    rng = np.random.default_rng(0)
+    sentences = [[index.words[i]] for i in rng.choice(len(index), size=min(args.queries, len(index)), replace=False)]
+    report = evaluate(index, sentences, args.k, args.nprobe)
+    print(f"{len(index)} words, {index.n_lists} lists, recall@{args.k} of {len(sentences)} queries")
+    for row in report:
+        print(f"nprobe={row['nprobe'] or 'exact':>6} recall={row['recall']:.3f} {row['ms']:.3f} ms/query")
+
+    # the first nprobe with recall of at least 0.95 becomes the default of the saved index
+    good = [row["nprobe"] for row in report[1:] if row["recall"] >= 0.95]
+    index.nprobe = good[0] if good else None
+    index.save(ivf_path(args.model))
+    print(f"saved to {ivf_path(args.model)} with nprobe={index.nprobe}")
+
+
+if __name__ == "__main__":
+    main()
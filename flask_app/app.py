@@ -1,9 +1,12 @@
 import json
 import os
 import random
+from collections import defaultdict
 
+from batching import BatchingPlayer
+from cache import CachedPlayer
 from flask import Flask, render_template, request
-from player import LocalDummyPlayer
+from player import LocalDummyPlayer, LocalVectorPlayer
 
 app = Flask(__name__)
 
@@ -30,7 +33,26 @@ def index():
     return render_template("index.html", url=url)
 
 
-player = LocalDummyPlayer()
+def create_player():
+    # MODEL_PATH is a model exported with `python vectors.py model.bin model_dir` (or ann.py), it is
+    # memory-mapped, so startup does not read the vectors and all workers share one copy of them
+    model_path = os.environ.get("MODEL_PATH")
+    if not model_path:
+        return LocalDummyPlayer()
+    from vectors import load_index
+
+    player = LocalVectorPlayer(load_index(model_path))
+    # concurrent requests share one batched search, PLAYER_BATCH_SIZE=1 turns batching off
+    max_batch_size = int(os.environ.get("PLAYER_BATCH_SIZE", 32))
+    if max_batch_size > 1:
+        max_wait = float(os.environ.get("PLAYER_BATCH_WAIT_MS", 2)) / 1000
+        player = BatchingPlayer(player, max_batch_size, max_wait)
+    return player
+
+
+# repeated queries are answered from memory, PLAYER_CACHE_SIZE=0 turns the cache off
+cache_size = int(os.environ.get("PLAYER_CACHE_SIZE", 4096))
+player = CachedPlayer(create_player(), maxsize=cache_size) if cache_size else create_player()
 
 
 @app.route("/explain")
@@ -47,5 +69,38 @@ def guess():
     return json.dumps(player.guess(words=words, n_words=n_words))
 
 
+def answer_batch(method, queries, field):
+    """Answers of player's `method` (explain_batch or guess_batch) in the order of `queries`.
+
+    The player is called once for every distinct n_words.
+    """
+    groups = defaultdict(list)
+    for i, query in enumerate(queries):
+        groups[int(query["n_words"])].append(i)
+    answers = [None] * len(queries)
+    for n_words, indices in groups.items():
+        word_lists = getattr(player, method)([queries[i][field] for i in indices], n_words)
+        for i, word_list in zip(indices, word_lists):
+            answers[i] = word_list
+    return answers
+
+
+# batch endpoints take a JSON array of queries and return an array of word lists, one for each query
+@app.route("/explain_batch", methods=["POST"])
+def explain_batch():
+    return json.dumps(answer_batch("explain_batch", request.get_json(force=True), "word"))
+
+
+@app.route("/guess_batch", methods=["POST"])
+def guess_batch():
+    return json.dumps(answer_batch("guess_batch", request.get_json(force=True), "words"))
+
+
+@app.route("/cache_info")
+def cache_info():
+    cache = getattr(player, "cache", None)
+    return json.dumps(cache.info() if cache is not None else None)
+
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 5000)))
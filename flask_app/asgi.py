@@ -0,0 +1,87 @@
+"""ASGI variant of the player endpoints: uvicorn asgi:app, or gunicorn with uvicorn workers (see gunicorn.conf.py).
+
+The handlers are coroutines, so one worker keeps accepting requests from many hosts while the
+player's answers are computed in a thread pool.
+"""
+
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from app import answer_batch, player
+
+# as in wsgi.py: build the lazy lookups before gunicorn forks the workers
+getattr(player, "warm_up", lambda: None)()
+
+
+async def read_body(receive):
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+
+async def answer(function, *args):
+    return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+
+async def explain(query, body):
+    return await answer(player.explain, query["word"][0], int(query["n_words"][0]))
+
+
+async def guess(query, body):
+    return await answer(player.guess, query.get("words", []), int(query["n_words"][0]))
+
+
+async def explain_batch(query, body):
+    return await answer(answer_batch, "explain_batch", json.loads(body), "word")
+
+
+async def guess_batch(query, body):
+    return await answer(answer_batch, "guess_batch", json.loads(body), "words")
+
+
+async def index(query, body):
+    return "ok"
+
+
+ROUTES = {
+    ("GET", "/"): index,
+    ("GET", "/explain"): explain,
+    ("GET", "/guess"): guess,
+    ("POST", "/explain_batch"): explain_batch,
+    ("POST", "/guess_batch"): guess_batch,
+}
+
+
+async def send_response(send, status, payload):
+    body = json.dumps(payload).encode()
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    handler = ROUTES.get((scope["method"], scope["path"]))
+    if handler is None:
+        await send_response(send, 404, "not found")
+        return
+    query = parse_qs(scope["query_string"].decode())
+    body = await read_body(receive)
+    try:
+        payload = await handler(query, body)
+    except (KeyError, ValueError) as exc:
+        await send_response(send, 400, f"bad request: {exc!r}")
+        return
+    await send_response(send, 200, payload)
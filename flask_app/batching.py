@@ -0,0 +1,104 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from player import AbstractPlayer
+
+
+class MicroBatcher:
+    """Collects items submitted by concurrent threads and processes them with one call.
+
+    A batch is closed when it has `max_batch_size` items or `max_wait` seconds after its first item.
+    `function` takes a list of items and returns the list of their results.
+    """
+
+    def __init__(self, function, max_batch_size=32, max_wait=0.002):
+        self.function = function
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.pid = None
+
+    def ensure_started(self):
+        # threads do not survive the fork of gunicorn workers, so every process starts its own
+        with self.lock:
+            if self.thread is None or self.pid != os.getpid():
+                self.pid = os.getpid()
+                self.queue = queue.Queue()
+                self.thread = threading.Thread(target=self.serve, daemon=True)
+                self.thread.start()
+
+    def submit(self, item):
+        self.ensure_started()
+        future = Future()
+        self.queue.put((item, future))
+        return future.result()
+
+    def next_batch(self):
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def serve(self):
+        while True:
+            batch = self.next_batch()
+            try:
+                results = self.function([item for item, _ in batch])
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+
+class BatchingPlayer(AbstractPlayer):
+    """Answers concurrent explain and guess requests with the player's explain_batch and guess_batch.
+
+    Requests are batched separately for every n_words.
+    """
+
+    def __init__(self, player, max_batch_size=32, max_wait=0.002):
+        self.player = player
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.batchers = {}
+        self.lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if name == "player":
+            raise AttributeError(name)
+        return getattr(self.player, name)
+
+    def batcher(self, method, n_words):
+        with self.lock:
+            batcher = self.batchers.get((method, n_words))
+            if batcher is None:
+                function = getattr(self.player, method)
+                batcher = MicroBatcher(lambda items: function(items, n_words), self.max_batch_size, self.max_wait)
+                self.batchers[(method, n_words)] = batcher
+            return batcher
+
+    def explain(self, word, n_words):
+        return self.batcher("explain_batch", n_words).submit(word)
+
+    def guess(self, words, n_words):
+        return self.batcher("guess_batch", n_words).submit(words)
+
+    def explain_batch(self, words, n_words):
+        return self.player.explain_batch(words, n_words)
+
+    def guess_batch(self, sentences, n_words):
+        return self.player.guess_batch(sentences, n_words)
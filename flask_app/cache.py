@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import OrderedDict
+
+from player import AbstractPlayer
+
+
+class LRUCache:
+    """Thread-safe mapping of at most `maxsize` items, evicting the least recently used one.
+
+    With `ttl` (seconds) items older than that are treated as missing. Lookups are counted in
+    `hits` and `misses`.
+    """
+
+    def __init__(self, maxsize=4096, ttl=None, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.items)
+
+    def get(self, key):
+        """(True, value) if `key` is cached, (False, None) otherwise."""
+        with self.lock:
+            item = self.items.get(key)
+            if item is not None and (self.ttl is None or self.clock() - item[1] < self.ttl):
+                self.items.move_to_end(key)
+                self.hits += 1
+                return True, item[0]
+            if item is not None:
+                del self.items[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        with self.lock:
+            self.items[key] = (value, self.clock())
+            self.items.move_to_end(key)
+            while len(self.items) > self.maxsize:
+                self.items.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+            self.hits = self.misses = 0
+
+    def info(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.items), "maxsize": self.maxsize}
+
+
+def normalize_word(word):
+    return word.strip().lower()
+
+
+def copy_answer(answer):
+    # callers may modify the lists they get, so the cached ones are never handed out
+    if isinstance(answer, dict):
+        return {**answer, "word_list": list(answer["word_list"])}
+    return list(answer)
+
+
+class CachedPlayer(AbstractPlayer):
+    """Memoizes explain and guess answers of a player by query.
+
+    The same as the_hat_game.cache.CachedPlayer, copied here because the app is deployed on its own;
+    test_cache checks that the copied functions stay identical. Players with a false `deterministic`
+    attribute are called every time, query words are normalized only for `case_insensitive` players.
+    """
+
+    def __init__(self, player, maxsize=4096, ttl=None, deterministic=None, case_insensitive=None):
+        self.player = player
+        if deterministic is None:
+            deterministic = getattr(player, "deterministic", True)
+        self.deterministic = deterministic
+        if case_insensitive is None:
+            case_insensitive = getattr(player, "case_insensitive", False)
+        self.case_insensitive = case_insensitive
+        self.cache = LRUCache(maxsize, ttl)
+
+    def __getattr__(self, name):
+        if name == "player":
+            raise AttributeError(name)
+        return getattr(self.player, name)
+
+    def cached(self, key, method, *args):
+        if not self.deterministic:
+            return method(*args)
+        hit, answer = self.cache.get(key)
+        if not hit:
+            answer = method(*args)
+            self.cache.put(key, answer)
+        return copy_answer(answer)
+
+    def normalize(self, word):
+        return normalize_word(word) if self.case_insensitive else word
+
+    def explain(self, word, n_words):
+        return self.cached(("explain", self.normalize(word), n_words), self.player.explain, word, n_words)
+
+    def guess(self, words, n_words):
+        key = ("guess", tuple(map(self.normalize, words)), n_words)
+        return self.cached(key, self.player.guess, words, n_words)
+
+    def cached_batch(self, keys, method, queries, n_words):
+        """Answers of a batch method for all `queries`, the missing ones are asked in one call."""
+        if not self.deterministic:
+            return method(queries, n_words)
+        answers = [None] * len(queries)
+        missing = []
+        for i, key in enumerate(keys):
+            hit, answer = self.cache.get(key)
+            if hit:
+                answers[i] = copy_answer(answer)
+            else:
+                missing.append(i)
+        if missing:
+            for i, answer in zip(missing, method([queries[i] for i in missing], n_words)):
+                self.cache.put(keys[i], answer)
+                answers[i] = copy_answer(answer)
+        return answers
+
+    def explain_batch(self, words, n_words):
+        keys = [("explain", self.normalize(word), n_words) for word in words]
+        return self.cached_batch(keys, self.player.explain_batch, words, n_words)
+
+    def guess_batch(self, sentences, n_words):
+        keys = [("guess", tuple(map(self.normalize, words)), n_words) for words in sentences]
+        return self.cached_batch(keys, self.player.guess_batch, sentences, n_words)
@@ -0,0 +1,14 @@
+# gunicorn -c gunicorn.conf.py wsgi:app
+# or, for the async handlers: gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker asgi:app
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+# load the model once in the master process, workers get it copy-on-write when they are forked
+preload_app = True
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+# threads answer concurrent hosts within a worker while numpy releases the GIL
+worker_class = os.environ.get("WORKER_CLASS", "gthread")
+threads = int(os.environ.get("THREADS", 4))
+timeout = 60
+keepalive = 5
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 class AbstractPlayer:
     def __init__(self):
         raise NotImplementedError()
@@ -8,6 +11,13 @@ class AbstractPlayer:
     def guess(self, words, n_words):
         raise NotImplementedError()
 
+    # batch hooks, players which can answer several queries at once faster override them
+    def explain_batch(self, words, n_words):
+        return [self.explain(word, n_words) for word in words]
+
+    def guess_batch(self, sentences, n_words):
+        return [self.guess(words, n_words) for words in sentences]
+
 
 class LocalDummyPlayer(AbstractPlayer):
     def __init__(self):
@@ -21,17 +31,94 @@ class LocalDummyPlayer(AbstractPlayer):
 
 
 class LocalFasttextPlayer(AbstractPlayer):
-    def __init__(self, model):
+    """Player on top of a fastText model.
+
+    With an `index` of the model's words (`vectors.VectorIndex.from_fasttext(model)` or an exported
+    one) it answers with the index's nearest neighbours, as LocalVectorPlayer, and also answers
+    guessing sessions. Without one `guess_next` is None, so the game asks it the whole sentence.
+    """
+
+    def __init__(self, model, index=None):
         self.model = model
+        self.vector_player = LocalVectorPlayer(index) if index is not None else None
 
     def find_words_for_sentence(self, sentence, n_closest):
-        neighbours = self.model.get_nearest_neighbors(sentence)
+        neighbours = self.model.get_nearest_neighbors(sentence, k=n_closest)
         words = [word for similariry, word in neighbours][:n_closest]
         return words
 
     def explain(self, word, n_words):
+        if self.vector_player is not None:
+            return self.vector_player.explain(word, n_words)
         return self.find_words_for_sentence(word, n_words)
 
     def guess(self, words, n_words):
+        if self.vector_player is not None:
+            return self.vector_player.guess(words, n_words)
         words_for_sentence = self.find_words_for_sentence(" ".join(words), n_words)
         return words_for_sentence
+
+    @property
+    def guess_next(self):
+        return None if self.vector_player is None else self.vector_player.guess_next
+
+    @property
+    def end_session(self):
+        return None if self.vector_player is None else self.vector_player.end_session
+
+
+class LocalVectorPlayer(AbstractPlayer):
+    """Nearest-neighbour player on top of a vectors.VectorIndex, e.g. VectorIndex.from_fasttext(model).
+
+    It also answers guessing sessions: `guess_next(session, word, n_words)` adds one word to the
+    session's sentence and guesses for the whole sentence. A session keeps the sentence's score of
+    every word, the sum of its words' scores with the banned words at -inf, so an attempt scores
+    only the new word. With an IVFIndex, which probes other lists for every query, it keeps the sum
+    of the word vectors instead. `end_session(session)` forgets the sentence.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.sessions = {}
+
+    def warm_up(self):
+        self.index.warm_up()
+
+    def explain(self, word, n_words):
+        return self.index.nearest([[word]], n_words)[0]
+
+    def guess(self, words, n_words):
+        return self.index.nearest([words], n_words)[0]
+
+    def explain_batch(self, words, n_words):
+        return self.index.nearest([[word] for word in words], n_words)
+
+    def guess_batch(self, sentences, n_words):
+        return self.index.nearest(sentences, n_words)
+
+    def guess_next(self, session, word, n_words):
+        vector = self.index.word_vector(word)
+        banned_ids = self.index.banned_ids([word])
+        if self.index.exhaustive:
+            # scores are linear in the query, so the sentence's scores are the last ones plus the new word's
+            scores = self.sessions.get(session)
+            if scores is None:
+                scores = self.sessions[session] = np.zeros(len(self.index), dtype=np.float32)
+            if vector is not None:
+                scores += self.index.scores(vector[None])[0]
+            # banned words stay at -inf for the rest of the session
+            scores[banned_ids] = -np.inf
+            return self.index.top_k(scores[None], n_words)[0]
+
+        state = self.sessions.get(session)
+        if state is None:
+            state = self.sessions[session] = {"vector": np.zeros(self.index.dim, dtype=np.float32), "banned": []}
+        if vector is not None:
+            state["vector"] += vector
+        state["banned"].append(banned_ids)
+        # the sum has the direction of the mean of the word vectors, which is all cosine similarity needs
+        query = state["vector"] / max(np.linalg.norm(state["vector"]), 1e-8)
+        return self.index.search(query[None], [np.concatenate(state["banned"])], n_words)[0]
+
+    def end_session(self, session):
+        self.sessions.pop(session, None)
@@ -0,0 +1,207 @@
+"""Compressed word vectors: float16, int8 with a scale per row, or product-quantized (PQ) codes.
+
+Export a fastText model in every format and print recall@k against float32 on held-out hat words:
+
+    python quantize.py model.bin --kinds float16 int8 pq --words ../text_samples/*.txt
+
+then serve one of them with `MODEL_PATH=model.int8 python app.py`.
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+from ann import recall_at_k
+from vectors import VectorIndex
+
+KINDS = ("float16", "int8", "pq")
+
+
+def kmeans(vectors, k, n_iterations=10, random_state=0):
+    """Euclidean k-means centroids of `vectors`."""
+    rng = np.random.default_rng(random_state)
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)]
+    for _ in range(n_iterations):
+        assignment = nearest_centroids(vectors, centroids)
+        counts = np.bincount(assignment, minlength=k)
+        sums = np.stack([np.bincount(assignment, weights=column, minlength=k) for column in vectors.T], axis=1)
+        empty = counts == 0
+        centroids = (sums / np.maximum(counts, 1)[:, None]).astype(vectors.dtype)
+        # restart empty clusters from random points
+        centroids[empty] = vectors[rng.choice(len(vectors), size=empty.sum())]
+    return centroids
+
+
+def nearest_centroids(vectors, centroids):
+    return np.argmin((centroids**2).sum(axis=1) - 2 * vectors @ centroids.T, axis=1)
+
+
+class QuantizedIndex(VectorIndex):
+    """VectorIndex which keeps the unit word vectors compressed and scores queries on the codes.
+
+    float16 halves the matrix, int8 stores each row as int8 codes times a float32 scale (~4x
+    smaller), and pq splits rows into `n_subspaces` parts and stores each part as the id of one of
+    256 centroids (one byte per part: 8x smaller with the default of two dimensions per part).
+    Scores are computed for `block_size` words at a time, so the float32 matrix never exists and
+    the decoded block stays in the CPU cache.
+    """
+
+    def __init__(self, words, codes, kind, scales=None, codebooks=None, block_size=None, **kwargs):
+        assert kind in KINDS, kind
+        kwargs["normalized"] = True
+        super().__init__(words, codes, **kwargs)
+        self.kind = kind
+        self.scales = scales
+        self.codebooks = codebooks
+        # decoded float16/int8 blocks should fit the cache, PQ blocks should amortize a lookup per part
+        self.block_size = block_size or (32768 if kind == "pq" else 2048)
+
+    @classmethod
+    def build(cls, index, kind, n_subspaces=None, sample_size=65536, random_state=0, **kwargs):
+        vectors = np.asarray(index.vectors, dtype=np.float32)
+        scales = codebooks = None
+        if kind == "float16":
+            codes = vectors.astype(np.float16)
+        elif kind == "int8":
+            scales = np.abs(vectors).max(axis=1) / 127
+            scales[scales == 0] = 1
+            codes = np.round(vectors / scales[:, None]).astype(np.int8)
+            scales = scales.astype(np.float32)
+        elif kind == "pq":
+            dim = vectors.shape[1]
+            n_subspaces = n_subspaces or (dim // 2 if dim % 2 == 0 else dim)
+            assert dim % n_subspaces == 0, f"{n_subspaces} subspaces do not divide {dim} dimensions"
+            parts = vectors.reshape(len(vectors), n_subspaces, -1)
+            rng = np.random.default_rng(random_state)
+            sample = parts[rng.choice(len(vectors), size=min(len(vectors), sample_size), replace=False)]
+            n_centroids = min(256, len(sample))
+            codebooks = np.stack(
+                [kmeans(sample[:, j], n_centroids, random_state=random_state) for j in range(n_subspaces)]
+            ).astype(np.float32)
+            codes = [nearest_centroids(parts[:, j], codebooks[j]).astype(np.uint8) for j in range(n_subspaces)]
+            # column-major, so that the codes of one part are contiguous for the lookups in `scores`
+            codes = np.asfortranarray(np.stack(codes, axis=1))
+        else:
+            raise ValueError(f"unknown quantization {kind!r}, expected one of {KINDS}")
+        kwargs.update(embed=index.embed, form_ids=index.form_ids, form_names=index.form_names)
+        return cls(index.words, codes, kind, scales, codebooks, **kwargs)
+
+    @property
+    def dim(self):
+        return self.codebooks.shape[0] * self.codebooks.shape[2] if self.kind == "pq" else self.vectors.shape[1]
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.vectors, self.scales, self.codebooks) if a is not None)
+
+    def decode(self, start, stop):
+        """float32 vectors of words start..stop-1."""
+        codes = self.vectors[start:stop]
+        if self.kind == "float16":
+            return codes.astype(np.float32)
+        if self.kind == "int8":
+            return codes.astype(np.float32) * self.scales[start:stop, None]
+        return self.codebooks[np.arange(codes.shape[1]), codes].reshape(len(codes), -1)
+
+    def stored_vector(self, i):
+        return self.decode(i, i + 1)[0]
+
+    def scores(self, queries):
+        scores = np.empty((len(queries), len(self)), dtype=np.float32)
+        if self.kind == "pq":
+            # asymmetric distances: the query's dot products with all centroids, then one lookup per part
+            n_subspaces = self.codebooks.shape[0]
+            tables = np.einsum("qjd,jcd->jqc", queries.reshape(len(queries), n_subspaces, -1), self.codebooks)
+        for start in range(0, len(self), self.block_size):
+            stop = min(start + self.block_size, len(self))
+            codes = self.vectors[start:stop]
+            if self.kind == "float16":
+                scores[:, start:stop] = queries @ codes.astype(np.float32).T
+            elif self.kind == "int8":
+                scores[:, start:stop] = (queries @ codes.astype(np.float32).T) * self.scales[start:stop]
+            else:
+                block = scores[:, start:stop]
+                block[:] = 0
+                for j, table in enumerate(tables):
+                    block += np.take(table, codes[:, j], axis=1)
+        return scores
+
+    def save(self, directory):
+        super().save(directory)
+        directory = Path(directory)
+        if self.scales is not None:
+            np.save(directory / "scales.npy", self.scales)
+        if self.codebooks is not None:
+            np.save(directory / "codebooks.npy", self.codebooks)
+        (directory / "quantization.json").write_text(json.dumps({"kind": self.kind}))
+
+    @classmethod
+    def load(cls, directory, mmap_mode="r", **kwargs):
+        directory = Path(directory)
+        kind = json.loads((directory / "quantization.json").read_text())["kind"]
+        for name in ("scales", "codebooks"):
+            if (directory / f"{name}.npy").exists():
+                kwargs[name] = np.load(directory / f"{name}.npy", mmap_mode=mmap_mode)
+        return super().load(directory, mmap_mode, kind=kind, **kwargs)
+
+
+def evaluate(index, quantized, sentences, k):
+    """recall@k of every quantized index against the float32 `index`, time per query and memory."""
+    started = time.perf_counter()
+    exact = index.nearest(sentences, k)
+    elapsed = time.perf_counter() - started
+    report = [
+        {"kind": "float32", "recall": 1.0, "ms": elapsed / len(sentences) * 1e3, "mb": index.vectors.nbytes / 2**20}
+    ]
+    for q in quantized:
+        started = time.perf_counter()
+        approximate = q.nearest(sentences, k)
+        elapsed = time.perf_counter() - started
+        report.append(
+            {
+                "kind": q.kind,
+                "recall": recall_at_k(exact, approximate),
+                "ms": elapsed / len(sentences) * 1e3,
+                "mb": q.nbytes / 2**20,
+            }
+        )
+    return report
+
+
+def quantized_path(model_path, kind):
+    return Path(model_path).with_suffix(f".{kind}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("model", type=Path, help="fastText .bin model, the indexes are saved next to it")
+    parser.add_argument("--kinds", nargs="+", default=list(KINDS), choices=KINDS)
+    parser.add_argument("--subspaces", type=int, help="PQ parts, by default half the dimension")
+    parser.add_argument("--words", type=Path, nargs="*", help="held-out hat words, one per line")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    import fasttext
+
+    index = VectorIndex.from_fasttext(fasttext.load_model(str(args.model)))
+    quantized = [QuantizedIndex.build(index, kind, args.subspaces) for kind in args.kinds]
+    if args.words:
+        hat_words = {line.strip() for path in args.words for line in path.read_text().splitlines() if line.strip()}
+        sentences = [[word] for word in sorted(hat_words) if word in index.word_ids]
+    else:
+        rng = np.random.default_rng(0)
+        size = min(args.queries, len(index))
+        sentences = [[index.words[i]] for i in rng.choice(len(index), size=size, replace=False)]
+    print(f"{len(index)} words, {index.dim} dims, recall@{args.k} of {len(sentences)} queries")
+    for row in evaluate(index, quantized, sentences, args.k):
+        print(f"{row['kind']:>8} recall={row['recall']:.3f} {row['ms']:.3f} ms/query {row['mb']:.1f} MB")
+    for q in quantized:
+        q.save(quantized_path(args.model, q.kind))
+        print(f"saved to {quantized_path(args.model, q.kind)}")
+
+
+if __name__ == "__main__":
+    main()
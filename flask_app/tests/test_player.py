@@ -10,3 +10,296 @@ def test_player_guess():
 
     words = player.guess(words=["taste", "cake", "sweet"], n_words=5)
     print(words)
+
+
+def test_batch_endpoints():
+    import json
+
+    from app import app, player
+
+    client = app.test_client()
+    queries = [{"words": ["taste"], "n_words": 3}, {"words": ["taste", "cake"], "n_words": 2}]
+    response = client.post("/guess_batch", json=queries)
+    assert response.status_code == 200
+    assert json.loads(response.data) == [player.guess(words=q["words"], n_words=q["n_words"]) for q in queries]
+
+    response = client.post("/explain_batch", json=[{"word": "test", "n_words": 4}])
+    assert json.loads(response.data) == [player.explain(word="test", n_words=4)]
+
+
+def test_vector_player_matches_brute_force():
+    import numpy as np
+    from player import LocalVectorPlayer
+    from vectors import VectorIndex
+
+    rng = np.random.default_rng(0)
+    words = [f"word{chr(97 + i % 26)}{chr(97 + i // 26)}" for i in range(200)] + ["Worda", "worda!", "42"]
+    vectors = rng.normal(size=(len(words), 8))
+    player = LocalVectorPlayer(VectorIndex(words, vectors, chunk_size=3))
+
+    def brute_force(sentence, n_words):
+        unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        query = unit[[words.index(w) for w in sentence]].mean(axis=0)
+        result, seen = [], {w.lower() for w in sentence}
+        for i in np.argsort(-(unit @ query), kind="stable"):
+            form = "".join(c for c in words[i].lower() if c.isalpha())
+            if form and form not in seen:
+                seen.add(form)
+                result.append(words[i])
+        return result[:n_words]
+
+    sentences = [["wordaa"], ["wordba", "wordca"], ["Worda"], ["wordzg", "wordaa", "wordbb"]]
+    for n_words in (1, 10, 25):
+        expected = [brute_force(sentence, n_words) for sentence in sentences]
+        assert player.guess_batch(sentences, n_words) == expected
+        assert [player.guess(sentence, n_words) for sentence in sentences] == expected
+    assert player.explain("wordaa", 30) == brute_force(["wordaa"], 30)
+    assert len(player.explain("wordaa", 500)) == 200
+
+
+def test_vector_player_sessions_match_guess():
+    import numpy as np
+    from ann import IVFIndex
+    from player import LocalFasttextPlayer, LocalVectorPlayer
+    from quantize import QuantizedIndex
+    from vectors import VectorIndex
+
+    class FakeFasttext:
+        def __init__(self, words, vectors):
+            self.vectors = dict(zip(words, vectors))
+
+        def get_words(self):
+            return list(self.vectors)
+
+        def get_word_vector(self, word):
+            return self.vectors.get(word, np.zeros(8))
+
+    rng = np.random.default_rng(0)
+    words = [f"{a}{b}" for a in "abcdefghij" for b in "abcdefghijklmnopqrst"]
+    model = FakeFasttext(words, rng.normal(size=(len(words), 8)))
+    index = VectorIndex.from_fasttext(model)
+    players = [
+        LocalVectorPlayer(index),
+        LocalVectorPlayer(IVFIndex.build(index, n_lists=5, nprobe=2)),
+        LocalVectorPlayer(QuantizedIndex.build(index, "int8")),
+        LocalFasttextPlayer(model, index),
+    ]
+    sentence = ["ab", "cd", "Ab", "unknown", "ef"]
+    for player in players:
+        for i, word in enumerate(sentence, 1):
+            assert player.guess_next("s", word, 10) == player.guess(sentence[:i], 10)
+        player.end_session("s")
+        assert getattr(player, "vector_player", player).sessions == {}
+    # without an index the fastText player has no sessions
+    assert LocalFasttextPlayer(model).guess_next is None
+
+
+def test_ivf_index_recall(tmp_path):
+    import numpy as np
+    from ann import IVFIndex, evaluate, recall_at_k
+    from vectors import VectorIndex, load_index
+
+    rng = np.random.default_rng(0)
+    words = [f"{a}{b}{c}" for a in "abcdefghij" for b in "abcdefghij" for c in "abcdefghijklmnopqrst"]
+    centers = rng.normal(size=(20, 16))
+    vectors = centers[rng.integers(0, len(centers), len(words))] + rng.normal(size=(len(words), 16)) * 0.5
+    exact = VectorIndex(words, vectors)
+    index = IVFIndex.build(exact, n_lists=20, nprobe=2)
+    sentences = [[words[i]] for i in rng.choice(len(words), size=50, replace=False)] + [["abc", "cba"]]
+
+    assert recall_at_k(exact.nearest(sentences, 15), index.nearest(sentences, 15, nprobe=20)) == 1
+    report = evaluate(index, sentences, 15, [1, 2, 20])
+    assert [row["nprobe"] for row in report] == [None, 1, 2, 20]
+    assert 0 < report[1]["recall"] <= report[2]["recall"] <= report[3]["recall"] == 1
+    # query words are never returned, as in the exact search
+    assert not {"abc", "cba"} & set(index.nearest(sentences, 15)[-1])
+
+    index.save(tmp_path / "model.ivf")
+    loaded = load_index(tmp_path / "model.ivf")
+    assert isinstance(loaded, IVFIndex) and isinstance(loaded.vectors, np.memmap)
+    assert loaded.nprobe == 2
+    assert loaded.nearest(sentences, 15) == index.nearest(sentences, 15)
+
+
+def test_ivf_index_skips_empty_lists():
+    import numpy as np
+    from ann import IVFIndex
+    from vectors import VectorIndex
+
+    words = ["north", "east", "south"]
+    exact = VectorIndex(words, np.array([[0.0, 1.0], [1.0, 0.0], [0.0, -1.0]]))
+    # the first list, whose centroid is the closest to every query, is empty
+    centroids = np.array([[1.0, 1.0], [1.0, 0.0], [0.0, 1.0], [0.0, -1.0]]) / [[2**0.5], [1], [1], [1]]
+    index = IVFIndex(["east", "north", "south"], exact.vectors[[1, 0, 2]], centroids, [0, 0, 1, 2, 3], nprobe=1)
+    # the list of "north" is probed instead of the empty one, there is nothing else in it
+    assert index.nearest([["north"]], 2) == [[]]
+    assert index.nearest([["north"]], 2, nprobe=2) == [["east"]]
+
+
+def test_quantized_index_recall(tmp_path):
+    import numpy as np
+    from quantize import QuantizedIndex, evaluate
+    from vectors import VectorIndex, load_index
+
+    rng = np.random.default_rng(0)
+    words = [f"{a}{b}{c}" for a in "abcdefghij" for b in "abcdefghij" for c in "abcdefghijklmnopqrst"]
+    centers = rng.normal(size=(20, 16))
+    vectors = centers[rng.integers(0, len(centers), len(words))] + rng.normal(size=(len(words), 16)) * 0.5
+    exact = VectorIndex(words, vectors)
+    quantized = [QuantizedIndex.build(exact, kind, block_size=300) for kind in ("float16", "int8", "pq")]
+    sentences = [[words[i]] for i in rng.choice(len(words), size=50, replace=False)] + [["abc", "cba"]]
+
+    report = evaluate(exact, quantized, sentences, 15)
+    assert [row["kind"] for row in report] == ["float32", "float16", "int8", "pq"]
+    assert [row["recall"] > minimum for row, minimum in zip(report[1:], (0.98, 0.95, 0.6))] == [True] * 3
+    # codebooks and scales take a fixed amount of memory on top
+    assert [exact.vectors.nbytes // q.vectors.nbytes for q in quantized] == [2, 4, 8]
+    assert not {"abc", "cba"} & set(quantized[2].nearest(sentences, 15)[-1])
+
+    for index in quantized:
+        index.save(tmp_path / index.kind)
+        loaded = load_index(tmp_path / index.kind)
+        assert isinstance(loaded, QuantizedIndex) and isinstance(loaded.vectors, np.memmap)
+        assert loaded.nearest(sentences, 15) == index.nearest(sentences, 15)
+
+
+def test_memory_mapped_vector_player(tmp_path, monkeypatch):
+    import numpy as np
+    from app import create_player
+    from player import LocalDummyPlayer
+    from vectors import VectorIndex
+
+    rng = np.random.default_rng(0)
+    words = ["cat", "Cat", "kitten", "dog", "puppy", "mouse", "cheese", "7"]
+    index = VectorIndex(words, rng.normal(size=(len(words), 8)))
+    index.save(tmp_path / "model")
+
+    monkeypatch.setenv("MODEL_PATH", str(tmp_path / "model"))
+    player = create_player()
+    assert isinstance(player.index.vectors, np.memmap)
+    assert not player.index.vectors.flags.writeable
+    assert player.explain("cat", 5) == index.nearest([["cat"]], 5)[0]
+    assert player.guess(["dog", "mouse"], 3) == index.nearest([["dog", "mouse"]], 3)[0]
+
+    monkeypatch.delenv("MODEL_PATH")
+    assert isinstance(create_player(), LocalDummyPlayer)
+
+
+def test_repeated_queries_are_cached():
+    import json
+
+    from app import app, player
+    from cache import CachedPlayer
+
+    assert isinstance(player, CachedPlayer)
+    player.cache.clear()
+    client = app.test_client()
+    for _ in range(3):
+        client.get("/guess", query_string={"words": ["taste", "cake"], "n_words": 2})
+    assert json.loads(client.get("/cache_info").data) == {"hits": 2, "misses": 1, "size": 1, "maxsize": 4096}
+
+
+def test_batch_endpoints_make_one_batched_call(tmp_path, monkeypatch):
+    import json
+
+    import app
+    import numpy as np
+    from cache import CachedPlayer
+    from vectors import VectorIndex
+
+    rng = np.random.default_rng(0)
+    words = [f"{a}{b}" for a in "abcdefghij" for b in "abcdefghij"]
+    VectorIndex(words, rng.normal(size=(len(words), 8))).save(tmp_path / "model")
+    monkeypatch.setenv("MODEL_PATH", str(tmp_path / "model"))
+    monkeypatch.setenv("PLAYER_BATCH_WAIT_MS", "50")
+    player = CachedPlayer(app.create_player())
+    inner = player.player.player
+    calls = []
+
+    def counted(method):
+        def call(queries, n_words):
+            calls.append(len(queries))
+            return method(queries, n_words)
+
+        return call
+
+    for name in ("explain_batch", "guess_batch"):
+        monkeypatch.setattr(inner, name, counted(getattr(inner, name)))
+    monkeypatch.setattr(app, "player", player)
+
+    client = app.app.test_client()
+    queries = [{"words": [words[i], words[i + 1]], "n_words": 3} for i in range(10)]
+    answers = json.loads(client.post("/guess_batch", json=queries).data)
+    assert answers == [inner.guess(q["words"], 3) for q in queries]
+    client.post("/explain_batch", json=[{"word": word, "n_words": 3} for word in words[:10]])
+    assert calls == [10, 10]
+    # only the new queries are asked, the others come from the cache
+    client.post("/guess_batch", json=queries + [{"words": ["aa"], "n_words": 3}])
+    assert calls == [10, 10, 1]
+
+
+def test_asgi_handlers_match_flask():
+    import asyncio
+    import json
+
+    from app import app as flask_app
+    from asgi import app
+
+    async def call(method, path, query_string=b"", body=b""):
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": method, "path": path, "query_string": query_string}
+        await app(scope, receive, send)
+        return sent[0]["status"], json.loads(sent[1]["body"])
+
+    client = flask_app.test_client()
+    status, words = asyncio.run(call("GET", "/guess", b"words=taste&words=cake&n_words=3"))
+    assert status == 200
+    assert words == json.loads(client.get("/guess?words=taste&words=cake&n_words=3").data)
+    queries = [{"word": "test", "n_words": 2}]
+    status, words = asyncio.run(call("POST", "/explain_batch", body=json.dumps(queries).encode()))
+    assert words == json.loads(client.post("/explain_batch", json=queries).data)
+    assert asyncio.run(call("GET", "/explain"))[0] == 400
+    assert asyncio.run(call("GET", "/missing"))[0] == 404
+
+
+def test_micro_batcher_groups_concurrent_requests():
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    import pytest
+    from batching import BatchingPlayer, MicroBatcher
+    from player import LocalDummyPlayer
+
+    batches = []
+
+    class RecordingPlayer(LocalDummyPlayer):
+        def guess_batch(self, sentences, n_words):
+            batches.append(len(sentences))
+            return [[" ".join(words)][:n_words] for words in sentences]
+
+    player = BatchingPlayer(RecordingPlayer(), max_batch_size=8, max_wait=0.2)
+    barrier = threading.Barrier(20)
+
+    def guess(i):
+        barrier.wait()
+        return player.guess([f"word{i}"], 1)
+
+    with ThreadPoolExecutor(20) as pool:
+        assert list(pool.map(guess, range(20))) == [[f"word{i}"] for i in range(20)]
+    assert sum(batches) == 20 and max(batches) <= 8 and len(batches) < 20
+    # the default hooks answer one query at a time
+    assert BatchingPlayer(LocalDummyPlayer()).explain("test", 2) == LocalDummyPlayer().explain("test", 2)
+
+    def fail(items):
+        raise ValueError("broken model")
+
+    with pytest.raises(ValueError, match="broken model"):
+        MicroBatcher(fail).submit("item")
@@ -0,0 +1,208 @@
+import re
+from functools import cached_property
+from pathlib import Path
+
+import numpy as np
+
+NON_LETTERS = re.compile(r"[\W\d]")
+
+
+def normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms < 1e-8] = 1
+    return matrix / norms
+
+
+def distinct_top_k(scores, form_ids, k, candidates=None):
+    """Positions of the `k` best scores with distinct `form_ids`, best first; -inf scores are banned.
+
+    `candidates` are positions which are expected to contain the answer, they are extended to all the
+    positions if they are not enough.
+    """
+    n = len(scores)
+    if candidates is None:
+        fetch = min(n, 2 * k)
+        candidates = np.argpartition(scores, n - fetch)[-fetch:] if 0 < fetch < n else np.arange(n)
+    while True:
+        ordered = candidates[np.argsort(-scores[candidates], kind="stable")]
+        ordered = ordered[scores[ordered] > -np.inf]
+        _, first = np.unique(form_ids[ordered], return_index=True)
+        distinct = ordered[np.sort(first)]
+        if len(distinct) >= k or len(candidates) == n:
+            return distinct[:k]
+        fetch = min(n, 2 * len(candidates))
+        candidates = np.argpartition(scores, n - fetch)[-fetch:] if fetch < n else np.arange(n)
+
+
+class VectorIndex:
+    """Exact top-k cosine neighbours over a fixed vocabulary.
+
+    The word vectors are kept as one L2-normalized float32 matrix, so a batch of queries is a single
+    matmul followed by `argpartition`. Words which clean to the same game word ("Cat", "cat!") are
+    returned once, and neither the query words nor the `banned` words are returned in any form.
+    """
+
+    # `scores` covers the whole vocabulary, so the scores of a sentence are the sum of its words' scores
+    exhaustive = True
+
+    def __init__(self, words, vectors, embed=None, chunk_size=256, normalized=False, form_ids=None, form_names=None):
+        self.words = list(words)
+        # normalized vectors are used as they are, so a memory-mapped matrix stays memory-mapped
+        self.vectors = vectors if normalized else normalize_rows(np.asarray(vectors, dtype=np.float32))
+        if form_ids is None:
+            # id of the cleaned form of every word, words with the same form are duplicates
+            forms = {}
+            form_ids = np.array([forms.setdefault(self.form(word), len(forms)) for word in self.words], dtype=np.int64)
+            form_names = list(forms)
+        self.form_ids = form_ids
+        self.form_names = form_names
+        # vectors of out-of-vocabulary query words, e.g. fastText's get_word_vector
+        self.embed = embed
+        self.chunk_size = chunk_size
+
+    @cached_property
+    def word_ids(self):
+        return {word: i for i, word in enumerate(self.words)}
+
+    @cached_property
+    def form_lookup(self):
+        return {form: i for i, form in enumerate(self.form_names)}
+
+    @cached_property
+    def form_members(self):
+        # words of form i are form_order[form_offsets[i]:form_offsets[i + 1]]
+        form_order = np.argsort(self.form_ids, kind="stable")
+        form_offsets = np.concatenate([[0], np.cumsum(np.bincount(self.form_ids, minlength=len(self.form_names)))])
+        return form_order, form_offsets
+
+    @classmethod
+    def from_fasttext(cls, model, **kwargs):
+        words = [word for word in model.get_words() if word != "</s>"]
+        vectors = np.stack([model.get_word_vector(word) for word in words])
+        return cls(words, vectors, embed=model.get_word_vector, **kwargs)
+
+    def save(self, directory):
+        """Flat files which `load` memory-maps: vectors.npy and forms.npy (form id of every word), and
+        words.txt and forms.txt with one word and one form per line."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / "vectors.npy", np.asarray(self.vectors))
+        np.save(directory / "forms.npy", self.form_ids)
+        (directory / "words.txt").write_text("\n".join(self.words), encoding="utf-8")
+        (directory / "forms.txt").write_text("\n".join(self.form_names), encoding="utf-8")
+
+    @classmethod
+    def load(cls, directory, mmap_mode="r", **kwargs):
+        """Open a saved index without reading the vectors, the OS pages them in on demand and shares
+        them between the processes which open the same files."""
+        directory = Path(directory)
+        words = (directory / "words.txt").read_text(encoding="utf-8").split("\n")
+        vectors = np.load(directory / "vectors.npy", mmap_mode=mmap_mode)
+        form_ids = np.load(directory / "forms.npy", mmap_mode=mmap_mode)
+        form_names = (directory / "forms.txt").read_text(encoding="utf-8").split("\n")
+        return cls(words, vectors, normalized=True, form_ids=form_ids, form_names=form_names, **kwargs)
+
+    def warm_up(self):
+        """Build the lazy lookups now, e.g. in a gunicorn master before it forks the workers."""
+        self.word_ids, self.form_lookup, self.form_members
+        return self
+
+    def __len__(self):
+        return len(self.words)
+
+    @property
+    def dim(self):
+        return self.vectors.shape[1]
+
+    def stored_vector(self, i):
+        return self.vectors[i]
+
+    def scores(self, queries):
+        """Cosine similarities of unit `queries` with every word, one row per query."""
+        return queries @ self.vectors.T
+
+    def word_vector(self, word):
+        i = self.word_ids.get(word)
+        if i is not None:
+            return self.stored_vector(i)
+        if self.embed is not None:
+            return normalize_rows(np.asarray(self.embed(word), dtype=np.float32)[None])[0]
+        return None
+
+    def query_vectors(self, sentences):
+        """One query vector per sentence: the mean of its normalized word vectors."""
+        queries = np.zeros((len(sentences), self.dim), dtype=np.float32)
+        for i, sentence in enumerate(sentences):
+            vectors = [v for v in map(self.word_vector, sentence) if v is not None]
+            if vectors:
+                queries[i] = np.mean(vectors, axis=0)
+        return queries
+
+    @staticmethod
+    def form(word):
+        return NON_LETTERS.sub("", word.lower())
+
+    def banned_ids(self, words):
+        # words without letters clean to "" and are never valid either
+        form_order, form_offsets = self.form_members
+        form_ids = [self.form_lookup.get(self.form(word)) for word in ["", *words]]
+        banned = [form_order[slice(form_offsets[i], form_offsets[i + 1])] for i in form_ids if i is not None]
+        return np.concatenate(banned) if banned else np.array([], dtype=np.int64)
+
+    def nearest(self, sentences, k, banned=None, **search_kwargs):
+        """Top `k` words for every sentence (a list of words), most similar first."""
+        if k <= 0:
+            return [[] for _ in sentences]
+        if banned is None:
+            banned = [()] * len(sentences)
+        results = []
+        for start in range(0, len(sentences), self.chunk_size):
+            stop = start + self.chunk_size
+            chunk = sentences[start:stop]
+            queries = normalize_rows(self.query_vectors(chunk))
+            banned_ids = [self.banned_ids([*sentence, *extra]) for sentence, extra in zip(chunk, banned[start:stop])]
+            results.extend(self.search(queries, banned_ids, k, **search_kwargs))
+        return results
+
+    def search(self, queries, banned_ids, k):
+        """Top `k` words for every unit query vector, except the words of its `banned_ids`."""
+        scores = self.scores(queries)
+        for row, ids in zip(scores, banned_ids):
+            row[ids] = -np.inf
+        return self.top_k(scores, k)
+
+    def top_k(self, scores, k):
+        """Top `k` words for every row of `scores` (one score per word), -inf scores are banned."""
+        # over-fetch, so that usually there are k distinct forms left after dropping duplicates
+        n = len(self)
+        fetch = min(n, 2 * k)
+        if 0 < fetch < n:
+            candidates = np.argpartition(scores, n - fetch, axis=1)[:, -fetch:]
+        else:
+            candidates = np.broadcast_to(np.arange(n), (len(scores), n))
+        return [
+            [self.words[i] for i in distinct_top_k(row, self.form_ids, k, row_candidates)]
+            for row, row_candidates in zip(scores, candidates)
+        ]
+
+
+def load_index(directory, **kwargs):
+    """VectorIndex, IVFIndex or QuantizedIndex, whichever was saved to the directory by `save`."""
+    if (Path(directory) / "quantization.json").exists():
+        from quantize import QuantizedIndex
+
+        return QuantizedIndex.load(directory, **kwargs)
+    if (Path(directory) / "centroids.npy").exists():
+        from ann import IVFIndex
+
+        return IVFIndex.load(directory, **kwargs)
+    return VectorIndex.load(directory, **kwargs)
+
+
+if __name__ == "__main__":
+    # export a fastText model: python vectors.py model.bin model_dir
+    import sys
+
+    import fasttext
+
+    VectorIndex.from_fasttext(fasttext.load_model(sys.argv[1])).save(sys.argv[2])
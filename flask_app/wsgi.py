@@ -0,0 +1,10 @@
+"""WSGI entry point: gunicorn -c gunicorn.conf.py wsgi:app
+
+With `preload_app` the app and its model are loaded once in the gunicorn master and the forked
+workers share them copy-on-write.
+"""
+
+from app import app, player  # noqa: F401
+
+# build the lazy lookups before the fork, so that workers do not build their own copies
+getattr(player, "warm_up", lambda: None)()
@@ -11,7 +11,8 @@ from emoji import emojize
 from flask_app.player import LocalDummyPlayer, LocalFasttextPlayer  # noqa: F401
 from settings import CRITERIA, N_EXPLAIN_WORDS, N_GUESSING_WORDS, VOCAB_PATH
 from the_hat_game.game import Game
-from the_hat_game.loggers import logger
+from the_hat_game.loggers import logger, setup_logging
+from the_hat_game.nltk_setup import ensure_nltk_data
 from the_hat_game.players import PlayerDefinition, RemotePlayer
 
 if __name__ == "__main__":
@@ -19,6 +20,9 @@ if __name__ == "__main__":
     # uncomment this to get reproducible runs:
     # random.seed(0)
 
+    setup_logging()
+    ensure_nltk_data()
+
     logfile = f"logs/game_run_{datetime.now().strftime('%y%m%d_%H%M')}.log"
     single_handler = logging.FileHandler(logfile, mode="w")
     single_handler.setLevel(logging.DEBUG)
@@ -0,0 +1,95 @@
+"""Headless tournament runner: a game from a config file, split into shards that run anywhere.
+
+    python run_tournament.py play tournament.json --shard 0/4 --output shards/0.json   # on every machine
+    python run_tournament.py merge shards/*.json --output results.json
+    python run_tournament.py launch tournament.json --shards 4 --output-dir shards     # all shards on this machine
+
+Shard i of n plays the iterations whose number in the game's plan is i modulo n, and the plan only
+depends on the config, so the merged scores are the ones a single run of the game would give.
+See the_hat_game.sharding.load_config for the config format.
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+from the_hat_game.loggers import dumps
+from the_hat_game.sharding import load_config, load_shard, merge_shards, play_shard, save_shard
+
+
+def parse_shard(value):
+    shard, n_shards = value.split("/")
+    return int(shard), int(n_shards)
+
+
+def play(args):
+    shard, n_shards = args.shard
+    result = play_shard(load_config(args.config), shard, n_shards, args.workers, args.per_team_limit)
+    save_shard(result, args.output)
+    print(f"shard {shard}/{n_shards}: {len(result['game_info']['iterations'])} iterations saved to {args.output}")
+
+
+def merge(args):
+    scores_dict, scores, scores_status = merge_shards([load_shard(path) for path in args.shards])
+    scores_status["total"] = scores.sum(axis=0)
+    scores_status = scores_status.sort_values("total", ascending=False)
+    print(scores_status.to_string())
+    if args.output:
+        results = {"scores": scores_dict, "iteration_scores": scores.to_dict("records")}
+        args.output.write_bytes(dumps(results))
+
+
+def launch(args):
+    output_dir = args.output_dir
+    paths = [output_dir / f"shard-{i:03d}.json" for i in range(args.shards)]
+    options = ["--workers", str(args.workers)]
+    if args.per_team_limit is not None:
+        options += ["--per-team-limit", str(args.per_team_limit)]
+    processes = [
+        subprocess.Popen(
+            [
+                *(sys.executable, __file__, "play", str(args.config), "--shard", f"{i}/{args.shards}"),
+                *("--output", str(path), *options),
+            ]
+        )
+        for i, path in enumerate(paths)
+    ]
+    failed = [i for i, process in enumerate(processes) if process.wait() != 0]
+    if failed:
+        sys.exit(f"shards {failed} failed")
+    merge(argparse.Namespace(shards=paths, output=args.output))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    play_parser = commands.add_parser("play", help="play one shard of a tournament")
+    play_parser.add_argument("config", type=Path)
+    play_parser.add_argument("--shard", type=parse_shard, default=(0, 1), help="index/count, e.g. 0/4")
+    play_parser.add_argument("--output", type=Path, required=True)
+    play_parser.add_argument("--workers", type=int, default=4, help="iterations played at the same time")
+    play_parser.add_argument("--per-team-limit", type=int)
+    play_parser.set_defaults(function=play)
+
+    merge_parser = commands.add_parser("merge", help="combine the outputs of all shards")
+    merge_parser.add_argument("shards", type=Path, nargs="+")
+    merge_parser.add_argument("--output", type=Path)
+    merge_parser.set_defaults(function=merge)
+
+    launch_parser = commands.add_parser("launch", help="play all shards in local processes and merge them")
+    launch_parser.add_argument("config", type=Path)
+    launch_parser.add_argument("--shards", type=int, default=4)
+    launch_parser.add_argument("--output-dir", type=Path, default=Path("shards"))
+    launch_parser.add_argument("--output", type=Path)
+    launch_parser.add_argument("--workers", type=int, default=4)
+    launch_parser.add_argument("--per-team-limit", type=int)
+    launch_parser.set_defaults(function=launch)
+
+    args = parser.parse_args()
+    args.function(args)
+
+
+if __name__ == "__main__":
+    main()
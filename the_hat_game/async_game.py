@@ -0,0 +1,126 @@
+import asyncio
+import threading
+from contextlib import contextmanager
+
+from the_hat_game.async_players import AsyncRemotePlayer
+from the_hat_game.game import Game
+
+
+class EventLoopThread:
+    """asyncio event loop running in a background thread for the duration of a game."""
+
+    def __init__(self):
+        self.loop = None
+        self._thread = None
+        self.started = False
+
+    def start(self):
+        if not self.started:
+            self.loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self.loop.run_forever, name="hat-game-loop", daemon=True)
+            self._thread.start()
+            self.started = True
+        return self
+
+    def stop(self):
+        if self.started:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+            self.loop.close()
+            self.loop = None
+            self._thread = None
+            self.started = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def submit(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def call(self, coroutine):
+        return self.submit(coroutine).result()
+
+
+class AsyncGame(Game):
+    """Game driver which talks to AsyncRemotePlayer teams on a single event loop.
+
+    All guesses of an attempt are sent concurrently and share one deadline of `attempt_timeout`
+    seconds: teams which did not answer by then are treated as failed calls. Other players are
+    asked the same way as in Game.
+    """
+
+    def __init__(self, *args, attempt_timeout=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if attempt_timeout is None:
+            attempt_timeout = max([p.api.timeout for p in self.players if self.is_async(p.api)], default=1)
+        self.attempt_timeout = attempt_timeout
+        self.event_loop = EventLoopThread()
+
+    @staticmethod
+    def is_async(api):
+        return isinstance(api, AsyncRemotePlayer)
+
+    def run(self, verbose=False, complete=False):
+        with self.players_loop():
+            super().run(verbose=verbose, complete=complete)
+
+    @contextmanager
+    def players_loop(self):
+        with self.event_loop:
+            try:
+                yield self.event_loop
+            finally:
+                self.event_loop.call(self.close_players())
+
+    async def close_players(self):
+        await asyncio.gather(*[p.api.close() for p in self.players if self.is_async(p.api)])
+
+    async def explain_before_deadline(self, player, word, n_words):
+        try:
+            return await asyncio.wait_for(player.explain(word, n_words), timeout=self.attempt_timeout)
+        except asyncio.TimeoutError:
+            return []
+
+    async def guess_before_deadline(self, guessing_players, sentence):
+        tasks = {
+            player.name: asyncio.ensure_future(player.api.guess(sentence, self.n_guessing_words))
+            for player in guessing_players
+        }
+        if not tasks:
+            return {}
+        done, pending = await asyncio.wait(tasks.values(), timeout=self.attempt_timeout)
+        for task in pending:
+            task.cancel()
+        players_guesses = {}
+        for name, task in tasks.items():
+            if task in done:
+                players_guesses[name] = task.result()
+            else:
+                # a missed deadline took the whole attempt, as a failed RemotePlayer.guess does
+                players_guesses[name] = {"word_list": [], "time": self.attempt_timeout, "code": None}
+        return players_guesses
+
+    def ask_explaining_player(self, player, word, n_words):
+        if not self.is_async(player):
+            return super().ask_explaining_player(player, word, n_words)
+        if not self.event_loop.started:
+            with self.players_loop():
+                return self.event_loop.call(self.explain_before_deadline(player, word, n_words))
+        return self.event_loop.call(self.explain_before_deadline(player, word, n_words))
+
+    def ask_guessing_players(self, guessing_players, sentence, session=None):
+        async_players = [p for p in guessing_players if self.is_async(p.api)]
+        if not async_players:
+            return super().ask_guessing_players(guessing_players, sentence, session)
+        if not self.event_loop.started:
+            with self.players_loop():
+                return self.ask_guessing_players(guessing_players, sentence, session)
+
+        future = self.event_loop.submit(self.guess_before_deadline(async_players, sentence))
+        other_players = [p for p in guessing_players if not self.is_async(p.api)]
+        players_guesses = super().ask_guessing_players(other_players, sentence, session) if other_players else {}
+        players_guesses.update(future.result())
+        return players_guesses
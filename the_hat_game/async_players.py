@@ -0,0 +1,117 @@
+import asyncio
+
+import aiohttp
+import requests
+
+from the_hat_game.loggers import logger
+from the_hat_game.players import HIDE_WARNINGS, AbstractPlayer, ValidationError, validate_word_list
+
+
+class AsyncRemotePlayer(AbstractPlayer):
+    """asyncio counterpart of RemotePlayer: `explain` and `guess` are coroutines.
+
+    All calls go through one aiohttp session per team which keeps at most `max_connections`
+    keep-alive connections to the team's service.
+    """
+
+    deterministic = False
+
+    def __init__(self, url, timeout=1, max_connections=1):
+        self.url = url
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._session = None
+        self._session_loop = None
+        self.ping()
+
+    def ping(self, timeout=60):
+        """Whether the service answers its index page."""
+        try:
+            response = requests.get(self.url, timeout=timeout)
+            return response.status_code == 200
+        except Exception as exc:
+            if not HIDE_WARNINGS:
+                logger.warning(exc)
+            return False
+
+    async def get_session(self):
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            await self.discard_session()
+            connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._session_loop = loop
+        return self._session
+
+    async def discard_session(self):
+        """Close the session opened on another event loop before it is replaced.
+
+        A session can only be closed on the loop it was opened on: a running loop closes it
+        from its own thread, an idle one is run to completion in a worker thread and the
+        connector of a closed loop is detached and closed here.
+        """
+        session, loop = self._session, self._session_loop
+        self._session = self._session_loop = None
+        if session is None or session.closed:
+            return
+        if loop.is_closed():
+            connector = session.connector
+            session.detach()
+            await connector.close()
+        elif loop.is_running():
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(session.close(), loop))
+        else:
+            await asyncio.to_thread(loop.run_until_complete, session.close())
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            self._session_loop = None
+
+    async def request(self, endpoint, params):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        session = await self.get_session()
+        async with session.get(self.url + endpoint, params=params) as response:
+            word_list = await response.json(content_type=None)
+            response_time = loop.time() - started
+            response_code = response.status
+        if not validate_word_list(word_list):
+            raise ValidationError("word_list must be a list of strings")
+        return word_list, response_time, response_code
+
+    async def explain(self, word, n_words):
+        try:
+            word_list, _, _ = await self.request("/explain", [("word", word), ("n_words", n_words)])
+        except Exception as exc:
+            # we don't need to hide ValidationError
+            if not HIDE_WARNINGS or isinstance(exc, ValidationError):
+                logger.warning(exc)
+            word_list = []
+        return word_list
+
+    async def guess(self, words, n_words):
+        started = asyncio.get_running_loop().time()
+        try:
+            params = [("words", w) for w in words] + [("n_words", n_words)]
+            word_list, response_time, response_code = await self.request("/guess", params)
+        except Exception as exc:
+            # we don't need to hide ValidationError
+            if not HIDE_WARNINGS or isinstance(exc, ValidationError):
+                logger.warning(exc)
+            word_list = []
+            # the time it took to fail, as in RemotePlayer.guess
+            response_time = asyncio.get_running_loop().time() - started
+            response_code = None
+        return {"word_list": word_list, "time": response_time, "code": response_code}
+
+    def __getstate__(self):
+        # sessions are bound to an event loop and are never shared between processes
+        state = self.__dict__.copy()
+        state["_session"] = None
+        state["_session_loop"] = None
+        return state
@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict
+
+from the_hat_game.players import PlayerWrapper
+
+
+class LRUCache:
+    """Thread-safe mapping of at most `maxsize` items, evicting the least recently used one.
+
+    With `ttl` (seconds) items older than that are treated as missing. Lookups are counted in
+    `hits` and `misses`.
+    """
+
+    def __init__(self, maxsize=4096, ttl=None, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.items)
+
+    def get(self, key):
+        """(True, value) if `key` is cached, (False, None) otherwise."""
+        with self.lock:
+            item = self.items.get(key)
+            if item is not None and (self.ttl is None or self.clock() - item[1] < self.ttl):
+                self.items.move_to_end(key)
+                self.hits += 1
+                return True, item[0]
+            if item is not None:
+                del self.items[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        with self.lock:
+            self.items[key] = (value, self.clock())
+            self.items.move_to_end(key)
+            while len(self.items) > self.maxsize:
+                self.items.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+            self.hits = self.misses = 0
+
+    def info(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.items), "maxsize": self.maxsize}
+
+
+def normalize_word(word):
+    return word.strip().lower()
+
+
+def copy_answer(answer):
+    # callers may modify the lists they get, so the cached ones are never handed out
+    if isinstance(answer, dict):
+        return {**answer, "word_list": list(answer["word_list"])}
+    return list(answer)
+
+
+class CachedPlayer(PlayerWrapper):
+    """Memoizes explain and guess answers of a player by query.
+
+    Players with a false `deterministic` attribute (remote players: their answers and response
+    times change between calls) are called every time unless `deterministic=True` is passed.
+    Query words are stripped and lowercased only for players with a true `case_insensitive`
+    attribute, otherwise "Cat" and "cat" are different queries.
+    A `cache` may be shared between several CachedPlayers of the same underlying player.
+    """
+
+    # the cache holds a lock, and answers cached in a worker process would never be hit again
+    picklable = False
+
+    def __init__(self, player, maxsize=4096, ttl=None, deterministic=None, case_insensitive=None, cache=None):
+        super().__init__(player)
+        if deterministic is None:
+            deterministic = getattr(player, "deterministic", True)
+        self.deterministic = deterministic
+        if case_insensitive is None:
+            case_insensitive = getattr(player, "case_insensitive", False)
+        self.case_insensitive = case_insensitive
+        self.cache = cache if cache is not None else LRUCache(maxsize, ttl)
+
+    def cached(self, key, method, *args):
+        if not self.deterministic:
+            return method(*args)
+        hit, answer = self.cache.get(key)
+        if not hit:
+            answer = method(*args)
+            self.cache.put(key, answer)
+        return copy_answer(answer)
+
+    def normalize(self, word):
+        return normalize_word(word) if self.case_insensitive else word
+
+    def explain(self, word, n_words):
+        return self.cached(("explain", self.normalize(word), n_words), self.player.explain, word, n_words)
+
+    def guess(self, words, n_words):
+        key = ("guess", tuple(map(self.normalize, words)), n_words)
+        return self.cached(key, self.player.guess, words, n_words)
@@ -0,0 +1,118 @@
+import re
+from functools import lru_cache
+
+from the_hat_game.lemma_index import DEFAULT_INDEX_PATH, load_lemma_index
+from the_hat_game.loggers import logger
+from the_hat_game.nltk_setup import ensure_nltk_data
+
+# all symbols except letters
+NON_LETTERS = re.compile(r"[\W\d]")
+
+# stems and WordNet answers are cached per process and shared by all games
+CACHE_SIZE = 2**16
+
+
+@lru_cache(maxsize=None)
+def get_stemmer():
+    from nltk.stem.snowball import SnowballStemmer
+
+    return SnowballStemmer("english")
+
+
+@lru_cache(maxsize=None)
+def get_wordnet():
+    # WordNet is only needed by the hard criteria, so it is loaded (and downloaded) on first use
+    ensure_nltk_data(["wordnet"])
+    from nltk.corpus import wordnet
+
+    return wordnet
+
+
+@lru_cache(maxsize=None)
+def get_default_lemma_index():
+    # an index built with `python -m the_hat_game.lemma_index` replaces the WordNet lookups
+    if not DEFAULT_INDEX_PATH.exists():
+        return None
+    try:
+        return load_lemma_index(DEFAULT_INDEX_PATH)
+    except ValueError as exc:
+        logger.warning(f"{exc}, falling back to WordNet")
+        return None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def stem(word):
+    return get_stemmer().stem(word)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def word_exists(word):
+    lemma_index = get_default_lemma_index()
+    if lemma_index is not None:
+        return word in lemma_index
+    return len(get_wordnet().synsets(word)) > 0
+
+
+def bounded_edit_distance(s1, s2, max_distance):
+    """Levenshtein distance between s1 and s2 if it is at most max_distance, max_distance + 1 otherwise."""
+    if abs(len(s1) - len(s2)) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1, 1):
+        current = [i]
+        for j, c2 in enumerate(s2, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (c1 != c2)))
+        # distances never decrease from one row to the next
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return min(previous[-1], max_distance + 1)
+
+
+class WordListCleaner:
+    """Applies the game rules to an explaining player's word list in a single pass.
+
+    A word is kept if, after lowercasing and removing all symbols except letters, it is not empty,
+    was not seen before, does not contain the word being explained and is more than 2 edits away
+    from it. With hard criteria the list is cut to n_words first and words with the same root as
+    the explained word or missing from WordNet (or from `lemma_index`) are dropped; with soft
+    criteria the cleaned list is cut to n_words.
+    """
+
+    def __init__(self, criteria, lemma_index=None):
+        self.criteria = criteria
+        # a LemmaIndex answers existence questions without touching WordNet
+        self.lemma_index = lemma_index
+
+    def exists(self, word):
+        if self.lemma_index is not None:
+            return word in self.lemma_index
+        return word_exists(word)
+
+    def is_allowed(self, word, candidate):
+        if candidate == "" or word in candidate:
+            return False
+        # remove all words with too small levenstein distance from the word being explained
+        if bounded_edit_distance(word, candidate, 2) <= 2:
+            return False
+        if self.criteria == "hard":
+            return stem(candidate) != stem(word) and self.exists(candidate)
+        return True
+
+    def clean(self, word, reported_words, n_words):
+        if self.criteria == "hard":
+            reported_words = reported_words[:n_words]
+        explain_words = []
+        seen = set()
+        for candidate in reported_words:
+            if self.criteria == "soft" and 0 <= n_words <= len(explain_words):
+                break
+            candidate = NON_LETTERS.sub("", candidate.lower())
+            if candidate in seen:
+                continue
+            seen.add(candidate)
+            if self.is_allowed(word, candidate):
+                explain_words.append(candidate)
+        if self.criteria == "soft":
+            explain_words = explain_words[:n_words]
+        return explain_words
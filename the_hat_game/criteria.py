@@ -0,0 +1,28 @@
+from functools import lru_cache
+
+from the_hat_game.cleaning import CACHE_SIZE, bounded_edit_distance
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def soft_match(word, guess):
+    # players repeat the same guesses attempt after attempt, so (word, guess) answers are cached
+    return (word in guess) and bounded_edit_distance(word, guess, 2) < 3
+
+
+class GuessEvaluator:
+    """Checks the guesses of all guessing players of an attempt against the word being explained.
+
+    With soft criteria a guess is right if it contains the word and is less than 3 edits away
+    from it, with hard criteria it has to be the word itself.
+    """
+
+    def __init__(self, criteria):
+        self.criteria = criteria
+
+    def check(self, word, guessed_words):
+        if self.criteria == "soft":
+            return any(soft_match(word, guess) for guess in guessed_words)
+        return word in guessed_words
+
+    def evaluate(self, word, players_words):
+        return {name: self.check(word, guessed_words) for name, guessed_words in players_words.items()}
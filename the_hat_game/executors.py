@@ -0,0 +1,59 @@
+import multiprocessing as mp
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+EXECUTOR_BACKENDS = ("thread", "process", "inline")
+
+
+class FanOutExecutor:
+    """Worker pool that lives as long as a game and fans player calls out to workers.
+
+    backend="thread" suits HTTP-bound remote players, backend="process" isolates CPU-bound ones
+    (arguments are pickled on every call) and backend="inline" runs everything in the calling thread.
+    """
+
+    def __init__(self, backend="thread", max_workers=None):
+        if backend not in EXECUTOR_BACKENDS:
+            raise ValueError(f"Unknown executor backend {backend!r}, expected one of {EXECUTOR_BACKENDS}")
+        self.backend = backend
+        if max_workers is None and backend == "process":
+            max_workers = max(1, mp.cpu_count() - 1)
+        self.max_workers = max_workers
+        self._pool = None
+        self.started = False
+
+    def start(self):
+        if not self.started:
+            if self.backend == "thread":
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="hat-game")
+            elif self.backend == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            self.started = True
+        return self
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        self.started = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    def submit(self, func, *args):
+        if not self.started:
+            raise RuntimeError("Executor is not started, use it as a context manager or call start()")
+        if self._pool is not None:
+            return self._pool.submit(func, *args)
+        future = Future()
+        try:
+            future.set_result(func(*args))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+    def starmap(self, func, args_list):
+        futures = [self.submit(func, *args) for args in args_list]
+        return [future.result() for future in futures]
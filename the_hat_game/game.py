@@ -1,21 +1,50 @@
 import logging
-import multiprocessing as mp
-import re
+import time
 import traceback
+import uuid
 from collections import defaultdict
 from datetime import datetime
 from typing import OrderedDict
 
 import numpy as np
-import pandas as pd
-from IPython.display import display
-from nltk.corpus import wordnet
-from nltk.metrics.distance import edit_distance
-from nltk.stem.snowball import SnowballStemmer
 
-import the_hat_game.nltk_setup  # noqa: F401
-from the_hat_game.loggers import c_handler, dump_locally, logger
-from the_hat_game.players import RemotePlayer
+from the_hat_game.cleaning import WordListCleaner, get_stemmer, stem, word_exists
+from the_hat_game.criteria import GuessEvaluator
+from the_hat_game.executors import FanOutExecutor
+from the_hat_game.health import find_breaker
+from the_hat_game.instrumentation import NO_INSTRUMENTATION, call_status
+from the_hat_game.loggers import c_handler, dump_locally, logger, setup_console_logging
+from the_hat_game.players import is_remote_player, supports_sessions
+from the_hat_game.registry import check_memory_budgets
+from the_hat_game.stats import GameStats
+
+
+def display(obj):
+    # IPython is only needed to show tables, so it is not imported with the game
+    from IPython.display import display as ipython_display
+
+    ipython_display(obj)
+
+
+def score_tables(iteration_scores):
+    """game_info["scores"], `scores` and `scores_status` of a game from its
+    (explaining_player, guessing_players, scores) of every iteration, in the order they were played."""
+    import pandas as pd
+
+    scores = []
+    scores_status = defaultdict(int)
+    for explaining_player, guessing_players, score in iteration_scores:
+        scores.append(score)
+        scores_status[(explaining_player, "explaining")] += score.get(explaining_player, 0)
+        for player in guessing_players:
+            scores_status[(player, "guessing")] += score.get(player, 0)
+
+    scores_dict = defaultdict(dict)
+    for (p, a), s in scores_status.items():
+        scores_dict[p][a] = s
+    scores = pd.DataFrame(scores).fillna(0)
+    scores.index.name = "game"
+    return scores_dict, scores, pd.Series(scores_status).unstack()
 
 
 class Game:
@@ -29,6 +58,15 @@ class Game:
         n_guessing_words,
         random_state=None,
         logging_callback=dump_locally,
+        executor="thread",
+        max_workers=None,
+        parallel_local_players=False,
+        lemma_index=None,
+        history=None,
+        keep_iterations=True,
+        batch_guesses=False,
+        instrumentation=None,
+        incremental_guesses=False,
     ):
         assert len(players) >= 2
         assert criteria in ("hard", "soft")
@@ -36,6 +74,12 @@ class Game:
             f"For {n_rounds} rounds and {len(players)} players"
             "you need at least {n_rounds * len(players)} words, but you have only {len(words)}"
         )
+        if executor == "process":
+            # players with locks or shared state can not be sent to worker processes
+            for player in players:
+                if not getattr(player.api, "picklable", True):
+                    raise ValueError(f"player {player.name} can not be used with the 'process' executor backend")
+        check_memory_budgets(players)
         self.players = players
         self.words = words
         self.criteria = criteria
@@ -44,10 +88,26 @@ class Game:
         self.n_guessing_words = n_guessing_words
         self.random_state = random_state
         self.logging_callback = logging_callback
-        self.stemmer = SnowballStemmer("english")
+        # one worker pool per game: started in `run` and shut down when the game is over
+        self.executor = FanOutExecutor(executor, max_workers=max_workers or self.default_max_workers(executor))
+        self.parallel_local_players = parallel_local_players
+        # ask remote players about all attempts of an iteration in one /guess_batch request
+        self.batch_guesses = batch_guesses
+        self.cleaner = WordListCleaner(criteria, lemma_index=lemma_index)
+        self.evaluator = GuessEvaluator(criteria)
+        # running per (player, metric) statistics of the last run
+        self.stats = GameStats()
+        # a HistoryStore keeps every attempt in compact columns, then game_info may skip them
+        self.history = history
+        self.keep_iterations = keep_iterations
+        self.iteration_scores = []
+        # an instrumentation.Instrumentation times the phases of the game and every player call
+        self.instrumentation = instrumentation or NO_INSTRUMENTATION
+        # players which support guessing sessions get one word per attempt instead of the whole sentence
+        self.incremental_guesses = incremental_guesses
         self.game_info = OrderedDict(
             timestamp=datetime.utcnow(),
-            players={p.name: p.api.url if isinstance(p.api, RemotePlayer) else None for p in players},
+            players={p.name: getattr(p.api, "url", None) for p in players},
             words=words,
             criteria=criteria,
             n_rounds=n_rounds,
@@ -55,6 +115,10 @@ class Game:
             n_guessing_words=n_guessing_words,
         )
 
+    @property
+    def stemmer(self):
+        return get_stemmer()
+
     def score_players(self, explainer_name, successfull_attempts):
         rewards = {player.name: 0 for player in self.players}
         for player, attempt in successfull_attempts.items():
@@ -63,115 +127,190 @@ class Game:
         return rewards
 
     def remove_same_rooted_words(self, word, word_list):
-        root = self.stemmer.stem(word)
-        return [w for w in word_list if self.stemmer.stem(w) != root]
+        root = stem(word)
+        return [w for w in word_list if stem(w) != root]
 
     @staticmethod
     def remove_non_existing_words(words):
-        return [w for w in words if len(wordnet.synsets(w)) > 0]
+        return [w for w in words if word_exists(w)]
 
     @staticmethod
     def remove_repeated_words(words):
-        unique_words = []
-        for c in words:
-            if c not in unique_words:
-                unique_words.append(c)
-        return unique_words
-
-    def create_word_list(self, player, word, n_words):
-        reported_words = player.explain(word, n_words)
-        explain_words = reported_words[:]
-        if self.criteria == "hard":
-            explain_words = explain_words[:n_words]
-        explain_words = [w.lower() for w in explain_words]
-        # remove all symbols except letters
-        explain_words = [re.sub(r"[\W\d]", "", w) for w in explain_words]
-        # remove all words which have word being explained as a substring
-        explain_words = [w for w in explain_words if word not in w]
-        # remove all words with too small levenstein distance from the word being explained
-        explain_words = [w for w in explain_words if edit_distance(word, w) > 2]
-        explain_words = [w for w in explain_words if w != ""]
-        explain_words = self.remove_repeated_words(explain_words)
-        if self.criteria == "hard":
-            explain_words = self.remove_same_rooted_words(word, explain_words)
-            explain_words = self.remove_non_existing_words(explain_words)
-        if self.criteria == "soft":
-            explain_words = explain_words[:n_words]
+        return list(dict.fromkeys(words))
+
+    def ask_explaining_player(self, player, word, n_words):
+        return player.explain(word, n_words)
+
+    def create_word_list(self, player, word, n_words, team=None):
+        started = time.perf_counter()
+        reported_words = self.ask_explaining_player(player, word, n_words)
+        self.record_call(team, player, "explain", reported_words, started)
+        with self.instrumentation.timer("phase_seconds", phase="clean"):
+            explain_words = self.cleaner.clean(word, reported_words, n_words)
         return reported_words, explain_words
 
     def check_criteria(self, word, guessed_words):
-        if self.criteria == "soft":
-            return any((word in c) and (edit_distance(word, c) < 3) for c in guessed_words)
-        else:
-            return word in guessed_words
+        return self.evaluator.check(word, guessed_words)
 
     @staticmethod
     def ask_player(player, question, word, n_words):
+        if question == "guess_next":
+            # the query is (session, word)
+            return player.guess_next(*word, n_words)
         method = getattr(player, question)
         return method(word, n_words)
 
-    def ask_guessing_players(self, guessing_players, sentence):
-        players_guesses = {}
-        remote_guessing_players = []
+    def record_call(self, team, player, question, answer, started):
+        if self.instrumentation.enabled:
+            elapsed = time.perf_counter() - started
+            status = call_status(player, answer, elapsed)
+            self.instrumentation.observe("player_call_seconds", elapsed, team=team, call=question, status=status)
+
+    def call_player(self, player, question, query, submitted=None):
+        """Ask a PlayerDefinition `question` and record the call, `submitted` is when it was queued."""
+        started = time.perf_counter()
+        if submitted is not None:
+            self.instrumentation.observe("queue_wait_seconds", started - submitted)
+        answer = self.ask_player(player.api, question, query, self.n_guessing_words)
+        self.record_call(player.name, player.api, question, answer, started)
+        return answer
+
+    def submit_call(self, player, question, query):
+        # with the process backend calls would pickle the game, so they are not instrumented there
+        if self.instrumentation.enabled and self.executor.backend != "process":
+            return self.executor.submit(self.call_player, player, question, query, time.perf_counter())
+        return self.executor.submit(self.ask_player, player.api, question, query, self.n_guessing_words)
+
+    def breakers(self):
+        breakers = {player.name: find_breaker(player.api) for player in self.players}
+        return {name: breaker for name, breaker in breakers.items() if breaker is not None}
+
+    def breaker_states(self):
+        return {name: breaker.state for name, breaker in self.breakers().items()}
+
+    def default_max_workers(self, backend):
+        if backend == "thread":
+            # remote calls are I/O bound, so every guessing player may get its own thread
+            return max(1, len(self.players) - 1)
+        return None
+
+    def session_players(self, players):
+        """Names of the players which are asked in guessing sessions."""
+        # sessions keep state in the player, which the process backend would ask in copies
+        if not self.incremental_guesses or self.executor.backend == "process":
+            return set()
+        return {player.name for player in players if supports_sessions(player.api)}
+
+    def ask_guessing_players(self, guessing_players, sentence, session=None):
+        if not self.executor.started:
+            # called outside of `run`: keep a pool only for the duration of this call
+            with self.executor:
+                return self.ask_guessing_players(guessing_players, sentence, session)
+
+        session_players = self.session_players(guessing_players) if session is not None else set()
+        futures = {}
+        local_guessing_players = []
         for player in guessing_players:
-            if isinstance(player.api, RemotePlayer):
-                remote_guessing_players.append(player)
+            if is_remote_player(player.api) or self.parallel_local_players:
+                futures[player.name] = self.submit_call(
+                    player, *self.guess_question(player, sentence, session_players, session)
+                )
             else:
-                players_guesses[player.name] = player.api.guess(sentence, self.n_guessing_words)
-
-        if remote_guessing_players:
-            n_processes = np.fmin(len(remote_guessing_players), np.fmax(1, mp.cpu_count() - 1))
-            pool = mp.Pool(n_processes)
-            remote_players_guesses = pool.starmap(
-                self.ask_player,
-                [(p.api, "guess", sentence, self.n_guessing_words) for p in remote_guessing_players],
-            )
-            pool.close()
+                local_guessing_players.append(player)
 
-            players_guesses.update(
-                zip(
-                    [player.name for player in remote_guessing_players],
-                    remote_players_guesses,
-                )
+        # local players are asked while remote requests are in flight
+        players_guesses = {}
+        for player in local_guessing_players:
+            players_guesses[player.name] = self.call_player(
+                player, *self.guess_question(player, sentence, session_players, session)
             )
+        for name, future in futures.items():
+            players_guesses[name] = future.result()
         return players_guesses
 
-    def play_attempt(self, guessing_players, word, sentence):
+    @staticmethod
+    def guess_question(player, sentence, session_players, session):
+        if player.name in session_players:
+            # sessions get the words one by one, the last word of the sentence is the new one
+            return "guess_next", (session, sentence[-1])
+        return "guess", sentence
+
+    def prefetch_guesses(self, guessing_players, guessing_by):
+        if not self.executor.started:
+            with self.executor:
+                return self.prefetch_guesses(guessing_players, guessing_by)
+
+        sentences = [guessing_by[:i] for i in range(1, len(guessing_by) + 1)]
+        futures = {
+            player.name: self.submit_call(player, "guess_batch", sentences)
+            for player in guessing_players
+            if sentences and is_remote_player(player.api)
+        }
+        prefetched = {}
+        for name, future in futures.items():
+            answers = future.result()
+            # players whose services have no batch endpoints, or whose batch request failed,
+            # are asked on every attempt
+            if answers is not None and all(answer["code"] == 200 for answer in answers):
+                prefetched[name] = answers
+        return prefetched
+
+    def play_attempt(self, guessing_players, word, sentence, prefetched=None, session=None):
         results = {}
         logger.info(f"HOST: {sentence}")
 
-        players_guesses = self.ask_guessing_players(guessing_players, sentence)
+        players_guesses = {}
+        if prefetched:
+            for player in guessing_players:
+                if player.name in prefetched:
+                    players_guesses[player.name] = prefetched[player.name][len(sentence) - 1]
+        players_to_ask = [player for player in guessing_players if player.name not in players_guesses]
+        if players_to_ask:
+            with self.instrumentation.timer("phase_seconds", phase="guess"):
+                players_guesses.update(self.ask_guessing_players(players_to_ask, sentence, session))
+        for name, player_dict in players_guesses.items():
+            # local players may return just list. This quick fix allows that
+            if isinstance(player_dict, list):
+                players_guesses[name] = dict(word_list=player_dict)
+        with self.instrumentation.timer("phase_seconds", phase="evaluate"):
+            guessed = self.evaluator.evaluate(
+                word, {player.name: players_guesses[player.name]["word_list"] for player in guessing_players}
+            )
 
         for player in guessing_players:
-            player_results = {}
             player_dict = players_guesses[player.name]
-            # local players may return just list. This quick fix allows that
-            if isinstance(player_dict, list):
-                player_dict = dict(word_list=player_dict)
             guessed_words = player_dict["word_list"]
-            guessed = self.check_criteria(word, guessed_words)
-            logger.info(f"({str(guessed):5}) GUESSING PLAYER ({player.name}) to HOST: {guessed_words}")
+            logger.info(f"({str(guessed[player.name]):5}) GUESSING PLAYER ({player.name}) to HOST: {guessed_words}")
             # logger.info(f"RESPONSE_TIME: {player_dict['time']}, RESPONSE_CODE: {player_dict['code']}")
-            player_results["words"] = guessed_words
-            player_results["guessed"] = guessed
-            player_results["response_time"] = player_dict.get("time", np.nan)
-            player_results["response_200"] = player_dict.get("code", None) == 200
-            results[player.name] = player_results
+            results[player.name] = {
+                "words": guessed_words,
+                "guessed": guessed[player.name],
+                "response_time": player_dict.get("time", np.nan),
+                "response_200": player_dict.get("code", None) == 200,
+                "response_code": player_dict.get("code", None),
+            }
         return results
 
     def play_iteration(self, explaining_player, guessing_players, word):
 
         logger.info(f'HOST to EXPLAINING PLAYER ({explaining_player.name}): the word is "{word}"')
 
-        reported_words, guessing_by = self.create_word_list(explaining_player.api, word, self.n_explain_words)
+        reported_words, guessing_by = self.create_word_list(
+            explaining_player.api, word, self.n_explain_words, team=explaining_player.name
+        )
         logger.info(f"EXPLAINING PLAYER ({explaining_player.name}) to HOST: my wordlist is {reported_words}")
         logger.info(
             f"HOST TO EXPLAINING PLAYER ({explaining_player.name}): cleaning your word list. Now the list is {guessing_by}"
         )
 
-        df = []
+        prefetched = None
+        if self.batch_guesses:
+            with self.instrumentation.timer("phase_seconds", phase="prefetch"):
+                prefetched = self.prefetch_guesses(guessing_players, guessing_by)
+        session_players = [p for p in guessing_players if p.name in self.session_players(guessing_players)]
+        session = uuid.uuid4().hex if session_players else None
         success_attempts = {}
-        metrics = defaultdict(dict)
+        metrics = GameStats(latency_metrics=(), skip_missing=False)
         iteration_info = OrderedDict(
             timestamp=datetime.utcnow(),
             explaining_player=explaining_player.name,
@@ -181,41 +320,45 @@ class Game:
             guessing_by=guessing_by,
             attempts=[],
         )
-        for i in range(1, len(guessing_by) + 1):
-            if len(guessing_players) == 0:
-                break
-            logger.info(f"\n===ATTEMPT {i}===\n")
-            results = self.play_attempt(
-                guessing_players=guessing_players,
-                word=word,
-                sentence=guessing_by[:i],
-            )
-            for player in [explaining_player] + guessing_players:
-                player_results = results.get(player.name, dict())
-                for metric in player_results.keys():
-                    if metric not in ("guessed", "words"):
-                        metrics[player.name][metric] = metrics[player.name].get(metric, list()) + [
-                            player_results[metric]
-                        ]
-                        # metrics[(player.name, metric)] = metrics.get((player.name, metric), list()) + [
-                        #     player_results[metric]
-                        # ]
-            for player in guessing_players[:]:
-                if (player.name not in success_attempts) and results.get(player.name, dict()).get("guessed", False):
-                    success_attempts[player.name] = i
-                    guessing_players = [p for p in guessing_players if p != player]
-            iteration_info["attempts"].append(results)
-            df.append(results)
-
-        scores = self.score_players(explaining_player.name, success_attempts)
+        health = self.breaker_states()
+        if health:
+            # teams whose breaker is not closed get empty answers without being asked
+            iteration_info["health"] = health
+        try:
+            for i in range(1, len(guessing_by) + 1):
+                if len(guessing_players) == 0:
+                    break
+                logger.info(f"\n===ATTEMPT {i}===\n")
+                results = self.play_attempt(
+                    guessing_players=guessing_players,
+                    word=word,
+                    sentence=guessing_by[:i],
+                    prefetched=prefetched,
+                    session=session,
+                )
+                for player in [explaining_player] + guessing_players:
+                    player_results = results.get(player.name, dict())
+                    for metric, value in player_results.items():
+                        if metric not in ("guessed", "words", "response_code"):
+                            metrics.update(player.name, metric, value)
+                            self.stats.update(player.name, metric, value)
+                for player in guessing_players[:]:
+                    if (player.name not in success_attempts) and results.get(player.name, dict()).get("guessed", False):
+                        success_attempts[player.name] = i
+                        guessing_players = [p for p in guessing_players if p != player]
+                iteration_info["attempts"].append(results)
+        finally:
+            # a failed attempt must not leave the sessions open on the teams' services
+            for player in session_players:
+                player.api.end_session(session)
+
+        with self.instrumentation.timer("phase_seconds", phase="score"):
+            scores = self.score_players(explaining_player.name, success_attempts)
         iteration_info["scores"] = scores
-        self.logging_callback({"game_timestamp": self.game_info["timestamp"], **iteration_info}, "iteration")
-        df = pd.DataFrame(df)
-        for p in metrics:
-            for m in metrics[p]:
-                metrics[p][m] = np.mean(metrics[p][m])
-        iteration_info["metrics"] = metrics
-        return df, scores, iteration_info
+        with self.instrumentation.timer("phase_seconds", phase="log"):
+            self.logging_callback({"game_timestamp": self.game_info["timestamp"], **iteration_info}, "iteration")
+        iteration_info["metrics"] = metrics.means()
+        return iteration_info["attempts"], scores, iteration_info
 
     def get_words(self, complete):
         if not complete:
@@ -240,18 +383,25 @@ class Game:
             console_logging_level = logging.INFO
         else:
             console_logging_level = logging.WARNING
+        setup_console_logging()
         c_handler.setLevel(console_logging_level)
 
     def run(self, verbose=False, complete=False):
         self.set_console_logging_level(verbose)
+        with self.executor:
+            self.play_rounds(verbose=verbose, complete=complete)
 
+    def plan_iterations(self, complete=False):
+        """Yield (round, explaining_player, guessing_players, word) for every iteration of the game."""
+        self.stats = GameStats()
+        self.iteration_scores = []
+        self.game_info["iterations"] = []
+        if self.history is not None:
+            self.history_game = self.history.start_game([p.name for p in self.players], self.n_explain_words)
         self.run_words = self.get_words(complete=complete)
         self.run_rounds = self.get_n_rounds(complete=complete)
 
         igame = 0
-        scores = []
-        scores_status = defaultdict(int)
-        self.game_info["iterations"] = []
         for r in range(self.run_rounds):
             players = self.players[:]
             # shuffle players to average randomness with some players' services
@@ -264,30 +414,66 @@ class Game:
                 except IndexError:
                     logger.info("HOST: No words left in the hat. Ending the game.")
                     break
-                df, score, iteration_info = self.play_iteration(explaining_player, guessing_players, word)
-                iteration_info["round"] = r
-                self.game_info["iterations"].append(iteration_info)
-                scores.append(score)
-                scores_status[(explaining_player.name, "explaining")] += score.get(explaining_player.name, 0)
-                for player in guessing_players:
-                    scores_status[(player.name, "guessing")] += score.get(player.name, 0)
+                yield r, explaining_player, guessing_players, word
                 igame += 1
-                logger.info(f"\n\nSCORES: {score}")
-                if verbose:
-                    display(df)
 
-        scores_dict = defaultdict(dict)
-        for (p, a), s in scores_status.items():
-            scores_dict[p][a] = s
+    @staticmethod
+    def prefetch_players(players):
+        """Let players which load their models lazily (registry.LazyPlayer) start loading them."""
+        for player in players:
+            prefetch = getattr(player.api, "prefetch", None)
+            if callable(prefetch):
+                prefetch()
+
+    def plan_with_prefetch(self, complete=False):
+        iterations = self.plan_iterations(complete=complete)
+        if not any(callable(getattr(player.api, "prefetch", None)) for player in self.players):
+            yield from iterations
+            return
+        # planning one iteration ahead, the next explainer's and guessers' models load during this one
+        current = next(iterations, None)
+        for upcoming in iterations:
+            self.prefetch_players([upcoming[1], *upcoming[2]])
+            yield current
+            current = upcoming
+        if current is not None:
+            yield current
+
+    def play_rounds(self, verbose=False, complete=False):
+        import pandas as pd
+
+        for r, explaining_player, guessing_players, word in self.plan_with_prefetch(complete=complete):
+            attempts, score, iteration_info = self.play_iteration(explaining_player, guessing_players, word)
+            self.record_iteration(r, iteration_info)
+            logger.info(f"\n\nSCORES: {score}")
+            if verbose:
+                display(pd.DataFrame(attempts))
+        self.finish_game()
+
+    def record_iteration(self, r, iteration_info):
+        with self.instrumentation.timer("phase_seconds", phase="record"):
+            iteration_info["round"] = r
+            self.iteration_scores.append(
+                (iteration_info["explaining_player"], iteration_info["guessing_players"], iteration_info["scores"])
+            )
+            if self.history is not None:
+                self.history.record_iteration(self.history_game, iteration_info)
+            if self.keep_iterations:
+                self.game_info["iterations"].append(iteration_info)
+
+    def finish_game(self):
+        scores_dict, self.scores, self.scores_status = score_tables(self.iteration_scores)
         self.game_info["scores"] = scores_dict
+        health = {name: breaker.to_dict() for name, breaker in self.breakers().items()}
+        if health:
+            self.game_info["health"] = health
         try:
             self.logging_callback(self.game_info, "game")
         except:  # noqa: E722
             traceback.print_exc()
-        self.scores = pd.DataFrame(scores).fillna(0)
-        self.scores.index.name = "game"
 
-        self.scores_status = pd.Series(scores_status).unstack()
+    def report_stats(self, percentiles=(50, 90, 99)):
+        return self.stats.to_frame(percentiles=percentiles)
 
     def report_results(self, each_game=False):
         if each_game:
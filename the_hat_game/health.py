@@ -0,0 +1,171 @@
+import threading
+import time
+
+import numpy as np
+
+from the_hat_game.instrumentation import call_status
+from the_hat_game.players import PlayerWrapper
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Thread-safe health state of one team's service.
+
+    The breaker opens after `failure_threshold` consecutive failed calls and then rejects calls.
+    After `reset_timeout` seconds, or as soon as `half_open` is called (a successful ping), it lets
+    one trial call through: its success closes the breaker, its failure opens it again.
+    Every change of state is kept in `transitions` as (clock time, state), `to_dict` lists them
+    as [clock time, state] pairs.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=30, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.consecutive_failures = 0
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0
+        self.transitions = []
+        self.lock = threading.Lock()
+
+    def set_state(self, state):
+        self.state = state
+        self.transitions.append((self.clock(), state))
+        if state == OPEN:
+            self.opened_at = self.clock()
+        self.trial_in_flight = False
+
+    def allow(self):
+        """Whether a call may go to the service now. A rejected call is counted in `rejected`."""
+        with self.lock:
+            if self.state == OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+                self.set_state(HALF_OPEN)
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.successes += 1
+            self.consecutive_failures = 0
+            if self.state != CLOSED:
+                self.set_state(CLOSED)
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or (
+                self.state == CLOSED and self.consecutive_failures >= self.failure_threshold
+            ):
+                self.set_state(OPEN)
+
+    def half_open(self):
+        with self.lock:
+            if self.state == OPEN:
+                self.set_state(HALF_OPEN)
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "successes": self.successes,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "transitions": [[at, state] for at, state in self.transitions],
+            }
+
+
+class HealthCheckedPlayer(PlayerWrapper):
+    """Short-circuits calls to a player whose service keeps failing.
+
+    Calls are failed or timed out as decided by instrumentation.call_status. While the breaker is
+    open explain returns [] and guess returns an empty answer with `time` NaN and `code` None at once,
+    and a background thread pings the service every `probe_interval` seconds: when it answers, the
+    next call is let through as a trial. Game records the breakers in game_info["health"].
+    """
+
+    # the breaker and the prober hold locks, and a worker process would keep its own breaker
+    picklable = False
+
+    def __init__(self, player, breaker=None, probe_interval=5, probe_timeout=1):
+        super().__init__(player)
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.prober = None
+        self.stopped = threading.Event()
+        self.lock = threading.Lock()
+
+    def call(self, question, method, query, n_words, rejected):
+        if not self.breaker.allow():
+            return rejected
+        started = time.perf_counter()
+        try:
+            answer = method(query, n_words)
+        except Exception:
+            # also ends a trial call, otherwise the breaker would wait for its result forever
+            self.breaker.record_failure()
+            self.start_probing()
+            raise
+        if question == "guess_batch" and answer is None:
+            # the service has no batch endpoints, which says nothing about its health
+            self.breaker.record_success()
+        elif call_status(self.player, answer, time.perf_counter() - started) == "ok":
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+            self.start_probing()
+        return answer
+
+    def explain(self, word, n_words):
+        return self.call("explain", self.player.explain, word, n_words, [])
+
+    def guess(self, words, n_words):
+        return self.call("guess", self.player.guess, words, n_words, rejected_answer())
+
+    def guess_batch(self, sentences, n_words):
+        rejected = [rejected_answer() for _ in sentences]
+        return self.call("guess_batch", self.player.guess_batch, sentences, n_words, rejected)
+
+    def start_probing(self):
+        if self.breaker.state != OPEN or getattr(self.player, "ping", None) is None:
+            return
+        with self.lock:
+            if self.prober is None or not self.prober.is_alive():
+                self.prober = threading.Thread(target=self.probe, daemon=True)
+                self.prober.start()
+
+    def probe(self):
+        while self.breaker.state == OPEN and not self.stopped.wait(self.probe_interval):
+            if self.player.ping(timeout=self.probe_timeout):
+                self.breaker.half_open()
+
+    def close(self):
+        self.stopped.set()
+
+
+def rejected_answer():
+    # no call was made, so there is no response time to count
+    return {"word_list": [], "time": np.nan, "code": None}
+
+
+def find_breaker(player):
+    """The CircuitBreaker of the first HealthCheckedPlayer in a chain of wrappers, or None."""
+    while isinstance(player, PlayerWrapper):
+        if isinstance(player, HealthCheckedPlayer):
+            return player.breaker
+        player = player.player
+    return None
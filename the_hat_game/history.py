@@ -0,0 +1,229 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+NO_RESPONSE_CODE = -1
+
+ATTEMPT_COLUMNS = {
+    "iteration": np.int32,
+    "player": np.int32,
+    "attempt": np.int16,
+    "guessed": np.bool_,
+    "response_time": np.float32,
+    "response_code": np.int16,
+}
+ITERATION_COLUMNS = {
+    "game": np.int32,
+    "round": np.int32,
+    "explaining_player": np.int32,
+    "word": np.int32,
+}
+
+
+class Interner:
+    def __init__(self, values=()):
+        self.values = []
+        self.ids = {}
+        for value in values:
+            self.id(value)
+
+    def id(self, value):
+        value_id = self.ids.get(value)
+        if value_id is None:
+            value_id = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return value_id
+
+    def __len__(self):
+        return len(self.values)
+
+
+class ColumnBuffer:
+    """Typed columns that grow by doubling, so appending a row is amortized O(1)."""
+
+    def __init__(self, dtypes, capacity=1024):
+        self.dtypes = dtypes
+        self.size = 0
+        self.columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in dtypes.items()}
+
+    def append(self, **row):
+        if self.size == len(next(iter(self.columns.values()))):
+            for name, column in self.columns.items():
+                self.columns[name] = np.resize(column, max(1024, 2 * len(column)))
+        for name, value in row.items():
+            self.columns[name][self.size] = value
+        self.size += 1
+
+    def arrays(self):
+        return {name: column[: self.size] for name, column in self.columns.items()}
+
+    def clear(self):
+        self.size = 0
+
+
+class HistoryStore:
+    """Columnar record of every attempt of every game.
+
+    Player names and words are interned to integer ids, iterations and attempts are stored in
+    typed NumPy columns. Local players have NaN response times and missing HTTP codes are stored
+    as -1. With `directory` the attempt columns are spilled to `.npz` chunks of `chunk_size` rows,
+    so memory stays bounded no matter how long the tournament is.
+    Pass it as Game(history=HistoryStore()) to record a game.
+    """
+
+    def __init__(self, directory=None, chunk_size=2**16):
+        self.players = Interner()
+        self.words = Interner()
+        self.games = []
+        self.iterations = ColumnBuffer(ITERATION_COLUMNS)
+        self.attempts = ColumnBuffer(ATTEMPT_COLUMNS, capacity=min(chunk_size, 2**16))
+        self.directory = Path(directory) if directory is not None else None
+        self.chunk_size = chunk_size
+        self.chunks = []
+
+    def start_game(self, players, n_explain_words):
+        self.games.append({"players": [self.players.id(p) for p in players], "n_explain_words": n_explain_words})
+        return len(self.games) - 1
+
+    def record_iteration(self, game, iteration_info):
+        iteration = self.iterations.size
+        self.iterations.append(
+            game=game,
+            round=iteration_info.get("round", -1),
+            explaining_player=self.players.id(iteration_info["explaining_player"]),
+            word=self.words.id(iteration_info["word"]),
+        )
+        for attempt, results in enumerate(iteration_info["attempts"], 1):
+            for player, player_results in results.items():
+                code = player_results.get("response_code")
+                self.attempts.append(
+                    iteration=iteration,
+                    player=self.players.id(player),
+                    attempt=attempt,
+                    guessed=player_results["guessed"],
+                    response_time=player_results.get("response_time", np.nan),
+                    response_code=NO_RESPONSE_CODE if code is None else code,
+                )
+                if self.directory is not None and self.attempts.size >= self.chunk_size:
+                    self.spill()
+        return iteration
+
+    def spill(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"attempts-{len(self.chunks):05d}.npz"
+        np.savez(path, **self.attempts.arrays())
+        self.chunks.append(path)
+        self.attempts.clear()
+
+    def attempt_arrays(self):
+        parts = []
+        for path in self.chunks:
+            with np.load(path) as data:
+                parts.append({name: data[name] for name in ATTEMPT_COLUMNS})
+        parts.append(self.attempts.arrays())
+        return {name: np.concatenate([part[name] for part in parts]) for name in ATTEMPT_COLUMNS}
+
+    def __len__(self):
+        return len(self.chunks) * self.chunk_size + self.attempts.size
+
+    def attempts_frame(self):
+        attempts = pd.DataFrame(self.attempt_arrays())
+        iterations = pd.DataFrame(self.iterations.arrays())
+        frame = attempts.join(iterations, on="iteration")
+        frame["player"] = pd.Categorical.from_codes(frame["player"], self.players.values)
+        frame["explaining_player"] = pd.Categorical.from_codes(frame["explaining_player"], self.players.values)
+        frame["word"] = pd.Categorical.from_codes(frame["word"], self.words.values)
+        return frame
+
+    def save(self, path):
+        """Save the whole store to one `.npz` file, see `load`. For other formats use `attempts_frame()`."""
+        iterations = {f"iterations_{name}": column for name, column in self.iterations.arrays().items()}
+        np.savez_compressed(
+            path,
+            players=np.array(self.players.values, dtype=str),
+            words=np.array(self.words.values, dtype=str),
+            game_players=np.array([",".join(map(str, g["players"])) for g in self.games], dtype=str),
+            game_n_explain_words=np.array([g["n_explain_words"] for g in self.games], dtype=np.int32),
+            **iterations,
+            **self.attempt_arrays(),
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls.from_arrays(data)
+
+    @classmethod
+    def from_arrays(cls, data):
+        store = cls()
+        store.players = Interner(data["players"].tolist())
+        store.words = Interner(data["words"].tolist())
+        store.games = [
+            {"players": [int(p) for p in players.split(",") if p], "n_explain_words": int(n)}
+            for players, n in zip(data["game_players"].tolist(), data["game_n_explain_words"].tolist())
+        ]
+        for name, dtype in ITERATION_COLUMNS.items():
+            store.iterations.columns[name] = data[f"iterations_{name}"].astype(dtype)
+        store.iterations.size = len(data["iterations_game"])
+        for name, dtype in ATTEMPT_COLUMNS.items():
+            store.attempts.columns[name] = data[name].astype(dtype)
+        store.attempts.size = len(data["iteration"])
+        return store
+
+    def accuracy(self):
+        """Share of iterations in which each team guessed the word."""
+        a = self.attempt_arrays()
+        guessed = pd.DataFrame({"iteration": a["iteration"], "player": a["player"], "guessed": a["guessed"]})
+        guessed = guessed.groupby(["player", "iteration"])["guessed"].any().groupby(level="player").mean()
+        guessed.index = [self.players.values[i] for i in guessed.index]
+        return guessed
+
+    def latency_percentiles(self, percentiles=(50, 90, 99), successful_only=True):
+        a = self.attempt_arrays()
+        mask = ~np.isnan(a["response_time"])
+        if successful_only:
+            mask &= a["response_code"] == 200
+        players, times = a["player"][mask], a["response_time"][mask]
+        result = {self.players.values[p]: np.percentile(times[players == p], percentiles) for p in np.unique(players)}
+        return pd.DataFrame.from_dict(result, orient="index", columns=[f"p{q}" for q in percentiles])
+
+    def scores(self):
+        """Recompute scores from the recorded attempts: one row per iteration, one column per player."""
+        a = self.attempt_arrays()
+        it = self.iterations.arrays()
+        first_guess = {}
+        for iteration, player, attempt in zip(
+            a["iteration"][a["guessed"]], a["player"][a["guessed"]], a["attempt"][a["guessed"]]
+        ):
+            key = (int(iteration), int(player))
+            first_guess[key] = min(first_guess.get(key, attempt), attempt)
+
+        scores = []
+        for iteration in range(self.iterations.size):
+            game = self.games[it["game"][iteration]]
+            rewards = {self.players.values[p]: 0 for p in game["players"]}
+            for p in game["players"]:
+                if (iteration, p) in first_guess:
+                    rewards[self.players.values[p]] += game["n_explain_words"] + 1 - int(first_guess[(iteration, p)])
+            rewards[self.players.values[it["explaining_player"][iteration]]] = sum(rewards.values())
+            scores.append(rewards)
+        frame = pd.DataFrame(scores).fillna(0)
+        frame.index.name = "game"
+        return frame
+
+    def scores_status(self):
+        """Total explaining and guessing scores of every player, as Game.scores_status."""
+        it = self.iterations.arrays()
+        scores = self.scores()
+        status = {}
+        for iteration, score in enumerate(scores.to_dict("records")):
+            game = self.games[it["game"][iteration]]
+            explaining_player = self.players.values[it["explaining_player"][iteration]]
+            key = (explaining_player, "explaining")
+            status[key] = status.get(key, 0) + score.get(explaining_player, 0)
+            for p in game["players"]:
+                player = self.players.values[p]
+                if player != explaining_player:
+                    status[(player, "guessing")] = status.get((player, "guessing"), 0) + score.get(player, 0)
+        return pd.Series(status).unstack()
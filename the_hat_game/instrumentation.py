@@ -0,0 +1,135 @@
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from the_hat_game.stats import LATENCY_BUCKETS, RunningStat
+
+# upper bounds of the Prometheus histogram buckets, seconds
+EXPORT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Instrumentation:
+    """Thread-safe latency histograms by metric name and labels.
+
+    Game records `phase_seconds{phase}` (host-side work of every iteration), `player_call_seconds{team,
+    call, status}` (wall time of explain/guess calls; status is ok, timeout or error) and
+    `queue_wait_seconds` (time a player call waits for a worker of the pool).
+    """
+
+    enabled = True
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            stat = self.stats.get(key)
+            if stat is None:
+                stat = self.stats[key] = RunningStat(self.buckets)
+            stat.update(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def merge(self, other):
+        with self.lock:
+            for key, stat in other.stats.items():
+                if key not in self.stats:
+                    self.stats[key] = RunningStat(self.buckets)
+                self.stats[key].merge(stat)
+        return self
+
+    def snapshot(self, percentiles=(50, 90, 99)):
+        snapshot = {}
+        with self.lock:
+            for (name, labels), stat in sorted(self.stats.items()):
+                snapshot.setdefault(name, []).append({"labels": dict(labels), **stat.to_dict(percentiles)})
+        return snapshot
+
+    def to_json(self, percentiles=(50, 90, 99)):
+        snapshot = self.snapshot(percentiles)
+        for rows in snapshot.values():
+            for row in rows:
+                # NaN of empty statistics is not valid JSON
+                row.update({key: None for key, value in row.items() if isinstance(value, float) and value != value})
+        return json.dumps(snapshot)
+
+    def to_prometheus(self, prefix="hat_"):
+        """Prometheus text exposition format, a histogram per metric name."""
+        lines = []
+        with self.lock:
+            items = sorted(self.stats.items())
+        for i, ((name, labels), stat) in enumerate(items):
+            metric = prefix + name
+            if i == 0 or items[i - 1][0][0] != name:
+                lines.append(f"# TYPE {metric} histogram")
+            for bound, count in zip([*EXPORT_BUCKETS, "+Inf"], cumulative_counts(stat)):
+                lines.append(f"{metric}_bucket{label_set((*labels, ('le', bound)))} {count}")
+            lines.append(f"{metric}_sum{label_set(labels)} {stat.sum}")
+            lines.append(f"{metric}_count{label_set(labels)} {stat.count}")
+        return "\n".join(lines) + "\n"
+
+
+def label_set(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"') for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+
+def cumulative_counts(stat):
+    # a fine bucket is counted under the first export bound which is not below its own upper bound
+    counts = [0] * (len(EXPORT_BUCKETS) + 1)
+    for upper, n in zip([*stat.buckets, float("inf")], stat.histogram):
+        if n:
+            counts[next((j for j, bound in enumerate(EXPORT_BUCKETS) if upper <= bound), len(EXPORT_BUCKETS))] += n
+    total = 0
+    for j, n in enumerate(counts):
+        total += n
+        counts[j] = total
+    return counts
+
+
+class NoInstrumentation:
+    """Disabled instrumentation: every call is a no-op."""
+
+    enabled = False
+    timer_context = nullcontext()
+
+    def observe(self, name, value, **labels):
+        pass
+
+    def timer(self, name, **labels):
+        return self.timer_context
+
+    def snapshot(self, percentiles=(50, 90, 99)):
+        return {}
+
+
+NO_INSTRUMENTATION = NoInstrumentation()
+
+
+def call_status(player, answer, elapsed):
+    """ok, timeout or error: failed remote calls answer [] or a response code other than 200,
+    and those which took the player's `timeout` are timeouts."""
+    if answer is None:
+        failed = True
+    elif isinstance(answer, dict):
+        failed = answer.get("code", 200) != 200
+    elif answer and isinstance(answer[0], dict):
+        failed = any(a.get("code", 200) != 200 for a in answer)
+    else:
+        failed = not answer
+    if not failed:
+        return "ok"
+    timeout = getattr(player, "timeout", None)
+    return "timeout" if timeout is not None and elapsed >= timeout else "error"
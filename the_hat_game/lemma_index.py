@@ -0,0 +1,88 @@
+"""Precomputed answers to "does WordNet know this word" for the hard criteria.
+
+`wordnet.synsets(word)` lowercases the word and looks it up, together with its morphological base
+forms, in WordNet's lemma index. The set of words for which it finds anything is finite: lemma
+names, exception-list forms (e.g. "geese") and lemmas with one inflection rule applied backwards
+(e.g. "cats"). `LemmaIndex.build` enumerates these candidates once, keeps the ones WordNet accepts
+and the result is saved as a pickled frozenset, so the game answers with a single set lookup
+without importing WordNet.
+
+Build the index with `python -m the_hat_game.lemma_index [path]`. Once it exists at
+`DEFAULT_INDEX_PATH`, games with hard criteria use it instead of WordNet unless they are given
+their own `lemma_index`.
+"""
+
+import pickle
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+from the_hat_game.utils import get_project_root
+
+DEFAULT_INDEX_PATH = get_project_root() / "data" / "wordnet_lemmas.pkl"
+INDEX_FORMAT_VERSION = 1
+
+
+class LemmaIndex:
+    def __init__(self, words, wordnet_version=None):
+        self.words = frozenset(words)
+        self.wordnet_version = wordnet_version
+
+    def __contains__(self, word):
+        return word.lower() in self.words
+
+    def __len__(self):
+        return len(self.words)
+
+    @staticmethod
+    def candidate_forms(wordnet):
+        from nltk.corpus.reader.wordnet import POS_LIST
+
+        candidates = set(wordnet.all_lemma_names())
+        for pos in POS_LIST:
+            candidates.update(wordnet._exception_map[pos])
+            substitutions = wordnet.MORPHOLOGICAL_SUBSTITUTIONS[pos]
+            for lemma in wordnet.all_lemma_names(pos):
+                for old, new in substitutions:
+                    if lemma.endswith(new):
+                        candidates.add(lemma[: len(lemma) - len(new)] + old)
+        return candidates
+
+    @classmethod
+    def build(cls, wordnet=None):
+        if wordnet is None:
+            from nltk.corpus import wordnet
+
+        words = [w for w in cls.candidate_forms(wordnet) if len(wordnet.synsets(w)) > 0]
+        return cls(words, wordnet_version=wordnet.get_version())
+
+    def save(self, path=DEFAULT_INDEX_PATH):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump(
+                {"version": INDEX_FORMAT_VERSION, "wordnet_version": self.wordnet_version, "words": self.words},
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX_PATH):
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+        if data.get("version") != INDEX_FORMAT_VERSION:
+            raise ValueError(f"{path} was built with an incompatible version of the lemma index, rebuild it")
+        return cls(data["words"], wordnet_version=data["wordnet_version"])
+
+
+@lru_cache(maxsize=None)
+def load_lemma_index(path=DEFAULT_INDEX_PATH):
+    # the index is loaded once per process and shared by all games
+    return LemmaIndex.load(path)
+
+
+if __name__ == "__main__":
+    index_path = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_INDEX_PATH
+    index = LemmaIndex.build()
+    index.save(index_path)
+    print(f"Saved {len(index)} words of WordNet {index.wordnet_version} to {index_path}")
@@ -1,53 +1,177 @@
 import json
 import logging
-from copy import deepcopy
+import math
+import os
+import queue
+import threading
+from collections import defaultdict
 from datetime import datetime
+from pathlib import Path
 
-import pandas as pd
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 common_log_filename = "logs/game_run.log"
-current_log_filename = "logs/game run {}.log".format(pd.Timestamp.now().strftime("%Y-%m-%d %H_%M_%S"))
+current_log_filename = "logs/game run {}.log".format(datetime.now().strftime("%Y-%m-%d %H_%M_%S"))
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
-# Create handlers
+# Create handlers. They are attached to the logger by setup_logging, importing this module has no side effects
 c_handler = logging.StreamHandler()
-f_handler = logging.FileHandler(common_log_filename, mode="w")
 c_handler.setLevel(logging.WARNING)
-f_handler.setLevel(logging.DEBUG)
+f_handler = None
 
-# Create formatters and add it to handlers
+# Create formatters
 c_format = logging.Formatter("%(message)s")
 f_format = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 c_handler.setFormatter(c_format)
-f_handler.setFormatter(f_format)
 
-# Add handlers to the logger
-logger.addHandler(c_handler)
-logger.addHandler(f_handler)
 
-logger.info("started logging")
+def setup_console_logging():
+    if c_handler not in logger.handlers:
+        logger.addHandler(c_handler)
 
 
-def serialize(data_to_serialize):
-    data = deepcopy(data_to_serialize)
+def setup_logging(log_filename=common_log_filename, console=True):
+    """Install the console handler and a file handler writing the whole game log to `log_filename`."""
+    global f_handler
+    if console:
+        setup_console_logging()
+    if f_handler is None and log_filename is not None:
+        Path(log_filename).parent.mkdir(parents=True, exist_ok=True)
+        f_handler = logging.FileHandler(log_filename, mode="w")
+        f_handler.setLevel(logging.DEBUG)
+        f_handler.setFormatter(f_format)
+        logger.addHandler(f_handler)
+        logger.info("started logging")
+
+
+def serialize(data):
+    if isinstance(data, float) and not math.isfinite(data):
+        # orjson writes NaN and infinities as null, json would write invalid JSON
+        return None
     if isinstance(data, (int, float, str, bool)):
         return data
     if isinstance(data, datetime):
         return data.isoformat()
-    if isinstance(data, list):
+    if isinstance(data, (list, tuple)):
         return [serialize(i) for i in data]
     if isinstance(data, dict):
         return {key: serialize(value) for key, value in data.items()}
     if data is None:
         return data
-    raise NotImplementedError(
-        f"Serialisation is not implemented for {data_to_serialize} of type {type(data_to_serialize)}"
-    )
+    raise NotImplementedError(f"Serialisation is not implemented for {data} of type {type(data)}")
+
+
+def dumps(data):
+    """JSON representation of game data as bytes, through orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data, default=serialize, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(serialize(data), allow_nan=False).encode()
 
 
 def dump_locally(data, name):
-    with open(f"{name}.json", "w") as f:
-        f.write(json.dumps(serialize(data)))
-        f.write("\n")
+    # serialize first and replace the file at once, so a failure never leaves a truncated file behind
+    content = dumps(data)
+    path = f"{name}.json"
+    with open(f"{path}.tmp", "wb") as f:
+        f.write(content)
+        f.write(b"\n")
+    os.replace(f"{path}.tmp", path)
+
+
+class JsonlSink:
+    """Game logging callback which appends one JSON line per record to a single file.
+
+    Every line has a "record" field with the record name ("iteration" or "game"). The game record
+    does not repeat its iterations: they are replaced with "iteration_lines", the 0-based numbers
+    of the iteration lines of this game in the file. With `background=True` records are serialized
+    when they are logged and written to the file by a separate thread.
+    Can be passed as Game(logging_callback=JsonlSink(path)) and must be closed after the game.
+    """
+
+    def __init__(self, path, mode="a", background=False, buffer_size=2**16):
+        self.path = Path(path)
+        self.n_lines = 0
+        if mode == "a" and self.path.exists():
+            with open(self.path, "rb") as f:
+                self.n_lines = sum(1 for _ in f)
+        self.file = open(self.path, mode + "b", buffering=buffer_size)
+        self.iteration_lines = defaultdict(list)
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.queue = None
+        self.error = None
+        if background:
+            self.queue = queue.Queue()
+            self.writer = threading.Thread(target=self.write_queued, name="hat-game-log-writer", daemon=True)
+            self.writer.start()
+
+    def __call__(self, data, name):
+        if self.error is not None:
+            raise self.error
+        with self.lock:
+            # the line is numbered and serialized now, so the caller may change the record afterwards
+            line = self.encode(data, name)
+            if self.queue is not None:
+                self.queue.put((line, name))
+            else:
+                self.write(line, name)
+
+    def encode(self, data, name):
+        if name == "iteration":
+            self.iteration_lines[data.get("game_timestamp")].append(self.n_lines)
+        elif name == "game" and "iterations" in data:
+            data = {key: value for key, value in data.items() if key != "iterations"}
+            data["iteration_lines"] = self.iteration_lines.pop(data.get("timestamp"), [])
+        self.n_lines += 1
+        return dumps({"record": name, **data}) + b"\n"
+
+    def write(self, line, name):
+        with self.write_lock:
+            self.file.write(line)
+            if name == "game":
+                self.file.flush()
+
+    def write_queued(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                if self.error is None:
+                    self.write(*item)
+            except Exception as exc:
+                self.error = exc
+            finally:
+                self.queue.task_done()
+
+    def flush(self):
+        if self.queue is not None:
+            self.queue.join()
+        with self.write_lock:
+            self.file.flush()
+
+    def close(self):
+        if self.queue is not None:
+            self.queue.put(None)
+            self.writer.join()
+            self.queue = None
+        with self.write_lock:
+            self.file.close()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_jsonl(path):
+    with open(path, "rb") as f:
+        return [json.loads(line) for line in f]
@@ -1,4 +1,37 @@
-import nltk
+NLTK_PACKAGES = {
+    "wordnet": "corpora/wordnet",
+    "punkt": "tokenizers/punkt",
+}
 
-nltk.download("wordnet", quiet=True)
-nltk.download("punkt", quiet=True)
+
+def missing_nltk_data(packages=NLTK_PACKAGES):
+    """Names of the NLTK packages which are not installed locally. Never touches the network."""
+    import nltk
+
+    missing = []
+    for package in packages:
+        try:
+            nltk.data.find(NLTK_PACKAGES[package])
+        except LookupError:
+            missing.append(package)
+    return missing
+
+
+def nltk_data_available(packages=NLTK_PACKAGES):
+    return not missing_nltk_data(packages)
+
+
+def ensure_nltk_data(packages=NLTK_PACKAGES, download=True):
+    """Download the missing NLTK packages, or raise LookupError if `download` is False."""
+    missing = missing_nltk_data(packages)
+    if missing and not download:
+        raise LookupError(f"NLTK data is missing: {missing}, run the_hat_game.nltk_setup.ensure_nltk_data()")
+    if missing:
+        import nltk
+
+        for package in missing:
+            nltk.download(package, quiet=True)
+
+
+if __name__ == "__main__":
+    ensure_nltk_data()
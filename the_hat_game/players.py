@@ -1,3 +1,4 @@
+import time
 from collections import namedtuple
 
 import requests
@@ -34,23 +35,72 @@ class AbstractPlayer:
         raise NotImplementedError()
 
 
+class PlayerWrapper(AbstractPlayer):
+    """Base class for players which add behaviour on top of another player.
+
+    Attributes which are not defined by the wrapper (url, timeout, ping, ...) come from the wrapped player.
+    """
+
+    def __init__(self, player):
+        self.player = player
+
+    def __getattr__(self, name):
+        if name == "player":
+            raise AttributeError(name)
+        return getattr(self.player, name)
+
+    def explain(self, word, n_words):
+        return self.player.explain(word, n_words)
+
+    def guess(self, words, n_words):
+        return self.player.guess(words, n_words)
+
+
+def supports_sessions(player):
+    """Whether a player answers guessing sessions: `guess_next(session, word, n_words)` adds `word` to the
+    session's sentence and returns the guesses for the whole sentence, `end_session(session)` forgets it.
+
+    Wrappers take part only if they define `guess_next` themselves, the others would be bypassed.
+    """
+    while isinstance(player, PlayerWrapper):
+        if getattr(type(player), "guess_next", None) is None:
+            return False
+        player = player.player
+    return callable(getattr(player, "guess_next", None)) and callable(getattr(player, "end_session", None))
+
+
+def unwrap_player(player):
+    while isinstance(player, PlayerWrapper):
+        player = player.player
+    return player
+
+
 class RemotePlayer(AbstractPlayer):
+    # answers and response times may change between calls, see cache.CachedPlayer
+    deterministic = False
+
     def __init__(self, url, timeout=1):
         self.url = url
-        self.timeout = 1
+        self.timeout = timeout
+        # keep-alive connections are reused across all calls to the team's service
+        self.session = requests.Session()
+        # None until the first batch call tells whether the service has batch endpoints
+        self.supports_batch = None
         self.ping()
 
-    def ping(self):
+    def ping(self, timeout=60):
+        """Whether the service answers its index page."""
         try:
-            response = requests.get(self.url, timeout=60)
-            assert response.status_code == 200
+            response = self.session.get(self.url, timeout=timeout)
+            return response.status_code == 200
         except Exception as exc:
             if not HIDE_WARNINGS:
                 logger.warn(exc)
+            return False
 
     def explain(self, word, n_words):
         try:
-            response = requests.get(
+            response = self.session.get(
                 self.url + "/explain",
                 {"word": word, "n_words": n_words},
                 timeout=self.timeout,
@@ -66,8 +116,9 @@ class RemotePlayer(AbstractPlayer):
         return word_list
 
     def guess(self, words, n_words):
+        started = time.perf_counter()
         try:
-            response = requests.get(
+            response = self.session.get(
                 self.url + "/guess",
                 {"words": words, "n_words": n_words},
                 timeout=self.timeout,
@@ -82,6 +133,50 @@ class RemotePlayer(AbstractPlayer):
             if not HIDE_WARNINGS or isinstance(exc, ValidationError):
                 logger.warning(exc)
             word_list = []
-            response_time = 0
+            # the time it took to fail, a failed call is not a free one
+            response_time = time.perf_counter() - started
             response_code = None
         return {"word_list": word_list, "time": response_time, "code": response_code}
+
+    def post_batch(self, endpoint, queries):
+        """Send all queries in one request. Returns None if the service has no batch endpoints.
+
+        Every answer gets an equal share of the request's response time.
+        """
+        if self.supports_batch is False:
+            return None
+        started = time.perf_counter()
+        try:
+            response = self.session.post(
+                self.url + endpoint,
+                json=queries,
+                timeout=self.timeout * max(1, len(queries)),
+            )
+            if response.status_code in (404, 405):
+                # an old service: fall back to one GET per query from now on
+                self.supports_batch = False
+                return None
+            self.supports_batch = True
+            response_time = response.elapsed.total_seconds()
+            response_code = response.status_code
+            word_lists = response.json()
+            valid = isinstance(word_lists, list) and len(word_lists) == len(queries)
+            if not valid or not all(validate_word_list(word_list) for word_list in word_lists):
+                raise ValidationError("batch response must be a list of word lists, one for each query")
+        except Exception as exc:
+            # we don't need to hide ValidationError
+            if not HIDE_WARNINGS or isinstance(exc, ValidationError):
+                logger.warning(exc)
+            word_lists = [[] for _ in queries]
+            response_time = time.perf_counter() - started
+            response_code = None
+        response_time /= max(1, len(queries))
+        return [{"word_list": word_list, "time": response_time, "code": response_code} for word_list in word_lists]
+
+    def guess_batch(self, sentences, n_words):
+        """Guesses for several sentences in one request, or None if the service has no batch endpoints."""
+        return self.post_batch("/guess_batch", [{"words": words, "n_words": n_words} for words in sentences])
+
+
+def is_remote_player(player):
+    return isinstance(unwrap_player(player), RemotePlayer)
@@ -0,0 +1,197 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from the_hat_game.players import AbstractPlayer, unwrap_player
+from the_hat_game.stats import LATENCY_BUCKETS, RunningStat
+
+
+class ModelRegistry:
+    """Loads players (or the models behind them) on first use and keeps at most `memory_budget` bytes
+    of them, evicting the least recently used ones.
+
+    A model is registered with its loader and the memory it takes, e.g. for fastText the size of the
+    .bin file:
+
+        registry.register(path, lambda: LocalFasttextPlayer(fasttext.load_model(path)), os.path.getsize(path))
+        players = [PlayerDefinition(name, registry.player(path)) for name, path in teams.items()]
+
+    Teams with the same key share one loaded model. The memory of a model is reserved before it is
+    loaded, so concurrent loads wait for room instead of going over the budget. `prefetch` loads
+    models in a background thread, but only if they fit without evicting anything.
+
+    Every iteration asks all teams, so the budget has to hold all the models of a game: with a smaller
+    one the least recently used model would always be the next one needed and every `get` would load
+    its model again. Game refuses such budgets, see `check_memory_budgets`.
+    """
+
+    def __init__(self, memory_budget=None, prefetch_workers=1):
+        self.memory_budget = memory_budget
+        self.loaders = {}
+        self.resident = OrderedDict()
+        self.loading = {}
+        self.used = 0
+        self.pending = 0
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.prefetches = 0
+        self.prefetch_skipped = 0
+        self.evictions = 0
+        self.load_seconds = RunningStat(LATENCY_BUCKETS)
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.executor = ThreadPoolExecutor(prefetch_workers, thread_name_prefix="hat-registry")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    def register(self, key, load, size=0):
+        self.loaders[key] = (load, size)
+
+    def player(self, key):
+        return LazyPlayer(self, key)
+
+    def check_budget(self, keys):
+        """Raise ValueError if the models of `keys` do not fit in the budget together."""
+        size = sum(self.loaders[key][1] for key in set(keys))
+        if self.memory_budget is not None and size > self.memory_budget:
+            raise ValueError(
+                f"the models of a game take {size} bytes, more than the memory budget of {self.memory_budget}: "
+                "every call would load its model again"
+            )
+
+    def get(self, key):
+        """The loaded model of `key`, loading it now if it is neither resident nor being prefetched."""
+        load_now = False
+        with self.lock:
+            while True:
+                if key in self.resident:
+                    self.resident.move_to_end(key)
+                    self.hits += 1
+                    return self.resident[key]
+                future = self.loading.get(key)
+                if future is not None:
+                    # a prefetch or another thread is loading it already
+                    self.waits += 1
+                    break
+                if self.reserve(self.loaders[key][1]):
+                    self.misses += 1
+                    future = self.start_loading(key)
+                    load_now = True
+                    break
+                # the budget is taken by models being loaded, one of them may be this one
+                self.changed.wait()
+        if load_now:
+            self.load(key, future)
+        return future.result()
+
+    def reserve(self, size):
+        """Evict models until `size` more bytes fit in the budget with the ones being loaded. False if
+        the loads in flight alone leave no room, a model larger than the budget is loaded on its own."""
+        if self.memory_budget is None:
+            return True
+        if self.pending and self.pending + size > self.memory_budget:
+            return False
+        while self.resident and self.used + self.pending + size > self.memory_budget:
+            key, _ = self.resident.popitem(last=False)
+            self.used -= self.loaders[key][1]
+            self.evictions += 1
+        return True
+
+    def start_loading(self, key):
+        future = self.loading[key] = Future()
+        self.pending += self.loaders[key][1]
+        return future
+
+    def load(self, key, future):
+        load, size = self.loaders[key]
+        started = time.perf_counter()
+        try:
+            model = load()
+        except Exception as exc:
+            with self.lock:
+                del self.loading[key]
+                self.pending -= size
+                self.changed.notify_all()
+            future.set_exception(exc)
+            return
+        with self.lock:
+            self.load_seconds.update(time.perf_counter() - started)
+            # the room was reserved when the load started
+            self.pending -= size
+            self.resident[key] = model
+            self.used += size
+            del self.loading[key]
+            self.changed.notify_all()
+        future.set_result(model)
+
+    def prefetch(self, keys):
+        for key in keys:
+            with self.lock:
+                if key in self.resident or key in self.loading:
+                    continue
+                size = self.loaders[key][1]
+                if self.memory_budget is not None and self.used + self.pending + size > self.memory_budget:
+                    # models in use are not evicted for one which may be needed later
+                    self.prefetch_skipped += 1
+                    continue
+                self.prefetches += 1
+                future = self.start_loading(key)
+            self.executor.submit(self.load, key, future)
+
+    def info(self):
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "waits": self.waits,
+                "prefetches": self.prefetches,
+                "prefetch_skipped": self.prefetch_skipped,
+                "evictions": self.evictions,
+                "resident": len(self.resident),
+                "used": self.used,
+                "memory_budget": self.memory_budget,
+                "load_seconds": self.load_seconds.to_dict(percentiles=(50, 99)),
+            }
+
+
+class LazyPlayer(AbstractPlayer):
+    """Player whose model is taken from a ModelRegistry on every call. Game prefetches it before
+    the iterations it plays in."""
+
+    def __init__(self, registry, key):
+        self.registry = registry
+        self.key = key
+
+    @property
+    def player(self):
+        return self.registry.get(self.key)
+
+    def prefetch(self):
+        self.registry.prefetch([self.key])
+
+    def explain(self, word, n_words):
+        return self.player.explain(word, n_words)
+
+    def guess(self, words, n_words):
+        return self.player.guess(words, n_words)
+
+
+def check_memory_budgets(players):
+    """Raise ValueError if the players which load their models lazily can not be resident at once,
+    every iteration of a game asks all of them."""
+    keys = {}
+    for player in players:
+        api = unwrap_player(player.api)
+        if isinstance(api, LazyPlayer):
+            keys.setdefault(api.registry, set()).add(api.key)
+    for registry, registry_keys in keys.items():
+        registry.check_budget(registry_keys)
@@ -0,0 +1,219 @@
+import threading
+
+import numpy as np
+
+from the_hat_game.history import NO_RESPONSE_CODE, ColumnBuffer, Interner
+from the_hat_game.players import AbstractPlayer, PlayerDefinition, PlayerWrapper
+
+EXPLAIN = 0
+GUESS = 1
+QUESTIONS = {"explain": EXPLAIN, "guess": GUESS}
+
+CALL_COLUMNS = {
+    "team": np.int32,
+    "question": np.int8,
+    "n_words": np.int16,
+    "query_length": np.int16,
+    "answer_length": np.int16,
+    "response_time": np.float32,
+    "response_code": np.int16,
+}
+
+
+class Recording:
+    """Explain and guess calls of several teams with their answers, response times and codes.
+
+    Words are interned and stored as one column of ids, calls as typed columns with the lengths
+    of their queries and answers, so a recording is a compact `.npz` file. After `load` the
+    answers are indexed by (team, question, query, n_words); a query which was asked several
+    times is answered in the recorded order, and with its last answer after that.
+    """
+
+    def __init__(self):
+        self.teams = Interner()
+        self.words = Interner()
+        self.urls = {}
+        self.calls = ColumnBuffer(CALL_COLUMNS)
+        self.tokens = ColumnBuffer({"word": np.int32})
+        self.lock = threading.Lock()
+        self.index = None
+
+    def __len__(self):
+        return self.calls.size
+
+    def record(self, team, question, query, n_words, word_list, response_time=np.nan, response_code=None):
+        if question == "explain":
+            query = [query]
+        with self.lock:
+            for word in [*query, *word_list]:
+                self.tokens.append(word=self.words.id(word))
+            self.calls.append(
+                team=self.teams.id(team),
+                question=QUESTIONS[question],
+                n_words=n_words,
+                query_length=len(query),
+                answer_length=len(word_list),
+                response_time=np.nan if response_time is None else response_time,
+                response_code=NO_RESPONSE_CODE if response_code is None else response_code,
+            )
+            self.index = None
+
+    def save(self, path):
+        with self.lock:
+            np.savez_compressed(
+                path,
+                teams=np.array(self.teams.values, dtype=str),
+                urls=np.array([self.urls.get(team) or "" for team in self.teams.values], dtype=str),
+                words=np.array(self.words.values, dtype=str),
+                tokens=self.tokens.arrays()["word"],
+                **self.calls.arrays(),
+            )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls.from_arrays(data)
+
+    @classmethod
+    def from_arrays(cls, data):
+        recording = cls()
+        recording.teams = Interner(data["teams"].tolist())
+        recording.urls = {team: url or None for team, url in zip(data["teams"].tolist(), data["urls"].tolist())}
+        recording.words = Interner(data["words"].tolist())
+        recording.tokens.columns["word"] = data["tokens"].astype(np.int32)
+        recording.tokens.size = len(data["tokens"])
+        for name, dtype in CALL_COLUMNS.items():
+            recording.calls.columns[name] = data[name].astype(dtype)
+        recording.calls.size = len(data["team"])
+        return recording
+
+    def build_index(self):
+        """{(team id, question, query word ids, n_words): [(word_list, time, code), ...]} of all calls."""
+        index = {}
+        calls = self.calls.arrays()
+        tokens = self.tokens.arrays()["word"].tolist()
+        ends = np.cumsum(calls["query_length"].astype(np.int64) + calls["answer_length"]).tolist()
+        starts = [0] + ends[:-1]
+        codes = [None if code == NO_RESPONSE_CODE else code for code in calls["response_code"].tolist()]
+        rows = zip(
+            calls["team"].tolist(),
+            calls["question"].tolist(),
+            calls["n_words"].tolist(),
+            calls["query_length"].tolist(),
+            starts,
+            ends,
+            calls["response_time"].tolist(),
+            codes,
+        )
+        for team, question, n_words, query_length, start, end, response_time, code in rows:
+            query_end = start + query_length
+            query = tuple(tokens[start:query_end])
+            word_list = [self.words.values[w] for w in tokens[query_end:end]]
+            index.setdefault((team, question, query, n_words), []).append((word_list, response_time, code))
+        return index
+
+    def answers(self, team, question, query, n_words):
+        """The recorded answers to a call, or an empty list if it was not recorded."""
+        with self.lock:
+            if self.index is None:
+                self.index = self.build_index()
+        if question == "explain":
+            query = [query]
+        team_id = self.teams.ids.get(team)
+        query_ids = tuple(self.words.ids.get(word, -1) for word in query)
+        return self.index.get((team_id, QUESTIONS[question], query_ids, n_words), [])
+
+
+class RecordingPlayer(PlayerWrapper):
+    """Records every explain and guess answer of the wrapped player under `team` in a Recording."""
+
+    # the recording holds a lock, and answers recorded in a worker process would be lost
+    picklable = False
+
+    def __init__(self, player, recording, team):
+        super().__init__(player)
+        self.recording = recording
+        self.team = team
+        recording.urls[team] = getattr(player, "url", None)
+
+    def record_guess(self, words, n_words, answer):
+        if isinstance(answer, dict):
+            self.recording.record(
+                self.team, "guess", words, n_words, answer["word_list"], answer.get("time"), answer.get("code")
+            )
+        else:
+            self.recording.record(self.team, "guess", words, n_words, answer)
+
+    def explain(self, word, n_words):
+        word_list = self.player.explain(word, n_words)
+        self.recording.record(self.team, "explain", word, n_words, word_list)
+        return word_list
+
+    def guess(self, words, n_words):
+        answer = self.player.guess(words, n_words)
+        self.record_guess(words, n_words, answer)
+        return answer
+
+    def guess_batch(self, sentences, n_words):
+        answers = self.player.guess_batch(sentences, n_words)
+        for words, answer in zip(sentences, answers or ()):
+            self.record_guess(words, n_words, answer)
+        return answers
+
+
+class ReplayPlayer(AbstractPlayer):
+    """Answers with the answers `team` gave in a Recording, without any network calls.
+
+    Guesses come with the recorded response time and code, as RemotePlayer's do. Calls which were
+    not recorded (e.g. because changed cleaning rules give other sentences) are counted in
+    `misses` and answered as a failed call.
+    """
+
+    deterministic = True
+    # the call counters pick the next recorded answer of a repeated query and hold a lock
+    picklable = False
+
+    def __init__(self, recording, team):
+        self.recording = recording
+        self.team = team
+        self.url = recording.urls.get(team)
+        self.calls = {}
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def answer(self, question, query, n_words):
+        answers = self.recording.answers(self.team, question, query, n_words)
+        if not answers:
+            with self.lock:
+                self.misses += 1
+            return [], np.nan, None
+        key = (question, tuple(query) if question == "guess" else query, n_words)
+        with self.lock:
+            i = self.calls.get(key, 0)
+            self.calls[key] = i + 1
+        word_list, response_time, code = answers[min(i, len(answers) - 1)]
+        return list(word_list), response_time, code
+
+    def explain(self, word, n_words):
+        return self.answer("explain", word, n_words)[0]
+
+    def guess(self, words, n_words):
+        word_list, response_time, code = self.answer("guess", words, n_words)
+        return {"word_list": word_list, "time": response_time, "code": code}
+
+    def rewind(self):
+        """Replay the recorded answers from the first ones again."""
+        with self.lock:
+            self.calls.clear()
+            self.misses = 0
+
+
+def record_players(players, recording):
+    """PlayerDefinitions whose players record their answers under their names."""
+    return [PlayerDefinition(p.name, RecordingPlayer(p.api, recording, p.name)) for p in players]
+
+
+def replay_players(recording, teams=None):
+    """PlayerDefinitions replaying `teams` (all recorded teams by default)."""
+    teams = recording.teams.values if teams is None else teams
+    return [PlayerDefinition(team, ReplayPlayer(recording, team)) for team in teams]
@@ -0,0 +1,137 @@
+import hashlib
+import importlib
+import json
+from pathlib import Path
+
+import numpy as np
+
+from the_hat_game.game import Game, score_tables
+from the_hat_game.loggers import dumps
+from the_hat_game.players import PlayerDefinition, RemotePlayer
+from the_hat_game.tournament import Tournament
+
+GAME_SETTINGS = ("criteria", "n_rounds", "n_explain_words", "n_guessing_words", "random_state")
+
+
+class ShardError(Exception):
+    pass
+
+
+def load_config(path):
+    """Tournament config: a JSON file such as
+
+        {
+            "players": [
+                {"name": "Remote", "url": "http://127.0.0.1:5000", "timeout": 1},
+                {"name": "Local Dummy", "class": "flask_app.player.LocalDummyPlayer"}
+            ],
+            "words": {"files": ["text_samples/nouns_top_50.txt"], "sample": 12, "seed": 0},
+            "criteria": "soft",
+            "n_explain_words": 5,
+            "n_guessing_words": 5,
+            "random_state": 0
+        }
+
+    `words` may also be a list of words. Word files are relative to the config file, `n_rounds`
+    defaults to as many rounds as the words allow. Players with a "url" are RemotePlayers, the
+    others are built from their "class" and "kwargs". The hash of the config and of its words
+    identifies its shards.
+    """
+    path = Path(path)
+    text = path.read_text()
+    config = json.loads(text)
+    config["base_path"] = str(path.resolve().parent)
+    digest = hashlib.sha256(text.encode())
+    # shards played with other contents of the word files must not be merged
+    digest.update("\n".join(load_words(config)).encode())
+    config["hash"] = digest.hexdigest()
+    return config
+
+
+def build_player(spec):
+    if "url" in spec:
+        return RemotePlayer(spec["url"], timeout=spec.get("timeout", 1))
+    module, _, name = spec["class"].rpartition(".")
+    return getattr(importlib.import_module(module), name)(**spec.get("kwargs", {}))
+
+
+def build_players(config):
+    return [PlayerDefinition(spec["name"], build_player(spec)) for spec in config["players"]]
+
+
+def load_words(config):
+    words = config["words"]
+    if isinstance(words, list):
+        return list(words)
+    base_path = Path(config.get("base_path", "."))
+    vocabulary = set()
+    for name in words["files"]:
+        with open(base_path / name) as f:
+            vocabulary.update(line.strip() for line in f if line.strip())
+    vocabulary = sorted(vocabulary)
+    if "sample" in words:
+        rng = np.random.default_rng(words.get("seed", 0))
+        vocabulary = [vocabulary[i] for i in sorted(rng.choice(len(vocabulary), words["sample"], replace=False))]
+    return vocabulary
+
+
+def make_game(config, players=None, **kwargs):
+    players = players if players is not None else build_players(config)
+    words = load_words(config)
+    settings = {"criteria": "soft", "n_rounds": len(words) // len(players), "n_explain_words": 5, "n_guessing_words": 5}
+    settings.update({key: config[key] for key in GAME_SETTINGS if key in config})
+    settings.setdefault("random_state", 0)
+    return Game(players, words, **settings, **kwargs)
+
+
+def play_shard(config, shard, n_shards, max_workers=4, per_team_limit=None, players=None):
+    """Play the iterations of shard `shard` of `n_shards` and return them as a JSON-serializable dict."""
+    if not 0 <= shard < n_shards:
+        raise ShardError(f"shard {shard} is not one of {n_shards} shards")
+    # iterations are only logged to the shard's output
+    game = make_game(config, players, logging_callback=lambda data, name: None)
+    # planning is deterministic and does not call the players
+    n_iterations = sum(1 for _ in game.plan_iterations())
+    Tournament(max_workers, per_team_limit).run(game, shard=(shard, n_shards))
+    return {
+        "config_hash": config["hash"],
+        "shard": shard,
+        "n_shards": n_shards,
+        "n_iterations": n_iterations,
+        "game_info": {key: value for key, value in game.game_info.items() if key != "scores"},
+    }
+
+
+def save_shard(result, path):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(dumps(result))
+
+
+def load_shard(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def merge_shards(results):
+    """(game_info["scores"], scores, scores_status) of the whole game from the results of all its shards,
+    the same as a single run of the game gives."""
+    if not results:
+        raise ShardError("no shards to merge")
+    first = results[0]
+    for result in results:
+        for key in ("config_hash", "n_shards", "n_iterations"):
+            if result[key] != first[key]:
+                raise ShardError(f"shards {first['shard']} and {result['shard']} have different {key}")
+    shards = sorted(result["shard"] for result in results)
+    if shards != list(range(first["n_shards"])):
+        raise ShardError(f"expected shards 0..{first['n_shards'] - 1}, got {shards}")
+    iterations = sorted(
+        (iteration for result in results for iteration in result["game_info"]["iterations"]),
+        key=lambda iteration: iteration["iteration"],
+    )
+    if [iteration["iteration"] for iteration in iterations] != list(range(first["n_iterations"])):
+        raise ShardError("the shards do not cover every iteration exactly once")
+    return score_tables(
+        [(i["explaining_player"], i["guessing_players"], i["scores"]) for i in iterations],
+    )
@@ -0,0 +1,136 @@
+import math
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+import numpy as np
+
+# latency histogram buckets: 1 ms to ~2 min, 10% apart
+LATENCY_BUCKETS = tuple(1e-3 * 1.1**i for i in range(124))
+LATENCY_METRICS = ("response_time",)
+
+
+class RunningStat:
+    """Count, sum, mean, min and max of a stream of values updated in O(1) memory.
+
+    NaN values are counted in `missing` and do not affect the other statistics; they make `mean`
+    NaN (as np.mean would) unless `skip_missing` is set (as np.nanmean). With `buckets` the values
+    are also counted in a histogram which is used to estimate percentiles.
+    """
+
+    def __init__(self, buckets=None, skip_missing=False):
+        self.skip_missing = skip_missing
+        self.count = 0
+        self.missing = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.buckets = buckets
+        self.histogram = [0] * (len(buckets) + 1) if buckets is not None else None
+
+    def update(self, value):
+        if value is None or value != value:
+            self.missing += 1
+            return
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if self.histogram is not None:
+            self.histogram[bisect_left(self.buckets, value)] += 1
+
+    def merge(self, other):
+        self.count += other.count
+        self.missing += other.missing
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if self.histogram is not None and other.histogram is not None:
+            self.histogram = [a + b for a, b in zip(self.histogram, other.histogram)]
+        return self
+
+    @property
+    def mean(self):
+        if (self.missing and not self.skip_missing) or not self.count:
+            return np.nan
+        return self.sum / self.count
+
+    def percentile(self, q):
+        if self.histogram is None or not self.count:
+            return np.nan
+        rank = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.histogram):
+            seen += n
+            if n and seen >= rank:
+                # upper bound of the bucket, but never outside of the observed range
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(max(upper, self.min), self.max)
+        return self.max
+
+    def to_dict(self, percentiles=()):
+        result = {
+            "count": self.count,
+            "missing": self.missing,
+            "mean": self.mean,
+            "min": self.min if self.count else np.nan,
+            "max": self.max if self.count else np.nan,
+        }
+        for q in percentiles:
+            result[f"p{q}"] = self.percentile(q)
+        return result
+
+
+class GameStats:
+    """Running statistics per (player, metric) of everything players reported during a game.
+
+    Means skip missing values, which are reported in the `missing` column, so that one failed
+    answer does not blank a player's statistics for the whole game; per-iteration metrics set
+    `skip_missing=False` to keep the NaN of np.mean.
+    """
+
+    def __init__(self, latency_metrics=LATENCY_METRICS, buckets=LATENCY_BUCKETS, skip_missing=True):
+        self.latency_metrics = latency_metrics
+        self.buckets = buckets
+        self.skip_missing = skip_missing
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def new_stat(self, metric):
+        buckets = self.buckets if metric in self.latency_metrics else None
+        return RunningStat(buckets, skip_missing=self.skip_missing)
+
+    def update(self, player, metric, value):
+        with self.lock:
+            stat = self.stats.get((player, metric))
+            if stat is None:
+                stat = self.stats[(player, metric)] = self.new_stat(metric)
+            stat.update(value)
+
+    def get(self, player, metric):
+        return self.stats.get((player, metric))
+
+    def merge(self, other):
+        with self.lock:
+            for key, stat in other.stats.items():
+                if key not in self.stats:
+                    self.stats[key] = self.new_stat(key[1])
+                self.stats[key].merge(stat)
+        return self
+
+    def means(self):
+        means = defaultdict(dict)
+        for (player, metric), stat in self.stats.items():
+            means[player][metric] = stat.mean
+        return means
+
+    def to_frame(self, percentiles=(50, 90, 99)):
+        import pandas as pd
+
+        rows = {key: stat.to_dict(percentiles) for key, stat in self.stats.items()}
+        frame = pd.DataFrame.from_dict(rows, orient="index")
+        if len(frame):
+            frame.index.names = ["player", "metric"]
+        return frame
@@ -0,0 +1,136 @@
+"""Players, servers and fakes shared by the test modules."""
+
+import json
+import socket
+import threading
+import time
+from collections import Counter
+
+from flask import Flask, request
+from werkzeug.serving import make_server
+
+from the_hat_game.game import Game
+from the_hat_game.players import AbstractPlayer, PlayerDefinition, PlayerWrapper
+
+ASSOCIATIONS = {
+    "cat": ["kitten", "purr", "mouse", "whiskers"],
+    "dog": ["puppy", "bark", "bone", "leash"],
+    "house": ["roof", "door", "window", "chimney"],
+    "tree": ["leaves", "branch", "forest", "trunk"],
+    "car": ["wheel", "engine", "road", "driver"],
+    "book": ["pages", "library", "author", "chapter"],
+}
+
+
+class AssociationPlayer(AbstractPlayer):
+    def __init__(self, depth, delay=0.0):
+        self.depth = depth
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def call(self, result):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return result
+
+    def explain(self, word, n_words):
+        return self.call(ASSOCIATIONS[word][:n_words])
+
+    def guess(self, words, n_words):
+        guesses = [w for w, hints in ASSOCIATIONS.items() if hints[self.depth - 1] in words]
+        return self.call(guesses[:n_words])
+
+
+def make_game(players, words, n_rounds=2, **kwargs):
+    return Game(
+        players,
+        words,
+        "soft",
+        n_rounds=n_rounds,
+        n_explain_words=3,
+        n_guessing_words=2,
+        random_state=42,
+        logging_callback=lambda data, name: None,
+        **kwargs,
+    )
+
+
+def make_players(delay=0.0):
+    return [PlayerDefinition(f"team {depth}", AssociationPlayer(depth, delay)) for depth in (1, 2, 3)]
+
+
+class CountingPlayer(PlayerWrapper):
+    def __init__(self, player):
+        super().__init__(player)
+        self.calls = Counter()
+
+    def explain(self, word, n_words):
+        self.calls["explain"] += 1
+        return self.player.explain(word, n_words)
+
+    def guess(self, words, n_words):
+        self.calls["guess"] += 1
+        return self.player.guess(words, n_words)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def closed_port_url():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}"
+
+
+class PlayerServer:
+    def __init__(self, player, batch, batch_status=200):
+        self.requests = Counter()
+        app = Flask(__name__)
+
+        @app.before_request
+        def count():
+            self.requests[request.path] += 1
+
+        app.add_url_rule("/", "index", lambda: "ok")
+        app.add_url_rule(
+            "/explain",
+            "explain",
+            lambda: json.dumps(player.explain(request.args["word"], int(request.args["n_words"]))),
+        )
+        app.add_url_rule(
+            "/guess",
+            "guess",
+            lambda: json.dumps(player.guess(request.args.getlist("words"), int(request.args["n_words"]))),
+        )
+        if batch:
+            app.add_url_rule(
+                "/guess_batch",
+                "guess_batch",
+                lambda: (
+                    json.dumps([player.guess(q["words"], q["n_words"]) for q in request.get_json()]),
+                    batch_status,
+                ),
+                methods=["POST"],
+            )
+        self.server = make_server("127.0.0.1", 0, app, threaded=True)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.thread.join()
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+from aiohttp import web
+
+from flask_app.player import LocalDummyPlayer
+from the_hat_game.async_game import AsyncGame
+from the_hat_game.async_players import AsyncRemotePlayer
+from the_hat_game.players import PlayerDefinition
+
+
+class StandInServer:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.peers = set()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    async def index(self, request):
+        return web.Response(text="ok")
+
+    async def answer(self, request):
+        self.peers.add(request.transport.get_extra_info("peername"))
+        await asyncio.sleep(self.delay)
+        return web.Response(text=json.dumps(["cat", "kitten", "pet"]))
+
+    async def setup(self):
+        app = web.Application()
+        app.add_routes([web.get("/", self.index), web.get("/explain", self.answer), web.get("/guess", self.answer)])
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        self.url = asyncio.run_coroutine_threadsafe(self.setup(), self.loop).result()
+        return self
+
+    def __exit__(self, *exc_info):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+@pytest.fixture
+def servers():
+    with StandInServer() as fast, StandInServer(delay=2) as slow:
+        yield fast, slow
+
+
+def test_async_game_reuses_connections_and_enforces_deadline(servers):
+    fast, slow = servers
+    players = [
+        PlayerDefinition("fast", AsyncRemotePlayer(fast.url, timeout=5)),
+        PlayerDefinition("slow", AsyncRemotePlayer(slow.url, timeout=5)),
+        PlayerDefinition("local", LocalDummyPlayer()),
+    ]
+    game = AsyncGame(
+        players,
+        ["dog", "cat", "house"],
+        "soft",
+        n_rounds=1,
+        n_explain_words=3,
+        n_guessing_words=3,
+        random_state=0,
+        logging_callback=lambda data, name: None,
+        attempt_timeout=0.2,
+    )
+    started = time.perf_counter()
+    game.run()
+    elapsed = time.perf_counter() - started
+
+    attempts = [attempt for iteration in game.game_info["iterations"] for attempt in iteration["attempts"]]
+    assert any("fast" in attempt for attempt in attempts)
+    for attempt in attempts:
+        if "fast" in attempt:
+            assert attempt["fast"]["response_200"]
+        if "slow" in attempt:
+            assert not attempt["slow"]["response_200"]
+            # a missed deadline counts as the whole attempt, not as an instant answer
+            assert attempt["slow"]["response_time"] == pytest.approx(0.2)
+    # a single keep-alive connection per team
+    assert len(fast.peers) == 1
+    # the slow team never stretches an attempt beyond the shared deadline
+    assert elapsed < 2
+    assert not game.event_loop.started
+
+
+def test_session_of_a_previous_loop_is_closed(servers):
+    fast, _ = servers
+    player = AsyncRemotePlayer(fast.url, timeout=5)
+    sessions = []
+
+    async def guess():
+        answer = await player.guess(["cat"], 3)
+        sessions.append(player._session)
+        return answer
+
+    for _ in range(2):
+        assert asyncio.run(guess())["code"] == 200
+    assert sessions[0] is not sessions[1]
+    assert sessions[0].closed
+    asyncio.run(player.close())
+    assert sessions[1].closed
@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+
+from the_hat_game.game import Game
+from the_hat_game.players import PlayerDefinition, RemotePlayer
+from the_hat_game.tests.helpers import ASSOCIATIONS, AssociationPlayer, PlayerServer
+
+
+def play(servers, batch_guesses):
+    players = [PlayerDefinition(f"team {i}", RemotePlayer(server.url)) for i, server in enumerate(servers)]
+    players.append(PlayerDefinition("local", AssociationPlayer(3)))
+    for server in servers:
+        server.requests.clear()
+    game = Game(
+        players,
+        list(ASSOCIATIONS)[:3],
+        "soft",
+        n_rounds=1,
+        n_explain_words=3,
+        n_guessing_words=2,
+        random_state=0,
+        logging_callback=lambda data, name: None,
+        batch_guesses=batch_guesses,
+    )
+    game.run()
+    return game
+
+
+@pytest.fixture
+def servers():
+    with PlayerServer(AssociationPlayer(1), batch=True) as new, PlayerServer(AssociationPlayer(2), batch=False) as old:
+        yield new, old
+
+
+def test_batch_guesses_negotiation(servers):
+    new, old = servers
+    serial = play(servers, batch_guesses=False)
+    batched = play(servers, batch_guesses=True)
+    pd.testing.assert_frame_equal(serial.scores, batched.scores)
+
+    # the new service answers every iteration it guesses in with one request
+    assert new.requests["/guess"] == 0
+    assert new.requests["/guess_batch"] == 2
+    # the old service is probed once and then asked attempt by attempt
+    assert old.requests["/guess_batch"] == 1
+    assert old.requests["/guess"] > 0
+
+
+def test_failed_batch_falls_back_to_single_guesses():
+    with PlayerServer(AssociationPlayer(1), batch=True, batch_status=500) as failing:
+        serial = play([failing], batch_guesses=False)
+        batched = play([failing], batch_guesses=True)
+    pd.testing.assert_frame_equal(serial.scores, batched.scores)
+    # every attempt of the failed batch was asked again with a GET
+    iterations = [i for i in batched.game_info["iterations"] if "team 0" in i["guessing_players"]]
+    assert failing.requests["/guess_batch"] == len(iterations)
+    attempts = [attempt for i in iterations for attempt in i["attempts"]]
+    assert failing.requests["/guess"] == sum("team 0" in attempt for attempt in attempts)
@@ -0,0 +1,96 @@
+import ast
+import inspect
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from the_hat_game import cache
+from the_hat_game.cache import CachedPlayer, LRUCache
+from the_hat_game.players import PlayerDefinition
+from the_hat_game.tests.helpers import ASSOCIATIONS, AssociationPlayer, CountingPlayer, FakeClock, make_game
+from the_hat_game.utils import get_project_root
+
+
+def test_lru_cache_evicts_and_expires():
+    clock = FakeClock()
+    cache = LRUCache(maxsize=2, ttl=10, clock=clock)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == (True, 1)
+    cache.put("c", 3)
+    # "b" was the least recently used
+    assert cache.get("b") == (False, None)
+    clock.now = 9
+    assert cache.get("c") == (True, 3)
+    clock.now = 10
+    assert cache.get("c") == (False, None)
+    assert cache.info() == {"hits": 2, "misses": 2, "size": 1, "maxsize": 2}
+
+
+def test_cached_players_give_the_same_game_with_fewer_calls():
+    words = list(ASSOCIATIONS)[:3]
+
+    def play(wrap):
+        counters = [CountingPlayer(AssociationPlayer(depth)) for depth in (1, 2, 3)]
+        players = [PlayerDefinition(f"team {i}", wrap(player)) for i, player in enumerate(counters)]
+        game = make_game(players, words, n_rounds=1)
+        # complete runs shuffle players with the global numpy state
+        np.random.seed(0)
+        game.run(complete=True)
+        game.run(complete=True)
+        return game, sum((player.calls for player in counters), Counter())
+
+    plain, plain_calls = play(lambda player: player)
+    cached, cached_calls = play(CachedPlayer)
+    pd.testing.assert_frame_equal(plain.scores, cached.scores)
+    # the second run is answered from the cache entirely
+    assert cached_calls["explain"] * 2 == plain_calls["explain"]
+    assert cached_calls["guess"] * 2 <= plain_calls["guess"]
+
+
+def test_cached_player_normalizes_and_copies():
+    player = CountingPlayer(AssociationPlayer(1))
+    cached = CachedPlayer(player, case_insensitive=True)
+    answer = cached.guess(["kitten", "puppy"], 2)
+    answer.append("spoiled")
+    assert cached.guess(["Kitten ", "PUPPY"], 2) == ["cat", "dog"]
+    assert cached.guess(["kitten", "puppy"], 1) == ["cat"]
+    assert player.calls["guess"] == 2
+    assert cached.cache.info()["hits"] == 1
+
+    # by default the case of a query matters
+    cached = CachedPlayer(player)
+    cached.guess(["kitten", "puppy"], 2)
+    cached.guess(["Kitten", "puppy"], 2)
+    assert cached.cache.info()["hits"] == 0 and player.calls["guess"] == 4
+
+
+def test_app_cache_is_the_same():
+    # the app is deployed without the_hat_game, so flask_app/cache.py has a copy of these
+    def definitions(source):
+        nodes = [node for node in ast.parse(source).body if getattr(node, "name", None) in names]
+        return {node.name: ast.get_source_segment(source, node) for node in nodes}
+
+    names = ("LRUCache", "normalize_word", "copy_answer")
+    shared = definitions(inspect.getsource(cache))
+    assert len(shared) == len(names)
+    assert definitions((get_project_root() / "flask_app" / "cache.py").read_text()) == shared
+
+
+def test_non_deterministic_players_are_not_cached():
+    player = CountingPlayer(AssociationPlayer(1))
+    player.deterministic = False
+    cached = CachedPlayer(player)
+    cached.explain("cat", 2)
+    cached.explain("cat", 2)
+    assert player.calls["explain"] == 2
+    assert len(cached.cache) == 0
+    assert CachedPlayer(player, deterministic=True).deterministic
+
+
+def test_cached_players_are_refused_by_the_process_backend():
+    players = [PlayerDefinition(f"team {d}", CachedPlayer(AssociationPlayer(d))) for d in (1, 2)]
+    with pytest.raises(ValueError, match="team 1 can not be used with the 'process' executor backend"):
+        make_game(players, list(ASSOCIATIONS), executor="process")
@@ -0,0 +1,77 @@
+import random
+import re
+import string
+
+import pytest
+from nltk.metrics.distance import edit_distance
+from nltk.stem.snowball import SnowballStemmer
+
+from the_hat_game import cleaning
+from the_hat_game.cleaning import WordListCleaner, bounded_edit_distance
+
+EXISTING_WORDS = {"kitten", "purr", "mouse", "whisker", "whiskers", "pet", "animal"}
+
+
+class FakeWordnet:
+    @staticmethod
+    def synsets(word):
+        return [word] if word in EXISTING_WORDS else []
+
+
+@pytest.fixture(autouse=True)
+def fake_wordnet(monkeypatch):
+    monkeypatch.setattr(cleaning, "get_wordnet", lambda: FakeWordnet)
+    monkeypatch.setattr(cleaning, "get_default_lemma_index", lambda: None)
+    cleaning.word_exists.cache_clear()
+    yield
+    cleaning.word_exists.cache_clear()
+
+
+def reference_word_list(criteria, word, reported_words, n_words):
+    # the rules as they were implemented in Game.create_word_list
+    stemmer = SnowballStemmer("english")
+    explain_words = reported_words[:]
+    if criteria == "hard":
+        explain_words = explain_words[:n_words]
+    explain_words = [w.lower() for w in explain_words]
+    explain_words = [re.sub(r"[\W\d]", "", w) for w in explain_words]
+    explain_words = [w for w in explain_words if word not in w]
+    explain_words = [w for w in explain_words if edit_distance(word, w) > 2]
+    explain_words = [w for w in explain_words if w != ""]
+    unique_words = []
+    for c in explain_words:
+        if c not in unique_words:
+            unique_words.append(c)
+    explain_words = unique_words
+    if criteria == "hard":
+        root = stemmer.stem(word)
+        explain_words = [w for w in explain_words if stemmer.stem(w) != root]
+        explain_words = [w for w in explain_words if len(FakeWordnet.synsets(w)) > 0]
+    if criteria == "soft":
+        explain_words = explain_words[:n_words]
+    return explain_words
+
+
+def random_word(rng):
+    return "".join(rng.choice("catsk1-!") for _ in range(rng.randint(0, 7)))
+
+
+def test_bounded_edit_distance_matches_nltk():
+    rng = random.Random(0)
+    for _ in range(2000):
+        s1, s2 = random_word(rng), random_word(rng)
+        for max_distance in (0, 1, 2, 3):
+            assert bounded_edit_distance(s1, s2, max_distance) == min(edit_distance(s1, s2), max_distance + 1)
+
+
+@pytest.mark.parametrize("criteria", ["soft", "hard"])
+def test_cleaner_matches_reference_rules(criteria):
+    rng = random.Random(1)
+    vocabulary = list(EXISTING_WORDS) + ["Cat", "cats", "CAT!", "kitten2", "", "Kitten", "dog", "scat", "caterpillar"]
+    vocabulary += ["".join(rng.choice(string.ascii_letters) for _ in range(5)) for _ in range(10)]
+    cleaner = WordListCleaner(criteria)
+    for _ in range(500):
+        reported_words = rng.choices(vocabulary, k=rng.randint(0, 12))
+        n_words = rng.randint(0, 8)
+        expected = reference_word_list(criteria, "cat", reported_words, n_words)
+        assert cleaner.clean("cat", reported_words, n_words) == expected
@@ -0,0 +1,24 @@
+import random
+
+import pytest
+from nltk.metrics.distance import edit_distance
+
+from the_hat_game.criteria import GuessEvaluator
+
+
+def reference_check(criteria, word, guessed_words):
+    # the rules as they were implemented in Game.check_criteria
+    if criteria == "soft":
+        return any((word in c) and (edit_distance(word, c) < 3) for c in guessed_words)
+    return word in guessed_words
+
+
+@pytest.mark.parametrize("criteria", ["soft", "hard"])
+def test_evaluator_matches_reference_rules(criteria):
+    rng = random.Random(0)
+    vocabulary = ["cat", "cats", "scat", "catss", "cattle", "caterpillar", "dog", "", "ca", "Cat", "bobcats"]
+    evaluator = GuessEvaluator(criteria)
+    for _ in range(300):
+        players_words = {f"player {i}": rng.choices(vocabulary, k=rng.randint(0, 5)) for i in range(4)}
+        expected = {name: reference_check(criteria, "cat", words) for name, words in players_words.items()}
+        assert evaluator.evaluate("cat", players_words) == expected
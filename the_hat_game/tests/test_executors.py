@@ -0,0 +1,60 @@
+import threading
+
+import pytest
+
+from flask_app.player import LocalDummyPlayer
+from the_hat_game.executors import FanOutExecutor
+from the_hat_game.game import Game
+from the_hat_game.players import PlayerDefinition
+
+
+def square(x):
+    return x * x
+
+
+@pytest.mark.parametrize("backend", ["thread", "process", "inline"])
+def test_executor_starmap(backend):
+    with FanOutExecutor(backend, max_workers=2) as executor:
+        assert executor.starmap(square, [(i,) for i in range(5)]) == [0, 1, 4, 9, 16]
+    assert not executor.started
+
+
+def test_executor_requires_start():
+    with pytest.raises(RuntimeError):
+        FanOutExecutor("inline").submit(square, 2)
+
+
+def test_executor_unknown_backend():
+    with pytest.raises(ValueError):
+        FanOutExecutor("gevent")
+
+
+class ThreadRecordingPlayer(LocalDummyPlayer):
+    def __init__(self):
+        self.threads = set()
+
+    def guess(self, words, n_words):
+        self.threads.add(threading.current_thread().name)
+        return super().guess(words, n_words)
+
+
+@pytest.mark.parametrize("parallel_local_players", [False, True])
+def test_game_runs_with_single_pool(parallel_local_players):
+    apis = [ThreadRecordingPlayer() for _ in range(3)]
+    players = [PlayerDefinition(f"player {i}", api) for i, api in enumerate(apis)]
+    game = Game(
+        players,
+        ["cat", "dog", "house"],
+        "soft",
+        n_rounds=1,
+        n_explain_words=3,
+        n_guessing_words=3,
+        random_state=0,
+        logging_callback=lambda data, name: None,
+        parallel_local_players=parallel_local_players,
+    )
+    game.run()
+    assert not game.executor.started
+    assert len(game.game_info["iterations"]) == 3
+    on_pool = any(name.startswith("hat-game") for api in apis for name in api.threads)
+    assert on_pool == parallel_local_players
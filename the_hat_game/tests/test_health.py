@@ -0,0 +1,124 @@
+import time
+
+import numpy as np
+import pytest
+
+from the_hat_game.health import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, HealthCheckedPlayer
+from the_hat_game.players import AbstractPlayer, PlayerDefinition, RemotePlayer
+from the_hat_game.tests.helpers import (
+    ASSOCIATIONS,
+    AssociationPlayer,
+    CountingPlayer,
+    FakeClock,
+    closed_port_url,
+    make_game,
+)
+
+
+class FlakyPlayer(AbstractPlayer):
+    def __init__(self):
+        self.up = False
+        self.broken = False
+        self.calls = 0
+
+    def ping(self, timeout=60):
+        return self.up
+
+    def explain(self, word, n_words):
+        self.calls += 1
+        return ASSOCIATIONS[word][:n_words] if self.up else []
+
+    def guess(self, words, n_words):
+        self.calls += 1
+        if self.broken:
+            raise ConnectionError("service crashed")
+        return {"word_list": [], "time": 0.1, "code": 200 if self.up else 500}
+
+
+def test_breaker_opens_and_recovers_after_reset_timeout():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    assert breaker.allow() and breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+    clock.now = 10
+    # one trial call at a time
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    clock.now = 20
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.allow()
+    info = breaker.to_dict()
+    assert [state for _, state in info["transitions"]] == [OPEN, HALF_OPEN, OPEN, HALF_OPEN, CLOSED]
+    assert (info["successes"], info["failures"], info["rejected"]) == (1, 3, 2)
+
+
+def test_dead_team_is_short_circuited_and_recorded():
+    down = CountingPlayer(RemotePlayer(closed_port_url(), timeout=5))
+    players = [
+        PlayerDefinition("team 1", AssociationPlayer(1)),
+        PlayerDefinition("team 2", AssociationPlayer(2)),
+        PlayerDefinition("down", HealthCheckedPlayer(down, CircuitBreaker(failure_threshold=2), probe_interval=60)),
+    ]
+    game = make_game(players, list(ASSOCIATIONS)[:6], n_rounds=2)
+    game.run()
+
+    health = game.game_info["health"]["down"]
+    assert health["state"] == OPEN
+    assert sum(down.calls.values()) == 2
+    assert health["rejected"] > 0
+    assert set(game.game_info["health"]) == {"down"}
+    assert [iteration["health"]["down"] for iteration in game.game_info["iterations"]][-1] == OPEN
+    players[2].api.close()
+
+
+def test_recovered_team_rejoins_after_ping():
+    flaky = FlakyPlayer()
+    player = HealthCheckedPlayer(flaky, CircuitBreaker(failure_threshold=1, reset_timeout=60), probe_interval=0.01)
+    assert player.guess(["kitten"], 2)["code"] == 500
+    rejected = player.guess(["kitten"], 2)
+    assert rejected["word_list"] == [] and rejected["code"] is None and np.isnan(rejected["time"])
+    assert flaky.calls == 1
+
+    flaky.up = True
+    deadline = time.monotonic() + 5
+    while player.breaker.state == OPEN and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert player.breaker.state == HALF_OPEN
+    assert player.explain("cat", 2) == ["kitten", "purr"]
+    assert player.breaker.state == CLOSED
+    player.close()
+
+
+def test_raising_trial_call_opens_the_breaker_again():
+    clock = FakeClock()
+    flaky = FlakyPlayer()
+    flaky.broken = True
+    player = HealthCheckedPlayer(flaky, CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock))
+    with pytest.raises(ConnectionError):
+        player.guess(["kitten"], 2)
+    assert player.breaker.state == OPEN
+
+    clock.now = 10
+    with pytest.raises(ConnectionError):
+        player.guess(["kitten"], 2)
+    assert player.breaker.state == OPEN and not player.breaker.trial_in_flight
+    # the next trial is let through after the reset timeout
+    flaky.broken = False
+    flaky.up = True
+    clock.now = 20
+    assert player.guess(["kitten"], 2)["code"] == 200
+    assert player.breaker.state == CLOSED
+    player.close()
+
+
+def test_health_checked_players_are_refused_by_the_process_backend():
+    players = [PlayerDefinition(f"team {d}", HealthCheckedPlayer(AssociationPlayer(d))) for d in (1, 2)]
+    with pytest.raises(ValueError, match="team 1 can not be used with the 'process' executor backend"):
+        make_game(players, list(ASSOCIATIONS), executor="process")
@@ -0,0 +1,53 @@
+import pandas as pd
+
+from the_hat_game.game import Game
+from the_hat_game.history import HistoryStore
+from the_hat_game.tests.helpers import ASSOCIATIONS, make_players
+
+
+def play(history, keep_iterations=True):
+    game = Game(
+        make_players(),
+        list(ASSOCIATIONS),
+        "soft",
+        n_rounds=2,
+        n_explain_words=3,
+        n_guessing_words=2,
+        random_state=42,
+        logging_callback=lambda data, name: None,
+        history=history,
+        keep_iterations=keep_iterations,
+    )
+    game.run()
+    return game
+
+
+def test_history_recomputes_scores(tmp_path):
+    history = HistoryStore(directory=tmp_path / "chunks", chunk_size=4)
+    game = play(history, keep_iterations=False)
+    assert game.game_info["iterations"] == []
+    assert len(history.chunks) > 0
+
+    for store in (history, HistoryStore.load(history_path(history, tmp_path))):
+        pd.testing.assert_frame_equal(store.scores(), game.scores)
+        pd.testing.assert_frame_equal(store.scores_status(), game.scores_status)
+        accuracy = store.accuracy()
+        assert accuracy["team 1"] == 1.0
+        # local players have no response times
+        assert store.latency_percentiles(successful_only=False).empty
+
+
+def history_path(history, tmp_path):
+    path = tmp_path / "history.npz"
+    history.save(path)
+    return path
+
+
+def test_history_columns_match_game_info():
+    history = HistoryStore()
+    game = play(history)
+    n_attempts = sum(len(attempt) for i in game.game_info["iterations"] for attempt in i["attempts"])
+    frame = history.attempts_frame()
+    assert len(frame) == len(history) == n_attempts
+    assert set(frame["word"]) <= set(ASSOCIATIONS)
+    assert (frame["response_code"] == -1).all()
@@ -0,0 +1,32 @@
+import json
+import subprocess
+import sys
+
+from the_hat_game.utils import get_project_root
+
+HEAVY_MODULES = ("nltk", "pandas", "IPython")
+
+IMPORT_SCRIPT = f"""
+import json, sys, time
+started = time.perf_counter()
+import the_hat_game.game, the_hat_game.players, the_hat_game.loggers
+elapsed = time.perf_counter() - started
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def test_import_is_lazy_and_side_effect_free(tmp_path):
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        cwd=tmp_path,
+        env={"PYTHONPATH": str(get_project_root())},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    report = json.loads(result.stdout)
+    print(f"import the_hat_game.game: {report['elapsed'] * 1000:.0f} ms")
+    assert report["loaded"] == []
+    # nothing is downloaded, printed or written on import
+    assert result.stderr == ""
+    assert list(tmp_path.iterdir()) == []
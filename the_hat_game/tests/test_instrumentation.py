@@ -0,0 +1,71 @@
+import json
+import time
+
+from the_hat_game.instrumentation import NO_INSTRUMENTATION, Instrumentation
+from the_hat_game.players import AbstractPlayer, PlayerDefinition, RemotePlayer
+from the_hat_game.tests.helpers import ASSOCIATIONS, AssociationPlayer, closed_port_url, make_game
+
+
+class SlowFailingPlayer(AbstractPlayer):
+    timeout = 0.01
+
+    def __init__(self):
+        pass
+
+    def explain(self, word, n_words):
+        time.sleep(self.timeout)
+        return []
+
+    def guess(self, words, n_words):
+        time.sleep(self.timeout)
+        return []
+
+
+def test_instrumentation_exports():
+    instrumentation = Instrumentation()
+    for value in (0.002, 0.02, 0.2, 20):
+        instrumentation.observe("player_call_seconds", value, team='a "b"', call="guess", status="ok")
+    with instrumentation.timer("phase_seconds", phase="clean"):
+        pass
+
+    snapshot = json.loads(instrumentation.to_json())
+    assert snapshot["player_call_seconds"][0]["count"] == 4
+    assert snapshot["phase_seconds"][0]["labels"] == {"phase": "clean"}
+
+    text = instrumentation.to_prometheus()
+    assert "# TYPE hat_player_call_seconds histogram" in text
+    assert 'hat_player_call_seconds_bucket{call="guess",status="ok",team="a \\"b\\"",le="0.0025"} 1' in text
+    assert 'hat_player_call_seconds_bucket{call="guess",status="ok",team="a \\"b\\"",le="10"} 3' in text
+    assert 'hat_player_call_seconds_bucket{call="guess",status="ok",team="a \\"b\\"",le="+Inf"} 4' in text
+    assert 'hat_player_call_seconds_count{call="guess",status="ok",team="a \\"b\\""} 4' in text
+
+
+def test_game_records_phases_and_player_calls():
+    players = [
+        PlayerDefinition("good", AssociationPlayer(1)),
+        PlayerDefinition("slow", SlowFailingPlayer()),
+        PlayerDefinition("down", RemotePlayer(closed_port_url(), timeout=5)),
+    ]
+    game = make_game(players, list(ASSOCIATIONS)[:3], n_rounds=1)
+    game.instrumentation = Instrumentation()
+    game.run()
+
+    snapshot = game.instrumentation.snapshot()
+    phases = {row["labels"]["phase"] for row in snapshot["phase_seconds"]}
+    assert {"clean", "guess", "evaluate", "score", "log", "record"} <= phases
+    calls = {tuple(row["labels"].values()): row["count"] for row in snapshot["player_call_seconds"]}
+    assert calls[("explain", "ok", "good")] == 1
+    assert calls[("explain", "timeout", "slow")] == 1
+    assert calls[("explain", "error", "down")] == 1
+    assert ("guess", "error", "down") in calls and ("guess", "timeout", "slow") in calls
+    # the remote player is asked through the pool
+    assert snapshot["queue_wait_seconds"][0]["count"] == calls[("guess", "error", "down")]
+    # failed remote guesses take time too
+    assert game.stats.get("down", "response_time").min > 0
+
+
+def test_instrumentation_is_off_by_default():
+    game = make_game([PlayerDefinition(f"team {i}", AssociationPlayer(i)) for i in (1, 2)], list(ASSOCIATIONS)[:2], 1)
+    game.run()
+    assert game.instrumentation is NO_INSTRUMENTATION
+    assert game.instrumentation.snapshot() == {}
@@ -0,0 +1,104 @@
+from collections import defaultdict
+
+import pytest
+from nltk.corpus.reader.wordnet import WordNetCorpusReader
+
+from the_hat_game import cleaning
+from the_hat_game.cleaning import WordListCleaner
+from the_hat_game.lemma_index import LemmaIndex
+
+
+class ToyWordnet:
+    """A tiny lexicon answering `synsets` with WordNet's own lookup and morphology code."""
+
+    MORPHOLOGICAL_SUBSTITUTIONS = WordNetCorpusReader.MORPHOLOGICAL_SUBSTITUTIONS
+
+    def __init__(self, lemmas, exceptions):
+        self._lemma_pos_offset_map = defaultdict(dict)
+        for offset, (lemma, pos) in enumerate(lemmas):
+            self._lemma_pos_offset_map[lemma][pos] = [offset]
+        self._exception_map = {pos: {} for pos in "nvars"}
+        for form, pos, base in exceptions:
+            self._exception_map[pos][form] = [base]
+
+    def synset_from_pos_and_offset(self, pos, offset):
+        return (pos, offset)
+
+    def synsets(self, word):
+        return WordNetCorpusReader.synsets(self, word)
+
+    def all_lemma_names(self, pos=None):
+        return WordNetCorpusReader.all_lemma_names(self, pos)
+
+    def _morphy(self, form, pos, check_exceptions=True):
+        return WordNetCorpusReader._morphy(self, form, pos, check_exceptions)
+
+    def get_version(self):
+        return "toy"
+
+
+def test_lemma_index_matches_synsets(tmp_path):
+    lemmas = [
+        ("cat", "n"),
+        ("box", "n"),
+        ("church", "n"),
+        ("wolf", "n"),
+        ("fly", "v"),
+        ("bake", "v"),
+        ("run", "v"),
+        ("big", "a"),
+        ("quickly", "r"),
+        ("goose", "n"),
+        ("ice_cream", "n"),
+    ]
+    exceptions = [("geese", "n", "goose"), ("ran", "v", "run")]
+    wordnet = ToyWordnet(lemmas, exceptions)
+    LemmaIndex.build(wordnet).save(tmp_path / "index.pkl")
+    index = LemmaIndex.load(tmp_path / "index.pkl")
+
+    probes = [lemma for lemma, _ in lemmas] + ["cats", "boxes", "churches", "wolves", "flies", "flying", "baked"]
+    probes += [
+        "baking",
+        "runs",
+        "ran",
+        "bigger",
+        "biggest",
+        "geese",
+        "gooses",
+        "ice_creams",
+        "Cats",
+        "dogs",
+        "quicklys",
+    ]
+    for word in probes:
+        assert (word in index) == (len(wordnet.synsets(word)) > 0), word
+    assert index.wordnet_version == "toy"
+
+
+def test_cleaner_uses_lemma_index():
+    cleaner = WordListCleaner("hard", lemma_index=LemmaIndex(["kitten", "purr"]))
+    assert cleaner.clean("cat", ["Kitten", "purr", "meowww", "catty"], 4) == ["kitten", "purr"]
+
+
+@pytest.fixture
+def default_index_path(tmp_path, monkeypatch):
+    path = tmp_path / "wordnet_lemmas.pkl"
+    monkeypatch.setattr(cleaning, "DEFAULT_INDEX_PATH", path)
+    monkeypatch.setattr(cleaning, "get_wordnet", lambda: pytest.fail("WordNet must not be loaded"))
+    cleaning.get_default_lemma_index.cache_clear()
+    cleaning.word_exists.cache_clear()
+    yield path
+    cleaning.get_default_lemma_index.cache_clear()
+    cleaning.word_exists.cache_clear()
+
+
+def test_cleaner_loads_default_index(default_index_path):
+    LemmaIndex(["kitten", "purr"]).save(default_index_path)
+    cleaner = WordListCleaner("hard")
+    assert cleaner.clean("cat", ["Kitten", "purr", "meowww", "catty"], 4) == ["kitten", "purr"]
+
+
+def test_cleaner_falls_back_to_wordnet_without_default_index(default_index_path, monkeypatch):
+    monkeypatch.setattr(cleaning, "get_wordnet", lambda: ToyWordnet([("purr", "v")], []))
+    cleaner = WordListCleaner("hard")
+    assert cleaner.clean("cat", ["Kitten", "purr"], 4) == ["purr"]
@@ -0,0 +1,85 @@
+import json
+from collections import OrderedDict
+from datetime import datetime
+
+import pytest
+
+from flask_app.player import LocalDummyPlayer
+from the_hat_game import loggers
+from the_hat_game.game import Game
+from the_hat_game.health import CircuitBreaker
+from the_hat_game.loggers import JsonlSink, dump_locally, dumps, read_jsonl
+from the_hat_game.players import PlayerDefinition
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(loggers, "orjson", None)
+    data = OrderedDict(timestamp=datetime(2021, 12, 1, 10, 30, 0, 5), words=["cat"], scores={"a": 1, "b": 0.5})
+    assert json.loads(dumps(data)) == {
+        "timestamp": "2021-12-01T10:30:00.000005",
+        "words": ["cat"],
+        "scores": {"a": 1, "b": 0.5},
+    }
+    assert json.loads(dumps({"time": float("nan"), "times": [1.0, float("inf")]})) == {
+        "time": None,
+        "times": [1.0, None],
+    }
+    with pytest.raises(Exception):
+        dumps({"value": object()})
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dump_locally_health_report(monkeypatch, tmp_path, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(loggers, "orjson", None)
+    breaker = CircuitBreaker(failure_threshold=1, clock=lambda: 1.5)
+    breaker.record_failure()
+    dump_locally({"health": {"down": breaker.to_dict()}, "pair": (1, "a")}, tmp_path / "game")
+    with open(tmp_path / "game.json") as f:
+        data = json.load(f)
+    assert data["health"]["down"]["transitions"] == [[1.5, "open"]]
+    assert data["pair"] == [1, "a"]
+
+    # a record which can not be serialized leaves the previous file as it was
+    with pytest.raises(Exception):
+        dump_locally({"value": object()}, tmp_path / "game")
+    with open(tmp_path / "game.json") as f:
+        assert json.load(f) == data
+    assert list(tmp_path.iterdir()) == [tmp_path / "game.json"]
+
+
+@pytest.mark.parametrize("background", [False, True])
+def test_jsonl_sink_game_points_at_iterations(tmp_path, background):
+    path = tmp_path / "games.jsonl"
+    players = [PlayerDefinition(f"player {i}", LocalDummyPlayer()) for i in range(3)]
+    with JsonlSink(path, background=background) as sink:
+        for _ in range(2):
+            game = Game(players, ["cat", "dog", "house"], "soft", 1, 3, 3, random_state=0, logging_callback=sink)
+            game.run()
+
+    records = read_jsonl(path)
+    games = [r for r in records if r["record"] == "game"]
+    assert len(records) == 8 and len(games) == 2
+    for game_record in games:
+        assert "iterations" not in game_record
+        assert len(game_record["iteration_lines"]) == 3
+        for line in game_record["iteration_lines"]:
+            assert records[line]["record"] == "iteration"
+            assert records[line]["game_timestamp"] == game_record["timestamp"]
+
+    # appending keeps counting lines of the existing file
+    with JsonlSink(path) as sink:
+        sink({"game_timestamp": None, "word": "tree"}, "iteration")
+        sink({"timestamp": None, "iterations": []}, "game")
+    assert read_jsonl(path)[-1]["iteration_lines"] == [8]
+
+
+def test_background_sink_serializes_records_when_they_are_logged(tmp_path):
+    path = tmp_path / "games.jsonl"
+    with JsonlSink(path, background=True) as sink:
+        record = {"game_timestamp": None, "words": ["cat"]}
+        sink(record, "iteration")
+        record["words"].append("dog")
+    assert read_jsonl(path)[0]["words"] == ["cat"]
@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from the_hat_game.cache import CachedPlayer
+from the_hat_game.players import PlayerDefinition
+from the_hat_game.registry import ModelRegistry
+from the_hat_game.tests.helpers import ASSOCIATIONS, AssociationPlayer, make_game
+
+
+def counting_loader(loads, key, depth, event=None):
+    def load():
+        if event is not None:
+            event.wait(5)
+        loads[key] += 1
+        return AssociationPlayer(depth)
+
+    return load
+
+
+def test_registry_evicts_least_recently_used():
+    loads = Counter()
+    with ModelRegistry(memory_budget=2) as registry:
+        for depth, key in enumerate("abc", 1):
+            registry.register(key, counting_loader(loads, key, depth), size=1)
+        a = registry.get("a")
+        assert registry.get("a") is a
+        registry.get("b")
+        registry.get("a")
+        registry.get("c")
+        # "b" was the least recently used one
+        assert list(registry.resident) == ["a", "c"]
+        registry.get("b")
+        assert loads == {"a": 1, "b": 2, "c": 1}
+
+        # a full registry does not evict for a prefetch
+        registry.prefetch(["a"])
+        assert list(registry.resident) == ["c", "b"]
+        info = registry.info()
+    assert (info["hits"], info["misses"], info["evictions"], info["prefetch_skipped"]) == (2, 4, 2, 1)
+    assert info["load_seconds"]["count"] == 4
+
+
+def test_concurrent_loads_stay_within_the_budget():
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def loader(depth):
+        def load():
+            with lock:
+                active.append(depth)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(depth)
+            return AssociationPlayer(depth)
+
+        return load
+
+    with ModelRegistry(memory_budget=1) as registry:
+        for depth in (1, 2, 3):
+            registry.register(depth, loader(depth), size=1)
+        with ThreadPoolExecutor(3) as pool:
+            players = list(pool.map(registry.get, (1, 2, 3)))
+        assert [player.depth for player in players] == [1, 2, 3]
+        assert registry.used <= 1
+    # the loads waited for each other instead of holding three models at once
+    assert max(peak) == 1
+    assert registry.info()["evictions"] == 2
+
+
+def test_prefetched_model_is_loaded_once():
+    loads = Counter()
+    release = threading.Event()
+    with ModelRegistry() as registry:
+        registry.register("a", counting_loader(loads, "a", 1, release), size=1)
+        registry.prefetch(["a"])
+        registry.prefetch(["a"])
+        release.set()
+        assert registry.get("a").depth == 1
+    assert loads == {"a": 1}
+    assert registry.info()["prefetches"] == 1
+    assert registry.info()["hits"] + registry.info()["waits"] == 1
+
+
+def test_game_with_lazy_players():
+    words = list(ASSOCIATIONS)[:6]
+    eager = make_game([PlayerDefinition(f"team {d}", AssociationPlayer(d)) for d in (1, 2, 3)], words)
+    eager.run()
+
+    loads = Counter()
+    with ModelRegistry(memory_budget=3) as registry:
+        for depth in (1, 2, 3):
+            registry.register(depth, counting_loader(loads, depth, depth), size=1)
+        lazy = make_game([PlayerDefinition(f"team {d}", registry.player(d)) for d in (1, 2, 3)], words)
+        lazy.run()
+    pd.testing.assert_frame_equal(lazy.scores, eager.scores)
+    # the models of the second iteration were prefetched during the first one
+    assert loads == {1: 1, 2: 1, 3: 1}
+    assert registry.info()["prefetches"] > 0
+
+
+def test_game_refuses_a_budget_below_its_models():
+    loads = Counter()
+    with ModelRegistry(memory_budget=2) as registry:
+        for depth in (1, 2, 3):
+            registry.register(depth, counting_loader(loads, depth, depth), size=1)
+        players = [PlayerDefinition(f"team {d}", CachedPlayer(registry.player(d))) for d in (1, 2, 3)]
+        with pytest.raises(ValueError, match="the models of a game take 3 bytes, more than the memory budget of 2"):
+            make_game(players, list(ASSOCIATIONS)[:6])
+        # teams sharing a model need it once
+        make_game([PlayerDefinition(f"team {d}", registry.player(1)) for d in (1, 2, 3)], list(ASSOCIATIONS)[:6])
+    assert loads == {}
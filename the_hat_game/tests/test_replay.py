@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from the_hat_game.game import Game
+from the_hat_game.players import PlayerDefinition, RemotePlayer
+from the_hat_game.replay import Recording, ReplayPlayer, record_players, replay_players
+from the_hat_game.tests.helpers import ASSOCIATIONS, AssociationPlayer, PlayerServer, make_game
+
+
+def test_replayed_game_matches_the_recorded_one(tmp_path):
+    words = list(ASSOCIATIONS)[:3]
+    recording = Recording()
+    with PlayerServer(AssociationPlayer(1), batch=False) as server:
+        players = [
+            PlayerDefinition("remote", RemotePlayer(server.url)),
+            PlayerDefinition("team 2", AssociationPlayer(2)),
+            PlayerDefinition("team 3", AssociationPlayer(3)),
+        ]
+        recorded = make_game(record_players(players, recording), words, n_rounds=1)
+        recorded.run()
+    recording.save(tmp_path / "calls.npz")
+
+    # the server is gone, every answer comes from the file
+    loaded = Recording.load(tmp_path / "calls.npz")
+    assert len(loaded) == len(recording)
+    replayed = make_game(replay_players(loaded, [p.name for p in players]), words, n_rounds=1)
+    replayed.run()
+
+    pd.testing.assert_frame_equal(replayed.scores, recorded.scores)
+    assert replayed.game_info["players"]["remote"] == server.url
+    codes = [
+        [{name: r["response_code"] for name, r in attempt.items()} for attempt in iteration["attempts"]]
+        for game in (recorded, replayed)
+        for iteration in game.game_info["iterations"]
+    ]
+    half = len(codes) // 2
+    assert codes[:half] == codes[half:]
+    assert all(p.api.misses == 0 for p in replayed.players)
+
+
+def test_replay_order_and_misses():
+    recording = Recording()
+    recording.record("a", "guess", ["purr"], 2, ["cat"], 0.5, 200)
+    recording.record("a", "guess", ["purr"], 2, [], 1.0, None)
+    recording.record("a", "explain", "cat", 3, ["kitten", "purr"])
+    player = ReplayPlayer(recording, "a")
+
+    assert player.guess(["purr"], 2) == {"word_list": ["cat"], "time": 0.5, "code": 200}
+    assert player.guess(["purr"], 2) == {"word_list": [], "time": 1.0, "code": None}
+    # the last answer is repeated
+    assert player.guess(["purr"], 2)["time"] == 1.0
+    assert player.explain("cat", 3) == ["kitten", "purr"]
+
+    answer = player.guess(["whiskers"], 2)
+    assert answer["word_list"] == [] and np.isnan(answer["time"])
+    assert player.explain("cat", 2) == []
+    assert player.misses == 2
+
+
+def test_recording_and_replay_players_are_refused_by_the_process_backend():
+    recording = Recording()
+    players = record_players([PlayerDefinition(f"team {d}", AssociationPlayer(d)) for d in (1, 2)], recording)
+    with pytest.raises(ValueError, match="team 1 can not be used with the 'process' executor backend"):
+        Game(players, list(ASSOCIATIONS)[:2], "soft", 1, 3, 2, executor="process")
+    with pytest.raises(ValueError, match="team 1 can not be used with the 'process' executor backend"):
+        Game(replay_players(recording, ["team 1", "team 2"]), list(ASSOCIATIONS)[:2], "soft", 1, 3, 2, executor="process")
@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+
+from the_hat_game.cache import CachedPlayer
+from the_hat_game.players import PlayerDefinition, supports_sessions
+from the_hat_game.tests.helpers import ASSOCIATIONS, AssociationPlayer, make_game
+from the_hat_game.tournament import Tournament
+
+
+class SessionPlayer(AssociationPlayer):
+    def __init__(self, depth):
+        super().__init__(depth)
+        self.sessions = {}
+        self.appended = []
+
+    def guess_next(self, session, word, n_words):
+        self.appended.append(word)
+        sentence = self.sessions.setdefault(session, [])
+        sentence.append(word)
+        return self.guess(sentence, n_words)
+
+    def end_session(self, session):
+        del self.sessions[session]
+
+
+def play(incremental_guesses, tournament=None):
+    players = [
+        PlayerDefinition("session", SessionPlayer(3)),
+        PlayerDefinition("stateless", AssociationPlayer(2)),
+        PlayerDefinition("explainer", AssociationPlayer(1)),
+    ]
+    game = make_game(players, list(ASSOCIATIONS), n_rounds=2, incremental_guesses=incremental_guesses)
+    if tournament is None:
+        game.run()
+    else:
+        tournament.run(game)
+    return game, players[0].api
+
+
+def test_sessions_give_the_same_game():
+    expected, _ = play(False)
+    for tournament in (None, Tournament(max_workers=2, per_team_limit=1)):
+        game, player = play(True, tournament)
+        pd.testing.assert_frame_equal(game.scores, expected.scores)
+        # one new word for every attempt the player was asked in, and every session is closed at the
+        # end of its iteration
+        attempts = [attempt for iteration in game.game_info["iterations"] for attempt in iteration["attempts"]]
+        assert len(player.appended) == sum("session" in attempt for attempt in attempts) > 0
+        assert player.sessions == {}
+
+
+def test_wrappers_without_sessions_hide_them():
+    assert supports_sessions(SessionPlayer(1))
+    assert not supports_sessions(AssociationPlayer(1))
+    assert not supports_sessions(CachedPlayer(SessionPlayer(1)))
+
+
+class BrokenSessionPlayer(SessionPlayer):
+    def guess_next(self, session, word, n_words):
+        if self.sessions.get(session):
+            raise RuntimeError("the service went away")
+        return super().guess_next(session, word, n_words)
+
+
+def test_sessions_are_closed_when_an_attempt_fails():
+    player = BrokenSessionPlayer(3)
+    players = [
+        PlayerDefinition("session", player),
+        PlayerDefinition("stateless", AssociationPlayer(2)),
+        PlayerDefinition("explainer", AssociationPlayer(1)),
+    ]
+    game = make_game(players, list(ASSOCIATIONS), n_rounds=2, incremental_guesses=True)
+    with pytest.raises(RuntimeError, match="the service went away"):
+        game.run()
+    assert player.appended and player.sessions == {}
@@ -0,0 +1,55 @@
+import json
+
+import pandas as pd
+import pytest
+
+from the_hat_game.sharding import ShardError, load_config, load_shard, make_game, merge_shards, play_shard, save_shard
+from the_hat_game.tests.helpers import ASSOCIATIONS
+
+
+@pytest.fixture
+def config(tmp_path):
+    (tmp_path / "words.txt").write_text("\n".join(ASSOCIATIONS) + "\n")
+    players = [
+        {
+            "name": f"team {depth}",
+            "class": "the_hat_game.tests.helpers.AssociationPlayer",
+            "kwargs": {"depth": depth},
+        }
+        for depth in (1, 2, 3)
+    ]
+    config = {"players": players, "words": {"files": ["words.txt"]}, "n_explain_words": 3, "n_guessing_words": 2}
+    (tmp_path / "tournament.json").write_text(json.dumps(config))
+    return load_config(tmp_path / "tournament.json")
+
+
+def test_merged_shards_match_a_single_run(config, tmp_path):
+    single = make_game(config, logging_callback=lambda data, name: None)
+    single.run()
+
+    for n_shards in (1, 4):
+        paths = []
+        for shard in range(n_shards):
+            paths.append(tmp_path / f"{n_shards}" / f"shard-{shard}.json")
+            save_shard(play_shard(config, shard, n_shards, max_workers=2), paths[-1])
+        scores_dict, scores, scores_status = merge_shards([load_shard(path) for path in reversed(paths)])
+        pd.testing.assert_frame_equal(scores, single.scores)
+        pd.testing.assert_frame_equal(scores_status, single.scores_status)
+        assert scores_dict == single.game_info["scores"]
+
+
+def test_merge_checks_the_shards(config):
+    results = [play_shard(config, shard, 3) for shard in range(3)]
+    with pytest.raises(ShardError, match="expected shards"):
+        merge_shards(results[:2])
+    with pytest.raises(ShardError, match="config_hash"):
+        merge_shards([results[0], {**results[1], "config_hash": "other"}, results[2]])
+
+
+def test_shards_of_other_word_files_are_not_merged(config, tmp_path):
+    first = play_shard(config, 0, 2)
+    words = (tmp_path / "words.txt").read_text().split()
+    (tmp_path / "words.txt").write_text("\n".join(words[1:]))
+    changed = load_config(tmp_path / "tournament.json")
+    with pytest.raises(ShardError, match="config_hash"):
+        merge_shards([first, play_shard(changed, 1, 2)])
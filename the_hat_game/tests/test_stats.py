@@ -0,0 +1,49 @@
+import numpy as np
+
+from the_hat_game.stats import LATENCY_BUCKETS, GameStats, RunningStat
+
+
+def test_running_stat_matches_numpy():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(-2, 1, size=10000)
+    stat = RunningStat(LATENCY_BUCKETS)
+    for value in values:
+        stat.update(value)
+    assert stat.count == len(values)
+    assert np.isclose(stat.mean, values.mean())
+    assert stat.min == values.min() and stat.max == values.max()
+    for q in (50, 90, 99):
+        # buckets are 10% wide
+        assert abs(stat.percentile(q) / np.percentile(values, q) - 1) < 0.11
+
+
+def test_running_stat_missing_values_and_merge():
+    first, second = RunningStat(), RunningStat()
+    for value in (1, 2, np.nan):
+        first.update(value)
+    second.update(True)
+    assert np.isnan(first.mean)
+    merged = RunningStat().merge(first).merge(second)
+    assert (merged.count, merged.missing, merged.sum, merged.min, merged.max) == (3, 1, 4.0, 1, 2)
+
+
+def test_game_stats_skip_missing_values():
+    stats, metrics = GameStats(), GameStats(latency_metrics=(), skip_missing=False)
+    for value in (0.1, np.nan, 0.3):
+        stats.update("team", "response_time", value)
+        metrics.update("team", "response_time", value)
+    assert np.isclose(stats.get("team", "response_time").mean, 0.2)
+    assert stats.to_frame().loc[("team", "response_time"), "missing"] == 1
+    assert np.isnan(metrics.means()["team"]["response_time"])
+
+
+def test_game_stats_report():
+    stats = GameStats()
+    for value in (0.1, 0.2, 0.3):
+        stats.update("team", "response_time", value)
+        stats.update("team", "response_200", True)
+    assert stats.means() == {"team": {"response_time": stats.get("team", "response_time").mean, "response_200": 1.0}}
+    frame = stats.to_frame(percentiles=(50,))
+    assert list(frame.columns) == ["count", "missing", "mean", "min", "max", "p50"]
+    assert frame.loc[("team", "response_time"), "count"] == 3
+    assert np.isnan(frame.loc[("team", "response_200"), "p50"])
@@ -0,0 +1,25 @@
+import pandas as pd
+
+from the_hat_game.tests.helpers import ASSOCIATIONS, make_game, make_players
+from the_hat_game.tournament import Tournament
+
+
+def test_tournament_matches_serial_run():
+    words = list(ASSOCIATIONS)
+    serial = make_game(make_players(), words)
+    serial.run()
+    parallel = Tournament(max_workers=3).run(make_game(make_players(), words))
+
+    pd.testing.assert_frame_equal(serial.scores, parallel.scores)
+    pd.testing.assert_frame_equal(serial.scores_status, parallel.scores_status)
+    assert [i["word"] for i in serial.game_info["iterations"]] == [i["word"] for i in parallel.game_info["iterations"]]
+    assert serial.game_info["scores"] == parallel.game_info["scores"]
+
+
+def test_tournament_respects_per_team_limit():
+    players = make_players(delay=0.01)
+    words = list(ASSOCIATIONS)
+    games = [make_game(players, words[:3], n_rounds=1), make_game(players, words[3:], n_rounds=1)]
+    Tournament(max_workers=6, per_team_limit=1).run_games(games)
+    assert all(len(game.game_info["iterations"]) == 3 for game in games)
+    assert all(player.api.max_active == 1 for player in players)
@@ -0,0 +1,128 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from the_hat_game.executors import FanOutExecutor
+from the_hat_game.players import PlayerDefinition, PlayerWrapper
+
+
+class LimitedPlayer(PlayerWrapper):
+    """Player wrapper which lets at most `semaphore`'s value of calls hit the player at the same time."""
+
+    def __init__(self, player, semaphore):
+        super().__init__(player)
+        self.semaphore = semaphore
+
+    def explain(self, word, n_words):
+        with self.semaphore:
+            return self.player.explain(word, n_words)
+
+    def guess(self, words, n_words):
+        with self.semaphore:
+            return self.player.guess(words, n_words)
+
+    def guess_batch(self, sentences, n_words):
+        with self.semaphore:
+            return self.player.guess_batch(sentences, n_words)
+
+    def guess_next(self, session, word, n_words):
+        with self.semaphore:
+            return self.player.guess_next(session, word, n_words)
+
+    def end_session(self, session):
+        self.player.end_session(session)
+
+
+def synchronized(callback, lock):
+    def synchronized_callback(*args, **kwargs):
+        with lock:
+            return callback(*args, **kwargs)
+
+    return synchronized_callback
+
+
+class Tournament:
+    """Plays independent iterations of one or several games concurrently.
+
+    Iterations are planned exactly as Game.run plans them and their results are merged back in
+    the planned order, so `scores` and `scores_status` match a serial run with the same
+    `random_state` as long as the players themselves are deterministic.
+    `max_workers` caps the number of iterations in flight and `per_team_limit` caps the number
+    of simultaneous requests to every team (teams are identified by name across games).
+    """
+
+    def __init__(self, max_workers=4, per_team_limit=None):
+        self.max_workers = max_workers
+        self.per_team_limit = per_team_limit
+        self.team_limits = {}
+
+    def limit_player(self, player):
+        if self.per_team_limit is None:
+            return player
+        if player.name not in self.team_limits:
+            self.team_limits[player.name] = threading.BoundedSemaphore(self.per_team_limit)
+        return PlayerDefinition(player.name, LimitedPlayer(player.api, self.team_limits[player.name]))
+
+    def plan(self, games, complete=False, shard=None):
+        """(game, iteration, round, explaining_player, guessing_players, word) of every iteration to play.
+
+        With `shard=(index, count)` only the iterations whose number in their game's plan is `index`
+        modulo `count` are played, so `count` runs with the same games split the work between them.
+        """
+        tasks = []
+        for game in games:
+            if game.executor.backend == "process":
+                raise ValueError("Tournament games must use the 'thread' or 'inline' executor backend")
+            for i, (r, explaining_player, guessing_players, word) in enumerate(game.plan_iterations(complete=complete)):
+                if shard is not None and i % shard[1] != shard[0]:
+                    continue
+                limited = {p.name: self.limit_player(p) for p in [explaining_player] + guessing_players}
+                tasks.append(
+                    (
+                        game,
+                        i,
+                        r,
+                        limited[explaining_player.name],
+                        [limited[p.name] for p in guessing_players],
+                        word,
+                    )
+                )
+        return tasks
+
+    def run(self, game, complete=False, shard=None):
+        self.run_games([game], complete=complete, shard=shard)
+        return game
+
+    def run_games(self, games, complete=False, shard=None):
+        tasks = self.plan(games, complete=complete, shard=shard)
+        n_guessing_players = max(len(game.players) - 1 for game in games)
+        lock = threading.Lock()
+        callbacks = [game.logging_callback for game in games]
+        executors = [game.executor for game in games]
+        # guesses of all iterations in flight share one pool large enough to ask every player at once
+        executor = FanOutExecutor(executors[0].backend, max_workers=self.max_workers * n_guessing_players)
+        try:
+            for game in games:
+                game.logging_callback = synchronized(game.logging_callback, lock)
+                game.executor = executor
+            with ExitStack() as stack:
+                stack.enter_context(executor)
+                pool = stack.enter_context(ThreadPoolExecutor(self.max_workers, thread_name_prefix="hat-tournament"))
+                futures = [
+                    pool.submit(game.play_iteration, explaining_player, guessing_players, word)
+                    for game, _, _, explaining_player, guessing_players, word in tasks
+                ]
+                results = [future.result() for future in futures]
+
+            for (game, i, r, _, _, _), (_, _, iteration_info) in zip(tasks, results):
+                if shard is not None:
+                    # the number of the iteration in the whole game, to merge the shards in order
+                    iteration_info["iteration"] = i
+                game.record_iteration(r, iteration_info)
+            for game in games:
+                game.finish_game()
+        finally:
+            for game, callback, game_executor in zip(games, callbacks, executors):
+                game.logging_callback = callback
+                game.executor = game_executor
+        return games